@@ -55,7 +55,7 @@ export default function CriticalPathAnalysis() {
               />
             ) : projectData && projectData.image_base64 ? (
               <img
-                src={`data:image/png;base64,${projectData.image_base64}`}
+                src={`data:image/svg+xml;base64,${projectData.image_base64}`}
                 alt="Grafo de Dependencias"
                 style={{ width: '100%', height: 'auto', objectFit: 'contain' }}
               />
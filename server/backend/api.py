@@ -1,21 +1,62 @@
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-from typing_extensions import TypedDict
-import io
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError, field_validator
+from typing import List, Optional, Dict, Any, Tuple, Callable, Collection
+from datetime import date, datetime
+import asyncio
+import math
+import time
+from typing_extensions import TypedDict, NotRequired
+import os
+import re
 import base64
-import networkx as nx
-import matplotlib.pyplot as plt
+import tempfile
+import uuid
+import xml.etree.ElementTree as ElementTree
 
 # Importar estructuras personalizadas
-from structures.custom_graph import CustomGraph
+from structures.custom_graph import CustomGraph, ProgressCallback
 from task import Task
 from custom_service import CustomService
+from component_service import ComponentService
+from subproject_service import SubprojectService
+from schedule_service import ScheduleService, ScheduledTask, ScheduleResult
+from schedule_index import ScheduleIndex, ScheduleIndexService
+from crashing_service import CrashingService
+from graph_view_service import GraphView, GraphViewService, VIEW_MODES
+from svg_renderer import GraphLayout, layered_layout, overview_layout, render_graph_svg, render_gantt_svg
+from import_service import import_csv, import_msproject, export_task_inputs
+from project_history import HistoryService, ProjectHistory, ProjectVersion
+from job_service import Job, JobCancelled, JobContext, JobQueueFull, JobService, JOB_DONE
+from structures.binary_project import BinaryProject, write_binary_project
+from structures.working_calendar import WorkingCalendar, to_minutes, from_minutes
+from units import UNIT_FACTORS, convert_to_minutes
 
 app = FastAPI()
 
+# Servicio de análisis por componentes (mantiene su pool de procesos entre peticiones)
+component_service = ComponentService()
+# Servicio jerárquico (conserva la caché de resúmenes de sub-proyectos entre peticiones)
+subproject_service = SubprojectService()
+# Servicio de programación con calendarios laborales (registro de calendarios compilados)
+schedule_service = ScheduleService()
+# Vistas por niveles de detalle compiladas (para consultas de clúster y ventana visible)
+graph_view_service = GraphViewService()
+# Índices temporales de las programaciones calculadas (consultas por ventana y holgura)
+schedule_index_service = ScheduleIndexService()
+# Historiales de versiones por proyecto (comparten el servicio de componentes)
+history_service = HistoryService(component_service)
+# Análisis largos en segundo plano (consultar avance y resultado por job_id)
+job_service = JobService()
+
+@app.on_event("shutdown")
+def shutdown_component_service():
+    component_service.shutdown()
+    job_service.shutdown()
+
 # Permitir todos los orígenes durante desarrollo
 app.add_middleware(
     CORSMiddleware,
@@ -35,9 +76,21 @@ class TaskInput(BaseModel):
     unit: str
     priority: str
     dependencies: List[int]
+    subproject: Optional[str] = None # Ruta del sub-proyecto, p. ej. "Programa/Fase 1"
+    calendar: Optional[str] = None # Calendario laboral registrado
+    min_duration: Optional[float] = None # Duración mínima al comprimir (misma unidad)
+    crash_cost: Optional[float] = None # Costo por unidad de duración reducida
+
+    @field_validator("unit")
+    @classmethod
+    def validate_unit(cls, value: str) -> str:
+        if value.lower() not in UNIT_FACTORS:
+            raise ValueError(f"Unknown duration unit '{value}'")
+        return value
 
 class GraphNode(TypedDict):
     data: Dict[str, Any]
+    position: NotRequired[Dict[str, float]]
 
 class GraphEdge(TypedDict):
     data: Dict[str, Any]
@@ -50,164 +103,159 @@ class ProjectData(BaseModel):
     duracion_total: float
     tareas_criticas: int
     ciclos_detectados: Optional[List[List[str]]] = None
+    bloques_ciclicos: Optional[List[List[str]]] = None # Tareas agrupadas por ciclo (componentes fuertemente conexos)
     orden_tareas: Optional[List[str]] = None
-    image_base64: str
+    ruta_critica: Optional[List[str]] = None
+    image_base64: str # SVG del grafo en Base64
     graph_data: Optional[GraphData] = None
+    view_id: Optional[str] = None # Vista agregada: usar /graph-view/{view_id}/... para el detalle
 
-def convert_to_minutes(duration: float, unit: str) -> float:
-    """Convierte la duración a minutos según la unidad especificada."""
-    unit_lower = unit.lower()
-    if unit_lower == "minutes" or unit_lower == "minutos":
-        return duration
-    elif unit_lower == "hours" or unit_lower == "horas":
-        return duration * 60
-    elif unit_lower == "days" or unit_lower == "días" or unit_lower == "dias":
-        return duration * 60 * 24
-    else:
-        # Por defecto, asumir minutos
-        return duration
-
-def draw_graph_static(graph: nx.DiGraph, title: str, buffer: io.BytesIO):
-    """Dibuja el grafo usando matplotlib y lo guarda en el buffer."""
-    plt.figure(figsize=(12, 8))
-    pos = nx.spring_layout(graph, k=2, iterations=50)
-    
-    nx.draw(
-        graph,
-        pos,
-        with_labels=True,
-        node_color='lightblue',
-        node_size=3000,
-        font_size=10,
-        font_weight='bold',
-        arrows=True,
-        arrowsize=20,
-        edge_color='gray',
-        linewidths=2,
-        arrowstyle='->'
-    )
-    
-    plt.title(title, fontsize=16, fontweight='bold')
-    plt.tight_layout()
-    plt.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    plt.close()
+def build_tasks(tasks: List[TaskInput]) -> List[Task]:
+    """Convierte la entrada en objetos Task (duración en minutos, dependencias por nombre)."""
+    task_map: Dict[int, Task] = {}
+    all_tasks: List[Task] = []
 
-@app.post("/generate-plan", response_model=ProjectData)
-async def generate_plan(tasks: List[TaskInput]):
-    try:
-        task_map: Dict[int, Task] = {}
-        all_tasks: List[Task] = []
-        
-        # Construir grafo personalizado
-        custom_graph = CustomGraph()
+    for t in tasks:
+        # Convertir duración a minutos
+        duration_minutes = convert_to_minutes(t.duration, t.unit)
 
-        for t in tasks:
-            # Convertir duración a minutos para el grafo
-            duration_minutes = convert_to_minutes(t.duration, t.unit)
-            
-            # Crear objeto Task (manteniendo unidad original para display si fuera necesario, 
-            # pero para cálculo usamos minutos)
-            task = Task(
-                t.name,
-                duration_minutes, # Guardamos en minutos
-                "minutes",
-                t.priority,
-                []
-            )
-            task_map[t.id] = task
-            all_tasks.append(task)
-            
-            # Añadir nodo al grafo
-            custom_graph.add_node(t.name, data=task)
-            
-        # Añadir aristas (dependencias)
-        for t in tasks:
-            task = task_map[t.id]
-            # Resolver nombres de dependencias
-            dep_names = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
-            task.dependencies = dep_names
-            
-            for dep_name in dep_names:
-                custom_graph.add_edge(dep_name, task.name)
+        # Crear objeto Task (manteniendo unidad original para display si fuera necesario,
+        # pero para cálculo usamos minutos)
+        task = Task(
+            t.name,
+            duration_minutes, # Guardamos en minutos
+            "minutes",
+            t.priority,
+            [],
+            t.subproject or ""
+        )
+        task_map[t.id] = task
+        all_tasks.append(task)
 
-        # Analizar usando CustomGraph
-        cycles_list = custom_graph.detect_cycles()
-        order_result = custom_graph.get_tasks_order()
+    # Resolver nombres de dependencias
+    for t in tasks:
+        task_map[t.id].dependencies = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
 
-        duracion_total = 0.0
-        tareas_criticas = 0
-        order_tasks: Optional[List[str]] = None
+    return all_tasks
 
-        if order_result:
-            order_tasks = order_result["order"]
-            duracion_total = order_result["total_duration_hours"]
-            tareas_criticas = order_result["critical_tasks_count"]
-        else:
-            # Si hay ciclos, no hay orden topológico pero aún podemos contar tareas críticas
-            # Contar todas las tareas con prioridad "Crítica"
-            for task in all_tasks:
-                if task.priority == "Crítica":
-                    tareas_criticas += 1
-
-        # Generar imagen usando NetworkX (solo para visualización)
-        nx_graph = nx.DiGraph()
-        for node in custom_graph.get_all_nodes():
-            nx_graph.add_node(node.name)
-            for neighbor in node.neighbors:
-                nx_graph.add_edge(node.name, neighbor.name)
-        
-        buffer = io.BytesIO()
-        if cycles_list: 
-            graph_title = "Grafo con Dependencias Cíclicas"
-        else: 
-            graph_title = "Grafo de Dependencias sin Ciclos"
-            
-        draw_graph_static(nx_graph, graph_title, buffer=buffer)
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode("utf-8")
-
-        # Preparar datos para Cytoscape
-        cytoscape_nodes = []
-        cytoscape_edges = []
-        
-        for node in custom_graph.get_all_nodes():
-            # Determinar si es crítica
-            is_critical = False
-            if order_tasks and node.name in order_tasks:
-                 # Lógica simplificada: si está en el orden topológico es parte del plan válido.
-                 # Para saber si es crítica real necesitaríamos el cálculo de holgura (slack).
-                 # Por ahora marcaremos como crítica si está en el camino más largo (esto requeriría más lógica en CustomGraph).
-                 # Asumiremos que el frontend puede resaltar basado en la lista de tareas críticas si la tuviéramos detallada.
-                 pass
-
-            # Obtener las dependencias (nodos que apuntan a este nodo)
-            dependencies = [dep.name for dep in custom_graph.get_all_nodes() if node in dep.neighbors]
-
-            cytoscape_nodes.append({
+def build_plan_graph(tasks: List[TaskInput]) -> Tuple[CustomGraph, List[Task]]:
+    """Convierte la entrada en objetos Task (duración en minutos) y construye el CustomGraph."""
+    all_tasks = build_tasks(tasks)
+
+    # Construir grafo personalizado
+    custom_graph = CustomGraph(capacity=max(100, len(tasks) * 2))
+    for task in all_tasks:
+        custom_graph.add_node(task.name, data=task)
+
+    # Añadir aristas (dependencias)
+    for task in all_tasks:
+        for dep_name in task.dependencies:
+            custom_graph.add_edge(dep_name, task.name)
+
+    return custom_graph, all_tasks
+
+def graph_title(cycles_list: List[List[str]]) -> str:
+    return "Grafo con Dependencias Cíclicas" if cycles_list else "Grafo de Dependencias sin Ciclos"
+
+def _svg_base64(layout: GraphLayout, title: str, highlighted: Collection[str], progress: Optional[ProgressCallback]) -> str:
+    svg = "".join(render_graph_svg(layout, title, highlighted, progress))
+    return base64.b64encode(svg.encode("utf-8")).decode("utf-8")
+
+def render_graph_image(tasks: List[Task], cycles_list: List[List[str]], layout: Optional[GraphLayout] = None, progress: Optional[ProgressCallback] = None) -> str:
+    """Genera el SVG del grafo (tareas en ciclos resaltadas) y lo devuelve en Base64."""
+    if layout is None:
+        layout = layered_layout(tasks)
+    highlighted = {name for cycle in cycles_list for name in cycle}
+    return _svg_base64(layout, graph_title(cycles_list), highlighted, progress)
+
+def render_overview_image(graph_view: GraphView, cycles_list: List[List[str]]) -> str:
+    """
+    SVG en Base64 de la vista agregada: un nodo por clúster, resaltando los clústeres
+    que contienen tareas en ciclos. Su tamaño depende de los clústeres, no de las tareas.
+    """
+    layout = overview_layout(graph_view)
+    in_cycles = {name for cycle in cycles_list for name in cycle}
+    highlighted = {
+        layout["names"][graph_view.cluster_of[node]]
+        for node, name in enumerate(graph_view.names) if name in in_cycles
+    }
+    return _svg_base64(layout, graph_title(cycles_list), highlighted, None)
+
+def build_graph_data(custom_graph: CustomGraph) -> GraphData:
+    """Prepara los elementos (nodos y aristas) para Cytoscape."""
+    cytoscape_nodes = []
+    cytoscape_edges = []
+
+    # Dependencias (nodos que apuntan a cada nodo) en una sola pasada sobre las aristas
+    dependencies_of: Dict[str, List[str]] = {}
+    for node in custom_graph.get_all_nodes():
+        for neighbor in node.neighbors:
+            dependencies_of.setdefault(neighbor.name, []).append(node.name)
+
+    for node in custom_graph.get_all_nodes():
+        dependencies = dependencies_of.get(node.name, [])
+
+        cytoscape_nodes.append({
+            "data": {
+                "id": node.name,
+                "label": node.name,  # Solo el nombre, sin duración
+                "priority": node.data.priority,
+                "duration": node.data.duration,  # Duración como campo separado
+                "dependencies": dependencies  # Lista de dependencias
+            }
+        })
+
+        for neighbor in node.neighbors:
+            cytoscape_edges.append({
                 "data": {
-                    "id": node.name,
-                    "label": node.name,  # Solo el nombre, sin duración
-                    "priority": node.data.priority,
-                    "duration": node.data.duration,  # Duración como campo separado
-                    "dependencies": dependencies  # Lista de dependencias
+                    "source": node.name,
+                    "target": neighbor.name
                 }
             })
-            
-            for neighbor in node.neighbors:
-                cytoscape_edges.append({
-                    "data": {
-                        "source": node.name,
-                        "target": neighbor.name
-                    }
-                })
+
+    return GraphData(nodes=cytoscape_nodes, edges=cytoscape_edges)
+
+@app.post("/generate-plan", response_model=ProjectData)
+async def generate_plan(tasks: List[TaskInput], view: str = "full", max_cluster_size: int = 200):
+    """
+    view="full" devuelve todos los nodos en graph_data; "level", "component" o "subproject"
+    devuelven la vista agregada por clústeres y su view_id para pedir el detalle.
+    """
+    if view != "full" and view not in VIEW_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown view mode '{view}'")
+    if max_cluster_size < 1:
+        raise HTTPException(status_code=400, detail="max_cluster_size must be positive")
+    try:
+        custom_graph, all_tasks = build_plan_graph(tasks)
+
+        # Analizar por componentes independientes (en paralelo si el proyecto es grande).
+        # Los ciclos se reducen a bloques, así que el orden existe aunque haya ciclos.
+        analysis = component_service.analyze(all_tasks)
+        cycles_list = analysis["cycles"]
+        order_result = analysis["order_result"]
+
+        # Imagen estática (SVG con la disposición por capas): en las vistas agregadas se
+        # dibujan solo los clústeres, para no incrustar el proyecto completo
+        view_id: Optional[str] = None
+        if view == "full":
+            image_base64 = render_graph_image(all_tasks, cycles_list)
+            graph_data = build_graph_data(custom_graph)
+        else:
+            graph_view = graph_view_service.build_view(all_tasks, view, max_cluster_size)
+            image_base64 = render_overview_image(graph_view, cycles_list)
+            graph_data = GraphData(**graph_view.overview())
+            view_id = graph_view.view_id
 
         return ProjectData(
-            duracion_total=duracion_total,
-            tareas_criticas=tareas_criticas,
+            duracion_total=order_result["total_duration_hours"],
+            tareas_criticas=order_result["critical_tasks_count"],
             ciclos_detectados=cycles_list if cycles_list else None,
-            orden_tareas=order_tasks,
+            bloques_ciclicos=analysis["cyclic_blocks"] or None,
+            orden_tareas=order_result["order"],
+            ruta_critica=analysis["critical_path"],
             image_base64=image_base64,
-            graph_data=GraphData(nodes=cytoscape_nodes, edges=cytoscape_edges)
+            graph_data=graph_data,
+            view_id=view_id
         )
 
     except Exception as e:
@@ -217,6 +265,49 @@ async def generate_plan(tasks: List[TaskInput]):
 
 
 
+# Máximo de caminos que se devuelven por petición
+MAX_RANKED_PATHS = 1000
+
+class RankedPathData(BaseModel):
+    tareas: List[str]
+    duracion_horas: float
+    holgura_horas: float # Diferencia con la ruta crítica
+
+class RankedPathsData(BaseModel):
+    duracion_ruta_critica: float # Horas
+    caminos: List[RankedPathData]
+    truncado: bool # Hay más caminos que cumplen el criterio
+
+@app.post("/critical-paths", response_model=RankedPathsData)
+async def get_critical_paths(tasks: List[TaskInput], k: int = 10, within_hours: Optional[float] = None):
+    """
+    Los k caminos más largos del proyecto o, con within_hours, los que quedan a menos de
+    ese margen de la ruta crítica (casi críticos, hasta k). El proyecto debe ser acíclico.
+    """
+    if not 1 <= k <= MAX_RANKED_PATHS:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {MAX_RANKED_PATHS}")
+    if within_hours is not None and within_hours < 0:
+        raise HTTPException(status_code=400, detail="within_hours must not be negative")
+    custom_graph, _ = build_plan_graph(tasks)
+    try:
+        result = custom_graph.longest_paths(k, within_hours * 60.0 if within_hours is not None else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    longest = result["longest_path_minutes"]
+    return RankedPathsData(
+        duracion_ruta_critica=longest / 60.0,
+        caminos=[
+            RankedPathData(
+                tareas=path["tasks"],
+                duracion_horas=path["length_minutes"] / 60.0,
+                holgura_horas=(longest - path["length_minutes"]) / 60.0
+            )
+            for path in result["paths"]
+        ],
+        truncado=result["truncated"]
+    )
+
 
 
 class CustomProjectData(BaseModel):
@@ -243,14 +334,1041 @@ async def generate_custom_plan(tasks: List[TaskInput]):
             task = task_map[t.id]
             task.dependencies = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
 
-        service = CustomService()
-        levels = service.calculate_levels(all_tasks)
-        priority_order = service.priority_ordering(all_tasks)
+        analysis = component_service.analyze(all_tasks)
 
         return CustomProjectData(
-            levels=levels,
-            priority_order=priority_order
+            levels=analysis["levels"],
+            priority_order=analysis["priority_order"]
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+class SubprojectData(BaseModel):
+    path: str
+    task_count: int
+    entries: List[str]
+    exits: List[str]
+    longest_path_hours: Optional[float] = None
+    has_cycles: bool
+    recomputed: bool
+
+class HierarchicalProjectData(BaseModel):
+    duracion_total: Optional[float] = None
+    subprojects: List[SubprojectData]
+    recomputed: List[str]
+
+@app.post("/generate-hierarchical-plan", response_model=HierarchicalProjectData)
+async def generate_hierarchical_plan(tasks: List[TaskInput]):
+    try:
+        task_map: Dict[int, Task] = {}
+        all_tasks: List[Task] = []
+        for t in tasks:
+            task = Task(
+                t.name,
+                convert_to_minutes(t.duration, t.unit),
+                "minutes",
+                t.priority,
+                [],
+                t.subproject or ""
+            )
+            task_map[t.id] = task
+            all_tasks.append(task)
+
+        for t in tasks:
+            task = task_map[t.id]
+            task.dependencies = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
+
+        # Solo se recalculan los sub-proyectos cuyo contenido (o el de sus hijos) cambió
+        analysis = subproject_service.analyze(all_tasks)
+
+        def to_hours(minutes: Optional[float]) -> Optional[float]:
+            return minutes / 60.0 if minutes is not None else None
+
+        return HierarchicalProjectData(
+            duracion_total=to_hours(analysis["root"].longest_path),
+            subprojects=[
+                SubprojectData(
+                    path=report["path"],
+                    task_count=report["task_count"],
+                    entries=report["entries"],
+                    exits=report["exits"],
+                    longest_path_hours=to_hours(report["longest_path_minutes"]),
+                    has_cycles=report["has_cycles"],
+                    recomputed=report["recomputed"]
+                )
+                for report in analysis["subprojects"]
+            ],
+            recomputed=analysis["recomputed"]
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+
+class WorkingPeriodInput(BaseModel):
+    start: str # "HH:MM"
+    end: str   # "HH:MM" ("24:00" para fin de día)
+
+# Horizonte máximo de un calendario (días); el índice crece linealmente con él
+MAX_CALENDAR_HORIZON_DAYS = 20 * 366
+
+class CalendarInput(BaseModel):
+    name: str
+    start_date: date
+    horizon_days: int = 3 * 366
+    working_days: List[int] = [0, 1, 2, 3, 4] # 0 = lunes
+    working_periods: List[WorkingPeriodInput] = [
+        WorkingPeriodInput(start="08:00", end="12:00"),
+        WorkingPeriodInput(start="13:00", end="17:00"),
+    ]
+    holidays: List[date] = []
+    hours_per_day: Optional[float] = None
+
+    @field_validator("horizon_days")
+    @classmethod
+    def validate_horizon_days(cls, value: int) -> int:
+        if not 1 <= value <= MAX_CALENDAR_HORIZON_DAYS:
+            raise ValueError(f"horizon_days must be between 1 and {MAX_CALENDAR_HORIZON_DAYS}")
+        return value
+
+class CalendarData(BaseModel):
+    name: str
+    start_date: date
+    end_date: date
+    hours_per_day: float
+    working_intervals: int
+
+class ScheduleRequest(BaseModel):
+    tasks: List[TaskInput]
+    project_start: datetime
+    calendar: Optional[str] = None # Calendario por defecto del proyecto
+    calendars: List[CalendarInput] = [] # Calendarios a registrar junto con la petición
+
+class ScheduledTaskData(BaseModel):
+    name: str
+    calendar: Optional[str] = None
+    early_start: datetime
+    early_finish: datetime
+    late_start: datetime
+    late_finish: datetime
+    slack_hours: float
+    critical: bool
+
+class ScheduleData(BaseModel):
+    project_start: datetime
+    project_finish: datetime
+    duracion_total: float # Horas transcurridas entre inicio y fin del proyecto
+    ciclos_detectados: Optional[List[List[str]]] = None
+    ruta_critica: List[str]
+    tasks: List[ScheduledTaskData]
+    schedule_id: Optional[str] = None # Usar /schedules/{schedule_id}/... para consultas por ventana
+
+class ScheduleQueryData(BaseModel):
+    schedule_id: str
+    tasks: List[ScheduledTaskData]
+
+def parse_clock(value: str) -> int:
+    """Convierte 'HH:MM' a minutos desde la medianoche."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def build_calendar(data: CalendarInput) -> WorkingCalendar:
+    """Compila un calendario laboral a su índice de sumas prefijas."""
+    periods = [(parse_clock(p.start), parse_clock(p.end)) for p in data.working_periods]
+    return WorkingCalendar(
+        data.name,
+        data.start_date,
+        data.horizon_days,
+        {day: periods for day in data.working_days},
+        data.holidays,
+        data.hours_per_day * 60 if data.hours_per_day else None
+    )
+
+def calendar_to_data(calendar: WorkingCalendar) -> CalendarData:
+    return CalendarData(
+        name=calendar.name,
+        start_date=calendar.start_date,
+        end_date=calendar.end_date,
+        hours_per_day=calendar.minutes_per_day / 60.0,
+        working_intervals=len(calendar.starts)
+    )
+
+@app.post("/calendars", response_model=CalendarData)
+async def register_calendar(data: CalendarInput):
+    try:
+        calendar = build_calendar(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    schedule_service.register_calendar(calendar)
+    return calendar_to_data(calendar)
+
+@app.get("/calendars", response_model=List[CalendarData])
+async def list_calendars():
+    return [calendar_to_data(calendar) for calendar in schedule_service.get_all_calendars()]
+
+def run_schedule(request: ScheduleRequest) -> ScheduleResult:
+    """Registra los calendarios de la petición y programa sus tareas."""
+    for data in request.calendars:
+        schedule_service.register_calendar(build_calendar(data))
+
+    task_map: Dict[int, Task] = {}
+    all_tasks: List[Task] = []
+    for t in request.tasks:
+        calendar_name = t.calendar or request.calendar
+        task = Task(
+            t.name,
+            convert_to_minutes(t.duration, t.unit, schedule_service.get_calendar(calendar_name) if calendar_name else None),
+            "minutes",
+            t.priority,
+            [],
+            t.subproject or "",
+            calendar_name
         )
+        task_map[t.id] = task
+        all_tasks.append(task)
+
+    for t in request.tasks:
+        task = task_map[t.id]
+        task.dependencies = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
+
+    return schedule_service.schedule(all_tasks, to_minutes(request.project_start), request.calendar)
+
+@app.post("/generate-schedule", response_model=ScheduleData)
+async def generate_schedule(request: ScheduleRequest):
+    try:
+        result = run_schedule(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Con ciclos no hay fechas que indexar
+    schedule_id = None if result["cycles"] else schedule_index_service.build_index(result).schedule_id
+
+    return ScheduleData(
+        project_start=from_minutes(result["project_start"]),
+        project_finish=from_minutes(result["project_finish"]),
+        duracion_total=(result["project_finish"] - result["project_start"]) / 60.0,
+        ciclos_detectados=result["cycles"] if result["cycles"] else None,
+        ruta_critica=result["critical_path"],
+        tasks=[scheduled_task_to_data(item) for item in result["tasks"]],
+        schedule_id=schedule_id
+    )
+
+def scheduled_task_to_data(item: ScheduledTask) -> ScheduledTaskData:
+    return ScheduledTaskData(
+        name=item["name"],
+        calendar=item["calendar"],
+        early_start=from_minutes(item["early_start"]),
+        early_finish=from_minutes(item["early_finish"]),
+        late_start=from_minutes(item["late_start"]),
+        late_finish=from_minutes(item["late_finish"]),
+        slack_hours=item["slack"] / 60.0,
+        critical=item["critical"]
+    )
+
+def get_schedule_index_or_404(schedule_id: str) -> ScheduleIndex:
+    index = schedule_index_service.get_index(schedule_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail=f"Schedule {schedule_id} not found or expired")
+    return index
+
+def schedule_query_data(index: ScheduleIndex, items: List[ScheduledTask]) -> ScheduleQueryData:
+    return ScheduleQueryData(schedule_id=index.schedule_id, tasks=[scheduled_task_to_data(item) for item in items])
+
+@app.get("/schedules/{schedule_id}/running", response_model=ScheduleQueryData)
+async def get_schedule_running(schedule_id: str, start: datetime, end: datetime):
+    """Tareas cuya ventana temprana se solapa con [start, end]."""
+    index = get_schedule_index_or_404(schedule_id)
+    start_minutes, end_minutes = to_minutes(start), to_minutes(end) # Admite fechas con y sin zona horaria
+    if end_minutes < start_minutes:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return schedule_query_data(index, index.running(start_minutes, end_minutes))
+
+@app.get("/schedules/{schedule_id}/at", response_model=ScheduleQueryData)
+async def get_schedule_at(schedule_id: str, moment: datetime):
+    """Tareas en ejecución en un instante."""
+    index = get_schedule_index_or_404(schedule_id)
+    return schedule_query_data(index, index.at(to_minutes(moment)))
+
+@app.get("/schedules/{schedule_id}/low-slack", response_model=ScheduleQueryData)
+async def get_schedule_low_slack(schedule_id: str, max_slack_hours: float, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Tareas con holgura menor que max_slack_hours, opcionalmente dentro de una ventana."""
+    index = get_schedule_index_or_404(schedule_id)
+    start_minutes = to_minutes(start) if start is not None else None
+    end_minutes = to_minutes(end) if end is not None else None
+    if start_minutes is not None and end_minutes is not None and end_minutes < start_minutes:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    return schedule_query_data(index, index.low_slack(max_slack_hours * 60.0, start_minutes, end_minutes))
+
+@app.get("/schedules/{schedule_id}/next", response_model=ScheduleQueryData)
+async def get_schedule_next(schedule_id: str, after: datetime, limit: int = 10):
+    """Próximas tareas en empezar después de un instante."""
+    index = get_schedule_index_or_404(schedule_id)
+    return schedule_query_data(index, index.starting_after(to_minutes(after), limit))
+
+
+
+SVG_MEDIA_TYPE = "image/svg+xml"
 
+def gantt_response(index: ScheduleIndex) -> StreamingResponse:
+    # El índice ya conserva las tareas ordenadas por inicio temprano
+    tasks = [index.tasks[i] for i in index.by_start]
+    return StreamingResponse(
+        render_gantt_svg(tasks, index.project_start, index.project_finish, "Diagrama de Gantt"),
+        media_type=SVG_MEDIA_TYPE,
+        headers={"X-Schedule-Id": index.schedule_id}
+    )
+
+@app.get("/schedules/{schedule_id}/gantt.svg")
+async def get_schedule_gantt(schedule_id: str):
+    """Diagrama de Gantt (SVG en streaming) de una programación ya calculada."""
+    return gantt_response(get_schedule_index_or_404(schedule_id))
+
+@app.post("/render/gantt.svg")
+async def render_gantt(request: ScheduleRequest):
+    """Programa el proyecto y emite su diagrama de Gantt en SVG (cabecera X-Schedule-Id)."""
+    try:
+        result = run_schedule(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result["cycles"]:
+        raise HTTPException(status_code=400, detail="Cannot draw a Gantt chart for a project with dependency cycles")
+    return gantt_response(schedule_index_service.build_index(result))
+
+@app.post("/render/graph.svg")
+async def render_graph(tasks: List[TaskInput]):
+    """
+    Grafo de dependencias en SVG, emitido en streaming a medida que se genera.
+    Resalta las tareas en ciclos o, si no hay, las de la ruta crítica.
+    """
+    custom_graph, all_tasks = build_plan_graph(tasks)
+    condensation = custom_graph.condense()
+    cyclic_blocks = condensation["cyclic_blocks"]
+    if cyclic_blocks:
+        highlighted = {name for block in cyclic_blocks for name in block}
+    else:
+        highlighted = set(condensation["critical_path"])
+    return StreamingResponse(
+        render_graph_svg(layered_layout(all_tasks), graph_title(cyclic_blocks), highlighted),
+        media_type=SVG_MEDIA_TYPE
+    )
+
+class CrashRequest(BaseModel):
+    tasks: List[TaskInput]
+    reduction: float # Cuánto acortar el proyecto
+    unit: str = "hours"
+
+    @field_validator("reduction")
+    @classmethod
+    def validate_reduction(cls, value: float) -> float:
+        if not math.isfinite(value) or value <= 0:
+            raise ValueError("reduction must be a positive finite number")
+        return value
+
+class CrashStepData(BaseModel):
+    tasks: List[str]
+    reduction_hours: float
+    cost: float
+    duracion_total: float
+    recomputed_tasks: int
+
+class CrashData(BaseModel):
+    ciclos_detectados: Optional[List[List[str]]] = None
+    duracion_inicial: float
+    duracion_total: float
+    reduccion_lograda: float
+    costo_total: float
+    pasos: List[CrashStepData]
+    duraciones: Dict[str, float] # Horas por tarea tras la compresión
+    tareas_criticas: List[str]
+
+@app.post("/crash-plan", response_model=CrashData)
+async def crash_plan(request: CrashRequest):
+    try:
+        task_map: Dict[int, Task] = {}
+        all_tasks: List[Task] = []
+        for t in request.tasks:
+            minutes_per_unit = convert_to_minutes(1, t.unit)
+            task = Task(
+                t.name,
+                t.duration * minutes_per_unit,
+                "minutes",
+                t.priority,
+                [],
+                t.subproject or "",
+                t.calendar,
+                min(t.min_duration, t.duration) * minutes_per_unit if t.min_duration is not None else None,
+                # Costo por minuto reducido
+                t.crash_cost / minutes_per_unit if t.crash_cost is not None else None
+            )
+            task_map[t.id] = task
+            all_tasks.append(task)
+
+        for t in request.tasks:
+            task = task_map[t.id]
+            task.dependencies = [task_map[dep_id].name for dep_id in t.dependencies if dep_id in task_map]
+
+        result = CrashingService().crash(all_tasks, convert_to_minutes(request.reduction, request.unit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        import traceback
+        traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+    return CrashData(
+        ciclos_detectados=result["cycles"] if result["cycles"] else None,
+        duracion_inicial=result["initial_duration"] / 60.0,
+        duracion_total=result["final_duration"] / 60.0,
+        reduccion_lograda=(result["initial_duration"] - result["final_duration"]) / 60.0,
+        costo_total=result["total_cost"],
+        pasos=[
+            CrashStepData(
+                tasks=step["tasks"],
+                reduction_hours=step["reduction"] / 60.0,
+                cost=step["cost"],
+                duracion_total=step["project_duration"] / 60.0,
+                recomputed_tasks=step["recomputed_tasks"]
+            )
+            for step in result["steps"]
+        ],
+        duraciones={name: minutes / 60.0 for name, minutes in result["durations"].items()},
+        tareas_criticas=result["critical_tasks"]
+    )
+
+
+
+# Ventana para agrupar ráfagas de ediciones del mismo cliente antes de analizar
+STREAM_COALESCE_SECONDS = 0.15
+
+class PlanStreamRequest(BaseModel):
+    request_id: Optional[Any] = None
+    tasks: List[TaskInput]
+
+def plan_stream_stages(tasks: List[TaskInput], checkpoint: Optional[ProgressCallback] = None) -> List[Tuple[str, Callable[[], Dict[str, Any]]]]:
+    """
+    Etapas del análisis en orden de costo creciente. Cada una devuelve su resultado
+    parcial (serializable a JSON) y comparte el estado calculado por las anteriores.
+    'checkpoint' se pasa como callback de avance a las etapas largas (condensación,
+    disposición e imagen) para que puedan interrumpirse a mitad (p. ej. con JobCancelled).
+    """
+    state: Dict[str, Any] = {}
+
+    def validation() -> Dict[str, Any]:
+        names = {t.id: t.name for t in tasks}
+        missing = [
+            {"task": t.name, "dependency": dep_id}
+            for t in tasks for dep_id in t.dependencies if dep_id not in names
+        ]
+        state["graph"], state["tasks"] = build_plan_graph(tasks)
+        return {
+            "task_count": len(tasks),
+            "dependency_count": sum(len(t.dependencies) for t in tasks) - len(missing),
+            "missing_dependencies": missing,
+        }
+
+    def cycles() -> Dict[str, Any]:
+        # Una sola pasada de condensación alimenta las etapas de orden, niveles y ruta crítica
+        state["condensation"] = state["graph"].condense(checkpoint)
+        state["cycles"] = state["condensation"]["cycles"]
+        return {
+            "ciclos_detectados": state["cycles"] or None,
+            "bloques_ciclicos": state["condensation"]["cyclic_blocks"] or None,
+        }
+
+    def order() -> Dict[str, Any]:
+        condensation = state["condensation"]
+        return {
+            "orden_tareas": condensation["order"],
+            "duracion_total": condensation["total_duration_hours"],
+            "tareas_criticas": condensation["critical_tasks_count"],
+        }
+
+    def levels() -> Dict[str, Any]:
+        return {
+            "levels": state["condensation"]["levels"],
+            "priority_order": CustomService().priority_ordering(state["tasks"], state["condensation"]),
+        }
+
+    def critical_path() -> Dict[str, Any]:
+        if state["cycles"]:
+            # Sin fechas ni holguras (CPM requiere un DAG): camino más largo de la condensación
+            condensation = state["condensation"]
+            return {
+                "ruta_critica": condensation["critical_path"],
+                "duracion_ruta_critica": condensation["longest_path_minutes"] / 60.0,
+                "holguras": {},
+            }
+        result = schedule_service.schedule(state["tasks"], 0.0)
+        return {
+            "ruta_critica": result["critical_path"],
+            "duracion_ruta_critica": (result["project_finish"] - result["project_start"]) / 60.0,
+            "holguras": {item["name"]: item["slack"] / 60.0 for item in result["tasks"]},
+        }
+
+    def layout() -> Dict[str, Any]:
+        state["layout"] = layered_layout(state["tasks"], checkpoint)
+        return {
+            "graph_data": build_graph_data(state["graph"]).model_dump(),
+            "positions": {name: [x, y] for name, (x, y) in zip(state["layout"]["names"], state["layout"]["positions"])},
+        }
+
+    def image() -> Dict[str, Any]:
+        return {"image_base64": render_graph_image(state["tasks"], state["cycles"], state["layout"], checkpoint)}
+
+    return [
+        ("validation", validation),
+        ("cycles", cycles),
+        ("order", order),
+        ("levels", levels),
+        ("critical_path", critical_path),
+        ("layout", layout),
+        ("image", image),
+    ]
+
+async def run_plan_stream(websocket: WebSocket, request: PlanStreamRequest, is_superseded: Callable[[], bool]):
+    """
+    Ejecuta las etapas en el threadpool y envía cada resultado en cuanto está listo.
+    Si llega una edición más reciente, se descartan el resultado en curso y las etapas
+    restantes; las etapas largas lo comprueban también en sus puntos de avance y se
+    detienen a mitad.
+    """
+    def checkpoint(fraction: float):
+        if is_superseded():
+            raise JobCancelled()
+
+    started = time.perf_counter()
+    for stage, compute in plan_stream_stages(request.tasks, checkpoint):
+        if is_superseded():
+            await websocket.send_json({"request_id": request.request_id, "stage": "superseded"})
+            return
+        try:
+            data = await run_in_threadpool(compute)
+        except JobCancelled:
+            await websocket.send_json({"request_id": request.request_id, "stage": "superseded"})
+            return
+        except Exception as e:
+            await websocket.send_json({"request_id": request.request_id, "stage": "error", "detail": str(e)})
+            return
+        if is_superseded():
+            await websocket.send_json({"request_id": request.request_id, "stage": "superseded"})
+            return
+        await websocket.send_json({
+            "request_id": request.request_id,
+            "stage": stage,
+            "data": data,
+            "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+        })
+    await websocket.send_json({
+        "request_id": request.request_id,
+        "stage": "done",
+        "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+    })
+
+@app.websocket("/ws/generate-plan")
+async def generate_plan_stream(websocket: WebSocket):
+    """
+    Análisis progresivo: el cliente envía {"request_id", "tasks"} y recibe un mensaje por etapa
+    (validation, cycles, order, levels, critical_path, layout, image) y luego "done".
+    Las ediciones rápidas se agrupan y cada petición nueva reemplaza a la que esté en curso.
+    Los mensajes que no son JSON reciben un error y la conexión sigue abierta; un fallo
+    inesperado del análisis se notifica con un error y cierra la conexión (código 1011).
+    """
+    await websocket.accept()
+    latest: Dict[str, Any] = {"generation": 0, "request": None}
+    wakeup = asyncio.Event()
+
+    async def worker():
+        request: Optional[PlanStreamRequest] = None # La petición en curso, a la que se atribuye un fallo
+        try:
+            while True:
+                await wakeup.wait()
+                # Esperar a que termine la ráfaga de ediciones y analizar solo la última
+                await asyncio.sleep(STREAM_COALESCE_SECONDS)
+                wakeup.clear()
+                generation = latest["generation"]
+                request = latest["request"]
+                await run_plan_stream(websocket, request, lambda: latest["generation"] != generation)
+        except WebSocketDisconnect:
+            pass
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            try:
+                request_id = request.request_id if request is not None else None
+                await websocket.send_json({"request_id": request_id, "stage": "error", "detail": str(e) or type(e).__name__})
+                await websocket.close(code=1011)
+            except Exception:
+                pass # El cliente ya no está conectado
+
+    worker_task = asyncio.create_task(worker())
+    try:
+        while True:
+            try:
+                message = await websocket.receive_json()
+            except ValueError as e: # JSON mal formado
+                await websocket.send_json({"request_id": None, "stage": "error", "detail": f"Invalid JSON message: {e}"})
+                continue
+            try:
+                request = PlanStreamRequest.model_validate(message)
+            except ValidationError as e:
+                request_id = message.get("request_id") if isinstance(message, dict) else None
+                await websocket.send_json({"request_id": request_id, "stage": "error", "detail": str(e)})
+                continue
+            latest["generation"] += 1
+            latest["request"] = request
+            wakeup.set()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        worker_task.cancel()
+
+
+
+# Intervalo con el que la suscripción por WebSocket revisa el estado del trabajo
+JOB_POLL_SECONDS = 0.1
+
+class JobData(BaseModel):
+    job_id: str
+    kind: str
+    status: str # queued, running, done, failed o cancelled
+    stage: Optional[str] = None
+    progress: float # Entre 0 y 1
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+def job_to_data(job: Job) -> JobData:
+    return JobData(
+        job_id=job.job_id,
+        kind=job.kind,
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        error=job.error,
+        created_at=datetime.fromtimestamp(job.created_at),
+        finished_at=datetime.fromtimestamp(job.finished_at) if job.finished_at is not None else None
+    )
+
+def get_job_or_404(job_id: str) -> Job:
+    job = job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found or expired")
+    return job
+
+def plan_job(tasks: List[TaskInput]) -> Callable[[JobContext], ProjectData]:
+    """
+    Análisis completo como trabajo en segundo plano: las mismas etapas que el análisis
+    progresivo, cada una con su tramo de avance y puntos de cancelación internos.
+    """
+    def work(context: JobContext) -> ProjectData:
+        context.stage("validation", 0.0, 0.05)
+        custom_graph, all_tasks = build_plan_graph(tasks)
+        condensation = custom_graph.condense(context.stage("order", 0.05, 0.3))
+        cycles_list = condensation["cycles"]
+        layout = layered_layout(all_tasks, context.stage("layout", 0.3, 0.55))
+        image_base64 = render_graph_image(all_tasks, cycles_list, layout, context.stage("image", 0.55, 0.9))
+        context.stage("graph_data", 0.9, 1.0)
+        graph_data = build_graph_data(custom_graph)
+        return ProjectData(
+            duracion_total=condensation["total_duration_hours"],
+            tareas_criticas=condensation["critical_tasks_count"],
+            ciclos_detectados=cycles_list or None,
+            bloques_ciclicos=condensation["cyclic_blocks"] or None,
+            orden_tareas=condensation["order"],
+            ruta_critica=condensation["critical_path"],
+            image_base64=image_base64,
+            graph_data=graph_data
+        )
+
+    return work
+
+@app.post("/jobs/generate-plan", response_model=JobData, status_code=202)
+async def submit_plan_job(tasks: List[TaskInput]):
+    """
+    Encola el análisis de /generate-plan sin mantener abierta la petición.
+    Consultar /jobs/{job_id} (o suscribirse en /ws/jobs/{job_id}) y luego /jobs/{job_id}/result.
+    """
+    try:
+        job = job_service.submit("generate-plan", plan_job(tasks))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job_to_data(job)
+
+@app.get("/jobs/{job_id}", response_model=JobData)
+async def get_job(job_id: str):
+    return job_to_data(get_job_or_404(job_id))
+
+@app.get("/jobs/{job_id}/result", response_model=ProjectData)
+async def get_job_result(job_id: str):
+    """Resultado de un trabajo terminado (se conserva hasta que expira)."""
+    job = get_job_or_404(job_id)
+    if job.status != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is {job.status}" + (f": {job.error}" if job.error else ""))
+    return job.result
+
+@app.delete("/jobs/{job_id}", response_model=JobData)
+async def cancel_job(job_id: str):
+    """Cancela el trabajo (inmediatamente si está en cola; en su siguiente punto de control si ya corre)."""
+    get_job_or_404(job_id)
+    return job_to_data(job_service.cancel(job_id))
+
+@app.websocket("/ws/jobs/{job_id}")
+async def subscribe_job(websocket: WebSocket, job_id: str):
+    """Envía el estado del trabajo cada vez que cambia y cierra la conexión cuando termina."""
+    await websocket.accept()
+    job = job_service.get(job_id)
+    if job is None:
+        await websocket.send_json({"job_id": job_id, "status": "error", "detail": f"Job {job_id} not found or expired"})
+        await websocket.close()
+        return
+    revision = -1
+    try:
+        while True:
+            # Leer 'terminado' antes de la revisión garantiza que el estado final se envía
+            finished = job.is_finished()
+            if job.revision != revision:
+                revision = job.revision
+                await websocket.send_json(job_to_data(job).model_dump(mode="json"))
+            if finished:
+                break
+            await asyncio.sleep(JOB_POLL_SECONDS)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+
+class GraphViewData(BaseModel):
+    view_id: str
+    mode: str
+    total_nodes: int
+    total_edges: int
+    total_clusters: int
+    truncated: bool = False
+    graph_data: GraphData
+
+def graph_view_to_data(graph_view, elements, truncated: bool = False) -> GraphViewData:
+    return GraphViewData(
+        view_id=graph_view.view_id,
+        mode=graph_view.mode,
+        total_nodes=len(graph_view.names),
+        total_edges=graph_view.edge_count,
+        total_clusters=len(graph_view.cluster_ids),
+        truncated=truncated,
+        graph_data=GraphData(**elements)
+    )
+
+def get_graph_view_or_404(view_id: str):
+    graph_view = graph_view_service.get_view(view_id)
+    if graph_view is None:
+        raise HTTPException(status_code=404, detail=f"View {view_id} not found or expired")
+    return graph_view
+
+@app.post("/graph-view", response_model=GraphViewData)
+async def create_graph_view(tasks: List[TaskInput], mode: str = "level", max_cluster_size: int = 200):
+    """Compila la vista agregada (un nodo por clúster con conteo de aristas entre clústeres)."""
+    try:
+        _, all_tasks = build_plan_graph(tasks)
+        graph_view = graph_view_service.build_view(all_tasks, mode, max_cluster_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return graph_view_to_data(graph_view, graph_view.overview())
+
+@app.get("/graph-view/{view_id}/cluster", response_model=GraphViewData)
+async def get_graph_view_cluster(view_id: str, cluster_id: str):
+    """Detalle de un clúster: sus tareas, aristas internas y aristas agregadas hacia los vecinos."""
+    graph_view = get_graph_view_or_404(view_id)
+    elements = graph_view.cluster_detail(cluster_id)
+    if elements is None:
+        raise HTTPException(status_code=404, detail=f"Cluster {cluster_id} not found")
+    return graph_view_to_data(graph_view, elements)
+
+@app.get("/graph-view/{view_id}/viewport", response_model=GraphViewData)
+async def get_graph_view_viewport(view_id: str, x_min: float, x_max: float, y_min: float, y_max: float, max_nodes: int = 2000):
+    """Tareas visibles en la ventana (coordenadas de la disposición por capas)."""
+    if max_nodes < 1:
+        raise HTTPException(status_code=422, detail="max_nodes must be at least 1")
+    graph_view = get_graph_view_or_404(view_id)
+    elements, truncated = graph_view.viewport(x_min, x_max, y_min, y_max, max_nodes)
+    return graph_view_to_data(graph_view, elements, truncated)
+
+
+
+# Por encima de este tamaño no se devuelven las tareas importadas en la respuesta
+MAX_EXPORTED_TASKS = 5000
+# Directorio de los proyectos importados en formato binario (se analizan con mmap)
+BINARY_PROJECT_DIR = os.environ.get("BINARY_PROJECT_DIR", os.path.join(tempfile.gettempdir(), "taskflow-projects"))
+# Retención de esos archivos: como máximo MAX_BINARY_PROJECTS y durante BINARY_PROJECT_RETENTION_SECONDS
+MAX_BINARY_PROJECTS = int(os.environ.get("MAX_BINARY_PROJECTS", "64"))
+BINARY_PROJECT_RETENTION_SECONDS = float(os.environ.get("BINARY_PROJECT_RETENTION_SECONDS", str(24 * 3600)))
+
+class ImportData(BaseModel):
+    task_count: int
+    dependency_count: int
+    skipped_rows: int
+    duplicate_count: int
+    duplicate_ids: List[str]
+    missing_count: int
+    missing_dependencies: List[str]
+    tareas_en_ciclos: int
+    niveles: int
+    duracion_total: float # Suma de duraciones en horas (como /generate-plan)
+    duracion_ruta_critica: Optional[float] = None # Camino más largo en horas (None si hay ciclos)
+    tareas_criticas: int
+    tasks: Optional[List[TaskInput]] = None # Forma TaskInput, solo si se pide y el proyecto es pequeño
+    project_file: Optional[str] = None # Con store=true: usar /binary-projects/{project_file}/analysis
+
+def binary_project_path(file_id: str) -> str:
+    return os.path.join(BINARY_PROJECT_DIR, f"{file_id}.tfpb")
+
+def prune_binary_projects():
+    """
+    Borra los proyectos binarios caducados y, si aún sobran, los más antiguos hasta
+    dejar MAX_BINARY_PROJECTS. Los archivos que otra petición ya borró o que siguen
+    abiertos (en sistemas que no permiten borrarlos) se ignoran.
+    """
+    try:
+        entries = [entry for entry in os.scandir(BINARY_PROJECT_DIR) if entry.name.endswith(".tfpb") and entry.is_file()]
+    except FileNotFoundError:
+        return
+    now = time.time()
+    files = sorted(((entry.stat().st_mtime, entry.path) for entry in entries), reverse=True) # Más recientes primero
+    for position, (modified, path) in enumerate(files):
+        if position >= MAX_BINARY_PROJECTS or now - modified > BINARY_PROJECT_RETENTION_SECONDS:
+            try:
+                os.remove(path)
+            except (FileNotFoundError, PermissionError):
+                pass
+
+def import_report_to_data(report, include_tasks: bool, store: bool = False) -> ImportData:
+    project = report["project"]
+    analysis = project.analyze()
+    tasks = None
+    if include_tasks and project.task_count() <= MAX_EXPORTED_TASKS:
+        tasks = [TaskInput(**item) for item in export_task_inputs(project)]
+    project_file = None
+    if store:
+        os.makedirs(BINARY_PROJECT_DIR, exist_ok=True)
+        project_file = uuid.uuid4().hex
+        write_binary_project(project, binary_project_path(project_file))
+        prune_binary_projects()
+    return ImportData(
+        task_count=analysis["task_count"],
+        dependency_count=analysis["dependency_count"],
+        skipped_rows=report["skipped_rows"],
+        duplicate_count=report["duplicate_count"],
+        duplicate_ids=report["duplicate_ids"],
+        missing_count=report["missing_count"],
+        missing_dependencies=report["missing_dependencies"],
+        tareas_en_ciclos=analysis["cyclic_task_count"],
+        niveles=analysis["level_count"],
+        duracion_total=analysis["total_duration_minutes"] / 60.0,
+        duracion_ruta_critica=analysis["longest_path_minutes"] / 60.0 if analysis["longest_path_minutes"] is not None else None,
+        tareas_criticas=analysis["critical_priority_count"],
+        tasks=tasks,
+        project_file=project_file
+    )
+
+@app.post("/import/csv", response_model=ImportData)
+async def import_csv_file(file: UploadFile = File(...), unit: str = "hours", include_tasks: bool = False, store: bool = False):
+    """
+    Importa un CSV (id, name, duration, unit, priority, dependencies, subproject) por bloques.
+    store=true guarda además el proyecto en formato binario para analizarlo después con mmap.
+    """
+    try:
+        report = await run_in_threadpool(import_csv, file.file, unit)
+        return await run_in_threadpool(import_report_to_data, report, include_tasks, store)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await file.close()
+
+@app.post("/import/msproject", response_model=ImportData)
+async def import_msproject_file(file: UploadFile = File(...), include_tasks: bool = False, store: bool = False):
+    """Importa un XML de MS Project de forma incremental (iterparse)."""
+    try:
+        report = await run_in_threadpool(import_msproject, file.file)
+        return await run_in_threadpool(import_report_to_data, report, include_tasks, store)
+    except ElementTree.ParseError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid XML: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        await file.close()
+
+
+
+class BinaryAnalysisData(BaseModel):
+    task_count: int
+    dependency_count: int
+    tareas_en_ciclos: int # Tareas en ciclos o que dependen de ellos
+    tareas_bloqueadas: List[str] # Muestra de esas tareas
+    niveles: int
+    duracion_total: float # Suma de duraciones en horas
+    duracion_ruta_critica: float # Camino más largo en horas (parte acíclica)
+    tareas_criticas: int
+    ruta_critica: List[str]
+    orden_tareas: List[str] # Primeras order_limit tareas del orden topológico
+
+def analyze_binary_project(file_id: str, order_limit: int) -> BinaryAnalysisData:
+    with BinaryProject(binary_project_path(file_id)) as project:
+        analysis = project.analyze()
+        return BinaryAnalysisData(
+            task_count=analysis["task_count"],
+            dependency_count=analysis["dependency_count"],
+            tareas_en_ciclos=analysis["cyclic_task_count"],
+            tareas_bloqueadas=analysis["blocked_tasks"],
+            niveles=analysis["level_count"],
+            duracion_total=analysis["total_duration_minutes"] / 60.0,
+            duracion_ruta_critica=analysis["longest_path_minutes"] / 60.0,
+            tareas_criticas=analysis["critical_priority_count"],
+            ruta_critica=analysis["critical_path"],
+            orden_tareas=[project.name(int(task)) for task in analysis["order"][:order_limit]]
+        )
+
+@app.get("/binary-projects/{file_id}/analysis", response_model=BinaryAnalysisData)
+async def get_binary_project_analysis(file_id: str, order_limit: int = 100):
+    """Analiza un proyecto importado con store=true directamente sobre el archivo mapeado."""
+    if not re.fullmatch(r"[0-9a-f]{32}", file_id):
+        raise HTTPException(status_code=400, detail="Invalid project file id")
+    try:
+        return await run_in_threadpool(analyze_binary_project, file_id, max(0, order_limit))
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Project file {file_id} not found or expired")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+class VersionCommitRequest(BaseModel):
+    tasks: List[TaskInput]
+    label: Optional[str] = None
+
+class VersionData(BaseModel):
+    version_id: int
+    parent_id: Optional[int] = None
+    label: Optional[str] = None
+    task_count: int
+    head: bool
+
+class VersionDiffData(BaseModel):
+    from_version: int
+    to_version: int
+    added_tasks: List[str]
+    removed_tasks: List[str]
+    changed_tasks: List[str]
+    added_edges: List[Tuple[str, str]] # (dependencia, tarea)
+    removed_edges: List[Tuple[str, str]]
+
+class VersionCommitData(BaseModel):
+    version: VersionData
+    diff: VersionDiffData # Cambios respecto a la versión padre
+
+class VersionAnalysisData(BaseModel):
+    version_id: int
+    duracion_total: float
+    tareas_criticas: int
+    ciclos_detectados: Optional[List[List[str]]] = None
+    bloques_ciclicos: Optional[List[List[str]]] = None
+    orden_tareas: List[str]
+    ruta_critica: List[str]
+    levels: Dict[int, List[str]]
+    reused_components: int # Componentes cuyo análisis se reutilizó de la versión anterior
+    recomputed_components: int
+
+def version_to_data(history: ProjectHistory, version: ProjectVersion) -> VersionData:
+    return VersionData(
+        version_id=version.version_id,
+        parent_id=version.parent_id,
+        label=version.label,
+        task_count=version.tasks.size(),
+        head=version.version_id == history.head
+    )
+
+def get_history_or_404(project_id: str) -> ProjectHistory:
+    history = history_service.get(project_id)
+    if history is None:
+        raise HTTPException(status_code=404, detail=f"Project {project_id} has no history")
+    return history
+
+@app.post("/projects/{project_id}/versions", response_model=VersionCommitData)
+async def commit_version(project_id: str, request: VersionCommitRequest):
+    """Registra la lista de tareas como nueva versión (solo se reescriben las tareas que cambiaron)."""
+    try:
+        all_tasks = build_tasks(request.tasks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    history = history_service.get_or_create(project_id)
+    version = history.commit_tasks(all_tasks, request.label)
+    return VersionCommitData(
+        version=version_to_data(history, version),
+        diff=VersionDiffData(**history.diff(version.parent_id, version.version_id))
+    )
+
+@app.get("/projects/{project_id}/versions", response_model=List[VersionData])
+async def list_versions(project_id: str):
+    history = get_history_or_404(project_id)
+    return [version_to_data(history, version) for version in history.versions]
+
+@app.post("/projects/{project_id}/snapshots", response_model=VersionData)
+async def create_snapshot(project_id: str, name: str, version: Optional[str] = None):
+    """Nombra una versión (por defecto la actual) para compararla o volver a ella."""
+    history = get_history_or_404(project_id)
+    try:
+        return version_to_data(history, history.snapshot(name, version))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.post("/projects/{project_id}/undo", response_model=VersionData)
+async def undo_version(project_id: str):
+    history = get_history_or_404(project_id)
+    try:
+        return version_to_data(history, history.undo())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/projects/{project_id}/checkout", response_model=VersionData)
+async def checkout_version(project_id: str, version: str):
+    history = get_history_or_404(project_id)
+    try:
+        return version_to_data(history, history.checkout(version))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.get("/projects/{project_id}/diff", response_model=VersionDiffData)
+async def diff_versions(project_id: str, from_version: str, to_version: str):
+    """Diferencia estructural entre dos versiones (id numérico o nombre de instantánea)."""
+    history = get_history_or_404(project_id)
+    try:
+        return VersionDiffData(**history.diff(from_version, to_version))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+
+@app.get("/projects/{project_id}/versions/{version}/analysis", response_model=VersionAnalysisData)
+async def analyze_version(project_id: str, version: str):
+    """Analiza una versión reutilizando los componentes que no cambiaron desde el último análisis."""
+    history = get_history_or_404(project_id)
+    try:
+        result = history.analyze(version)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    analysis = result["analysis"]
+    return VersionAnalysisData(
+        version_id=result["version_id"],
+        duracion_total=analysis["order_result"]["total_duration_hours"],
+        tareas_criticas=analysis["order_result"]["critical_tasks_count"],
+        ciclos_detectados=analysis["cycles"] or None,
+        bloques_ciclicos=analysis["cyclic_blocks"] or None,
+        orden_tareas=analysis["order_result"]["order"],
+        ruta_critica=analysis["critical_path"],
+        levels=analysis["levels"],
+        reused_components=result["reused_components"],
+        recomputed_components=result["recomputed_components"]
+    )
@@ -0,0 +1,230 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Optional, Tuple, TypedDict
+
+from task import Task
+from custom_service import CustomService
+from structures.custom_graph import CustomGraph, OrderResult
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_heap import CustomMaxHeap
+from structures.custom_union_find import CustomUnionFind
+
+# Representación compacta de una tarea para enviarla a otro proceso:
+# (nombre, duración, unidad, prioridad, dependencias)
+TaskRow = Tuple[str, float, str, str, List[str]]
+
+class ComponentResult(TypedDict):
+    cycles: List[List[str]]
+    cyclic_blocks: List[List[str]]
+    order_result: OrderResult
+    levels: Dict[int, List[str]]
+    critical_path: List[str]
+    longest_path_minutes: float
+    priority_order: List[str]
+
+class ProjectAnalysis(TypedDict):
+    components: int
+    cycles: List[List[str]]
+    cyclic_blocks: List[List[str]]
+    order_result: OrderResult
+    levels: Dict[int, List[str]]
+    critical_path: List[str]
+    longest_path_minutes: float
+    priority_order: List[str]
+
+def _to_row(task: Task) -> TaskRow:
+    return (task.name, task.duration, task.duration_unit, task.priority, list(task.dependencies))
+
+def _analyze_component(rows: List[TaskRow]) -> ComponentResult:
+    """
+    Ejecuta el análisis completo sobre un componente. Orden, niveles y camino crítico salen
+    de una sola pasada sobre la condensación, así que también existen si hay ciclos; se
+    reporta un ciclo por bloque cíclico (sin recursión, apto para proyectos profundos).
+    """
+    tasks = [Task(name, duration, unit, priority, deps) for name, duration, unit, priority, deps in rows]
+
+    graph = CustomGraph(capacity=len(tasks) * 2)
+    for task in tasks:
+        graph.add_node(task.name, data=task)
+    for task in tasks:
+        for dep_name in task.dependencies:
+            if graph.get_node(dep_name):
+                graph.add_edge(dep_name, task.name)
+
+    condensation = graph.condense()
+
+    return {
+        "cycles": condensation["cycles"],
+        "cyclic_blocks": condensation["cyclic_blocks"],
+        "order_result": {
+            "order": condensation["order"],
+            "total_duration_hours": condensation["total_duration_hours"],
+            "critical_tasks_count": condensation["critical_tasks_count"],
+        },
+        "levels": condensation["levels"],
+        "critical_path": condensation["critical_path"],
+        "longest_path_minutes": condensation["longest_path_minutes"],
+        "priority_order": CustomService().priority_ordering(tasks, condensation),
+    }
+
+def _analyze_batch(batch: List[Tuple[int, List[TaskRow]]]) -> List[Tuple[int, ComponentResult]]:
+    """Punto de entrada de los procesos trabajadores: analiza un lote de componentes."""
+    return [(index, _analyze_component(rows)) for index, rows in batch]
+
+class _MergeCursor:
+    """Cabeza de la lista de prioridades de un componente durante la mezcla k-vías."""
+    def __init__(self, component: int, position: int, priority: str):
+        self.component = component
+        self.position = position
+        self.priority = priority
+
+class ComponentService:
+    """
+    Servicio que descompone el proyecto en componentes débilmente conexos
+    (Union-Find) y los analiza en paralelo en un pool de procesos.
+    Los resultados se combinan en la misma forma que produce el análisis monolítico.
+    """
+    def __init__(self, max_workers: Optional[int] = None, parallel_threshold: int = 5000):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        # Por debajo de este número de tareas el costo del pool supera la ganancia
+        self.parallel_threshold = parallel_threshold
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def shutdown(self):
+        """Libera el pool de procesos si fue creado."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def split_components(self, tasks: List[Task]) -> List[List[Task]]:
+        """
+        Agrupa las tareas en componentes débilmente conexos usando Union-Find.
+        Los componentes conservan el orden en que aparecen sus tareas en la entrada.
+        """
+        task_map = CustomHashTable(capacity=len(tasks) * 2)
+        union_find = CustomUnionFind(capacity=len(tasks) * 2)
+        for task in tasks:
+            task_map.put(task.name, task)
+            union_find.add(task.name)
+
+        for task in tasks:
+            for dep_name in task.dependencies:
+                if task_map.contains(dep_name):
+                    union_find.union(dep_name, task.name)
+
+        return [[task_map.get(name) for name in group] for group in union_find.groups()]
+
+    def _make_batches(self, components: List[List[Task]]) -> List[List[Tuple[int, List[TaskRow]]]]:
+        """
+        Reparte los componentes en lotes de tamaño similar (mayor primero al lote más liviano)
+        para reducir la comunicación entre procesos cuando hay muchos componentes pequeños.
+        """
+        batch_count = min(len(components), self.max_workers * 4)
+        batches: List[List[Tuple[int, List[TaskRow]]]] = [[] for _ in range(batch_count)]
+        loads = [0] * batch_count
+
+        by_size = sorted(range(len(components)), key=lambda i: len(components[i]), reverse=True)
+        for index in by_size:
+            lightest = loads.index(min(loads))
+            batches[lightest].append((index, [_to_row(task) for task in components[index]]))
+            loads[lightest] += len(components[index])
+        return batches
+
+    def analyze(self, tasks: List[Task]) -> ProjectAnalysis:
+        """Analiza el proyecto por componentes y combina los resultados."""
+        components = self.split_components(tasks)
+        return self.merge(tasks, self.analyze_components(components))
+
+    def analyze_components(
+        self,
+        components: List[List[Task]],
+        cached: Optional[List[Optional[ComponentResult]]] = None,
+    ) -> List[ComponentResult]:
+        """
+        Analiza cada componente (en paralelo si el proyecto es grande).
+        'cached' permite pasar resultados ya conocidos por posición; solo se analizan
+        los componentes cuyo resultado es None.
+        """
+        results: List[Optional[ComponentResult]] = list(cached) if cached else [None] * len(components)
+        pending = [index for index, result in enumerate(results) if result is None]
+        pending_tasks = sum(len(components[index]) for index in pending)
+
+        if len(pending) > 1 and pending_tasks >= self.parallel_threshold:
+            executor = self._get_executor()
+            batches = self._make_batches([components[index] for index in pending])
+            for batch_result in executor.map(_analyze_batch, batches):
+                for position, result in batch_result:
+                    results[pending[position]] = result
+        else:
+            for index in pending:
+                results[index] = _analyze_component([_to_row(task) for task in components[index]])
+
+        return results
+
+    def merge(self, tasks: List[Task], results: List[ComponentResult]) -> ProjectAnalysis:
+        """Combina los resultados por componente en un único análisis del proyecto."""
+        cycles: List[List[str]] = []
+        cyclic_blocks: List[List[str]] = []
+        levels: Dict[int, List[str]] = {}
+        order: List[str] = []
+        total_duration_hours = 0.0
+        critical_tasks_count = 0
+        # El camino crítico del proyecto es el más largo entre los componentes
+        longest: Optional[ComponentResult] = None
+
+        for result in results:
+            cycles.extend(result["cycles"])
+            cyclic_blocks.extend(result["cyclic_blocks"])
+            for level, names in result["levels"].items():
+                if level not in levels:
+                    levels[level] = []
+                levels[level].extend(names)
+            order.extend(result["order_result"]["order"])
+            total_duration_hours += result["order_result"]["total_duration_hours"]
+            critical_tasks_count += result["order_result"]["critical_tasks_count"]
+            if longest is None or result["longest_path_minutes"] > longest["longest_path_minutes"]:
+                longest = result
+
+        return {
+            "components": len(results),
+            "cycles": cycles,
+            "cyclic_blocks": cyclic_blocks,
+            "order_result": {
+                "order": order,
+                "total_duration_hours": total_duration_hours,
+                "critical_tasks_count": critical_tasks_count,
+            },
+            "levels": dict(sorted(levels.items())),
+            "critical_path": longest["critical_path"] if longest else [],
+            "longest_path_minutes": longest["longest_path_minutes"] if longest else 0.0,
+            "priority_order": self._merge_priority_orders(tasks, [r["priority_order"] for r in results]),
+        }
+
+    def _merge_priority_orders(self, tasks: List[Task], orders: List[List[str]]) -> List[str]:
+        """
+        Mezcla k-vías de los órdenes por prioridad de cada componente usando el Heap:
+        en cada paso se toma la cabeza disponible de mayor prioridad, como haría Kahn global.
+        """
+        task_map = CustomHashTable(capacity=len(tasks) * 2)
+        for task in tasks:
+            task_map.put(task.name, task)
+
+        heap = CustomMaxHeap()
+        for component, names in enumerate(orders):
+            if names:
+                heap.insert(_MergeCursor(component, 0, task_map.get(names[0]).priority))
+
+        merged: List[str] = []
+        while not heap.is_empty():
+            cursor = heap.extract_max()
+            names = orders[cursor.component]
+            merged.append(names[cursor.position])
+            next_position = cursor.position + 1
+            if next_position < len(names):
+                heap.insert(_MergeCursor(cursor.component, next_position, task_map.get(names[next_position]).priority))
+        return merged
@@ -0,0 +1,289 @@
+import math
+from typing import List, Dict, Optional, Tuple, TypedDict
+
+from task import Task
+from schedule_service import build_index_graph, topological_order, find_cycles
+from structures.custom_heap import CustomMaxHeap
+from structures.custom_flow_network import CustomFlowNetwork, INFINITY
+
+EPSILON = 1e-6
+
+class IncrementalCriticalPath:
+    """
+    Ruta crítica mantenida de forma incremental sobre un DAG indexado.
+    Para cada nodo guarda head (camino más largo que termina en él) y tail (camino
+    más largo que empieza en él); la longitud del camino más largo que pasa por v es
+    head[v] + tail[v] - dur[v]. Al cambiar duraciones solo se recorren los descendientes
+    (head) y ancestros (tail) cuyos valores cambian realmente, en orden topológico.
+    """
+    def __init__(self, durations: List[float], predecessors: List[List[int]], successors: List[List[int]], order: List[int]):
+        count = len(durations)
+        self.durations = list(durations)
+        self.predecessors = predecessors
+        self.successors = successors
+        self.rank = [0] * count
+        for position, node in enumerate(order):
+            self.rank[node] = position
+
+        self.head = [0.0] * count
+        self.tail = [0.0] * count
+        for node in order:
+            self.head[node] = self.durations[node] + max((self.head[p] for p in predecessors[node]), default=0.0)
+        for node in reversed(order):
+            self.tail[node] = self.durations[node] + max((self.tail[s] for s in successors[node]), default=0.0)
+
+        # Heap perezoso de (longitud por el nodo, nodo, versión): las entradas obsoletas se descartan al extraer
+        self._version = [0] * count
+        self._through = CustomMaxHeap(key=lambda entry: entry[0])
+        for node in range(count):
+            self._through.insert((self.through(node), node, 0))
+        self._queued = [False] * count
+
+    def through(self, node: int) -> float:
+        """Longitud del camino más largo que pasa por el nodo."""
+        return self.head[node] + self.tail[node] - self.durations[node]
+
+    def _is_valid(self, entry: Tuple[float, int, int]) -> bool:
+        return entry[2] == self._version[entry[1]]
+
+    def length(self) -> float:
+        """Longitud del camino más largo del proyecto."""
+        while not self._through.is_empty():
+            entry = self._through.peek()
+            if self._is_valid(entry):
+                return entry[0]
+            self._through.extract_max()
+        return 0.0
+
+    def critical_nodes(self) -> Tuple[List[int], Optional[float]]:
+        """
+        Devuelve los nodos críticos y la siguiente longitud por debajo de la crítica
+        (None si todos los nodos son críticos). Solo extrae del heap las entradas críticas.
+        """
+        longest = self.length()
+        critical: List[int] = []
+        kept: List[Tuple[float, int, int]] = []
+        next_value = None
+        while not self._through.is_empty():
+            entry = self._through.extract_max()
+            if not self._is_valid(entry):
+                continue
+            kept.append(entry)
+            if entry[0] < longest - EPSILON:
+                next_value = entry[0]
+                break
+            critical.append(entry[1])
+        for entry in kept:
+            self._through.insert(entry)
+        return critical, next_value
+
+    def is_critical_edge(self, source: int, target: int) -> bool:
+        """Una arista es crítica si forma parte de algún camino más largo."""
+        return abs(self.head[source] + self.tail[target] - self.length()) <= EPSILON
+
+    def update_durations(self, changes: List[Tuple[int, float]]) -> int:
+        """
+        Aplica nuevas duraciones y propaga head hacia los descendientes y tail hacia
+        los ancestros, deteniéndose donde los valores no cambian.
+        Devuelve el número de nodos recalculados (tamaño de la región afectada).
+        """
+        touched: List[int] = []
+        seen: Dict[int, bool] = {}
+
+        def touch(node: int):
+            if node not in seen:
+                seen[node] = True
+                touched.append(node)
+
+        for node, duration in changes:
+            self.durations[node] = duration
+            touch(node)
+
+        # Descendientes en orden topológico creciente
+        forward = CustomMaxHeap(key=lambda node: -self.rank[node])
+        for node, _ in changes:
+            if not self._queued[node]:
+                self._queued[node] = True
+                forward.insert(node)
+        while not forward.is_empty():
+            node = forward.extract_max()
+            self._queued[node] = False
+            value = self.durations[node] + max((self.head[p] for p in self.predecessors[node]), default=0.0)
+            if abs(value - self.head[node]) > EPSILON:
+                self.head[node] = value
+                touch(node)
+                for successor in self.successors[node]:
+                    if not self._queued[successor]:
+                        self._queued[successor] = True
+                        forward.insert(successor)
+
+        # Ancestros en orden topológico decreciente
+        backward = CustomMaxHeap(key=lambda node: self.rank[node])
+        for node, _ in changes:
+            if not self._queued[node]:
+                self._queued[node] = True
+                backward.insert(node)
+        while not backward.is_empty():
+            node = backward.extract_max()
+            self._queued[node] = False
+            value = self.durations[node] + max((self.tail[s] for s in self.successors[node]), default=0.0)
+            if abs(value - self.tail[node]) > EPSILON:
+                self.tail[node] = value
+                touch(node)
+                for predecessor in self.predecessors[node]:
+                    if not self._queued[predecessor]:
+                        self._queued[predecessor] = True
+                        backward.insert(predecessor)
+
+        for node in touched:
+            self._version[node] += 1
+            self._through.insert((self.through(node), node, self._version[node]))
+        return len(touched)
+
+class CrashStep(TypedDict):
+    tasks: List[str]
+    reduction: float # Minutos acortados en este paso
+    cost: float
+    project_duration: float
+    recomputed_tasks: int
+
+class CrashResult(TypedDict):
+    cycles: List[List[str]]
+    initial_duration: float
+    final_duration: float
+    target_reduction: float
+    total_cost: float
+    steps: List[CrashStep]
+    durations: Dict[str, float]
+    critical_tasks: List[str]
+
+class CrashingService:
+    """
+    Optimizador tiempo-costo (compresión o "crashing" del proyecto).
+    En cada paso acorta el conjunto de tareas críticas más barato que corta todas las
+    rutas críticas (corte mínimo en la subred crítica, vía flujo máximo) y actualiza la
+    ruta crítica de forma incremental. No deshace compresiones previas, así que el
+    resultado es óptimo por pasos y cercano al óptimo global.
+    """
+    def crash(self, tasks: List[Task], target_reduction: float) -> CrashResult:
+        """
+        Acorta el proyecto hasta 'target_reduction' minutos (o lo máximo posible).
+        Cada tarea usa task.min_duration (minutos) y task.crash_cost (costo por minuto);
+        las tareas sin costo de compresión no se pueden acortar. Una duración mínima o un
+        costo negativo (o no finito) lanza ValueError.
+        """
+        for task in tasks:
+            for field, value in (("min_duration", task.min_duration), ("crash_cost", task.crash_cost)):
+                if value is not None and not (math.isfinite(value) and value >= 0):
+                    raise ValueError(f"Task '{task.name}': {field} must be a non-negative finite number")
+        predecessors, successors = build_index_graph(tasks)
+        order = topological_order(successors)
+        if len(order) < len(tasks):
+            return {
+                "cycles": find_cycles(tasks, predecessors),
+                "initial_duration": 0.0,
+                "final_duration": 0.0,
+                "target_reduction": target_reduction,
+                "total_cost": 0.0,
+                "steps": [],
+                "durations": {task.name: task.duration for task in tasks},
+                "critical_tasks": [],
+            }
+
+        limits = [
+            task.min_duration if task.crash_cost is not None and task.min_duration is not None else task.duration
+            for task in tasks
+        ]
+        state = IncrementalCriticalPath([task.duration for task in tasks], predecessors, successors, order)
+        initial_duration = state.length()
+
+        steps: List[CrashStep] = []
+        total_cost = 0.0
+        remaining = target_reduction
+        while remaining > EPSILON:
+            critical, next_value = state.critical_nodes()
+            longest = state.length()
+            cut, cost_per_minute = self._cheapest_cut(tasks, state, critical, limits)
+            if not cut:
+                break # Alguna ruta crítica ya no admite más compresión (o no hay tareas)
+
+            reduction = remaining
+            for node in cut:
+                reduction = min(reduction, state.durations[node] - limits[node])
+            if next_value is not None:
+                # No acortar más allá del punto en que otra ruta se vuelve crítica
+                reduction = min(reduction, longest - next_value)
+            # Ni más allá del punto en que lo hace una arista no crítica entre tareas críticas
+            reduction = min(reduction, self._edge_slack(state, critical, longest))
+            if reduction <= EPSILON:
+                break
+
+            recomputed = state.update_durations([(node, state.durations[node] - reduction) for node in cut])
+            achieved = longest - state.length()
+            step_cost = reduction * cost_per_minute
+            total_cost += step_cost
+            remaining -= achieved
+            steps.append({
+                "tasks": [tasks[node].name for node in cut],
+                "reduction": achieved,
+                "cost": step_cost,
+                "project_duration": state.length(),
+                "recomputed_tasks": recomputed,
+            })
+            if achieved <= EPSILON:
+                break
+
+        critical, _ = state.critical_nodes()
+        return {
+            "cycles": [],
+            "initial_duration": initial_duration,
+            "final_duration": state.length(),
+            "target_reduction": target_reduction,
+            "total_cost": total_cost,
+            "steps": steps,
+            "durations": {task.name: state.durations[position] for position, task in enumerate(tasks)},
+            "critical_tasks": [tasks[node].name for node in sorted(critical, key=lambda n: state.rank[n])],
+        }
+
+    def _edge_slack(self, state: IncrementalCriticalPath, critical: List[int], longest: float) -> float:
+        """
+        Menor holgura de las aristas no críticas entre tareas críticas: el camino por
+        (u, v) mide head[u] + tail[v] y puede no acortarse con el corte, así que el paso
+        no debe superar L - (head[u] + tail[v]). Las demás aristas ya las acota next_value.
+        """
+        is_critical = {node: True for node in critical}
+        slack = INFINITY
+        for node in critical:
+            for successor in state.successors[node]:
+                if successor in is_critical and not state.is_critical_edge(node, successor):
+                    slack = min(slack, longest - (state.head[node] + state.tail[successor]))
+        return slack
+
+    def _cheapest_cut(self, tasks: List[Task], state: IncrementalCriticalPath, critical: List[int], limits: List[float]) -> Tuple[Optional[List[int]], float]:
+        """
+        Corte mínimo de nodos en la subred crítica: cada tarea se divide en (entrada, salida)
+        con capacidad igual a su costo por minuto (infinita si ya no se puede acortar).
+        """
+        local: Dict[int, int] = {node: position for position, node in enumerate(critical)}
+        source = 2 * len(critical)
+        sink = source + 1
+        network = CustomFlowNetwork(sink + 1)
+
+        for position, node in enumerate(critical):
+            crashable = tasks[node].crash_cost is not None and state.durations[node] - limits[node] > EPSILON
+            network.add_edge(2 * position, 2 * position + 1, tasks[node].crash_cost if crashable else INFINITY)
+            if abs(state.head[node] - state.durations[node]) <= EPSILON:
+                network.add_edge(source, 2 * position, INFINITY)
+            if abs(state.tail[node] - state.durations[node]) <= EPSILON:
+                network.add_edge(2 * position + 1, sink, INFINITY)
+            for successor in state.successors[node]:
+                if successor in local and state.is_critical_edge(node, successor):
+                    network.add_edge(2 * position + 1, 2 * local[successor], INFINITY)
+
+        cost = network.max_flow(source, sink)
+        if cost == INFINITY:
+            return None, 0.0
+
+        reachable = network.reachable_from(source)
+        cut = [node for position, node in enumerate(critical) if reachable[2 * position] and not reachable[2 * position + 1]]
+        return cut, cost
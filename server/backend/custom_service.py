@@ -1,8 +1,8 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from task import Task
-from structures.custom_queue import CustomQueue
 from structures.custom_hash_table import CustomHashTable
 from structures.custom_heap import CustomMaxHeap
+from structures.custom_graph import CustomGraph, CondensationResult
 
 class CustomService:
     """
@@ -18,119 +18,77 @@ class CustomService:
             task_map.put(task.name, task)
         return task_map
 
+    def _build_graph(self, tasks: List[Task]) -> CustomGraph:
+        """Grafo de dependencias (se ignoran las dependencias a tareas inexistentes)."""
+        graph = CustomGraph(capacity=len(tasks) * 2)
+        for task in tasks:
+            graph.add_node(task.name, data=task)
+        for task in tasks:
+            for dep_name in task.dependencies:
+                if graph.get_node(dep_name):
+                    graph.add_edge(dep_name, task.name)
+        return graph
+
     def calculate_levels(self, tasks: List[Task]) -> Dict[int, List[str]]:
         """
-        Calcula los niveles de las tareas usando BFS y una Cola personalizada.
+        Calcula los niveles de las tareas sobre la condensación del grafo.
         Nivel 0: Tareas sin dependencias.
         Nivel N: Tareas que dependen de tareas del nivel N-1.
+        Las tareas de un ciclo forman un bloque que ocupa un solo nivel, así que ni
+        ellas ni las que dependen de ellas se pierden.
         """
-        task_map = self.build_task_map(tasks)
-        
-        # Calcular grado de entrada (in-degree) para cada tarea
-        in_degree = CustomHashTable(capacity=len(tasks) * 2)
-        graph = CustomHashTable(capacity=len(tasks) * 2) # Lista de adyacencia
-
-        for task in tasks:
-            if not in_degree.contains(task.name):
-                in_degree.put(task.name, 0)
-            
-            # Asegurar que todas las tareas estén en el grafo
-            if not graph.contains(task.name):
-                graph.put(task.name, [])
-
-            for dep_name in task.dependencies:
-                # Incrementar in-degree de la tarea actual
-                current_degree = in_degree.get(task.name)
-                in_degree.put(task.name, current_degree + 1)
-
-                # Construir grafo: dep -> [tareas que dependen de dep]
-                if not graph.contains(dep_name):
-                    graph.put(dep_name, [])
-                
-                neighbors = graph.get(dep_name)
-                neighbors.append(task.name)
-                graph.put(dep_name, neighbors)
-
-        # Cola para BFS
-        queue = CustomQueue()
-        
-        # Añadir tareas con in-degree 0 a la cola (Nivel 0)
-        for task in tasks:
-            if in_degree.get(task.name) == 0:
-                queue.enqueue((task.name, 0)) # (nombre_tarea, nivel)
-
-        levels: Dict[int, List[str]] = {}
-
-        while not queue.is_empty():
-            task_name, level = queue.dequeue()
+        return self._build_graph(tasks).condense()["levels"]
 
-            if level not in levels:
-                levels[level] = []
-            levels[level].append(task_name)
-
-            # Reducir in-degree de los vecinos
-            neighbors = graph.get(task_name)
-            if neighbors:
-                for neighbor_name in neighbors:
-                    current_degree = in_degree.get(neighbor_name)
-                    new_degree = current_degree - 1
-                    in_degree.put(neighbor_name, new_degree)
-
-                    if new_degree == 0:
-                        queue.enqueue((neighbor_name, level + 1))
-
-        return levels
-
-    def priority_ordering(self, tasks: List[Task]) -> List[str]:
+    def priority_ordering(self, tasks: List[Task], condensation: Optional[CondensationResult] = None) -> List[str]:
         """
-        Ordena las tareas usando el algoritmo de Kahn modificado con un Heap de Prioridad.
+        Ordena las tareas usando el algoritmo de Kahn modificado con un Heap de Prioridad,
+        sobre la condensación del grafo: cada ciclo es un bloque que entra al heap con la
+        prioridad de su tarea más urgente y emite sus tareas de mayor a menor prioridad.
+        Así ni las tareas en ciclos ni las que dependen de ellas quedan fuera del orden.
+        Si ya se calculó la condensación de estas tareas, se reutiliza en vez de repetirla.
         """
-        in_degree = CustomHashTable(capacity=len(tasks) * 2)
-        graph = CustomHashTable(capacity=len(tasks) * 2)
-
-        # Inicialización similar a calculate_levels
-        for task in tasks:
-            if not in_degree.contains(task.name):
-                in_degree.put(task.name, 0)
-            if not graph.contains(task.name):
-                graph.put(task.name, [])
-
-            for dep_name in task.dependencies:
-                current_degree = in_degree.get(task.name)
-                in_degree.put(task.name, current_degree + 1)
-
-                if not graph.contains(dep_name):
-                    graph.put(dep_name, [])
-                neighbors = graph.get(dep_name)
-                neighbors.append(task.name)
-                graph.put(dep_name, neighbors)
-
-        # Heap de Prioridad en lugar de Cola
-        heap = CustomMaxHeap()
+        if condensation is None:
+            condensation = self._build_graph(tasks).condense()
+        blocks = condensation["blocks"]
+        successors = condensation["block_successors"]
         task_map = self.build_task_map(tasks)
-
-        # Añadir tareas iniciales al heap
+        priority_map = CustomMaxHeap().priority_map
+
+        def rank(task: Task) -> int:
+            return priority_map.get(task.priority, 0)
+
+        members = [
+            sorted((task_map.get(name) for name in names), key=rank, reverse=True)
+            for names in blocks
+        ]
+        heap = CustomMaxHeap(key=lambda block: rank(members[block][0]))
+
+        block_of = CustomHashTable(capacity=len(tasks) * 2)
+        for index, names in enumerate(blocks):
+            for name in names:
+                block_of.put(name, index)
+
+        # Grado de entrada de cada bloque (solo aristas entre bloques distintos)
+        in_degree = [0] * len(blocks)
+        for targets in successors:
+            for target in targets:
+                in_degree[target] += 1
+
+        # Bloques iniciales en el orden de entrada de sus tareas
+        queued = [False] * len(blocks)
         for task in tasks:
-            if in_degree.get(task.name) == 0:
-                heap.insert(task)
+            block = block_of.get(task.name)
+            if in_degree[block] == 0 and not queued[block]:
+                queued[block] = True
+                heap.insert(block)
 
         ordered_tasks = []
-
         while not heap.is_empty():
-            current_task = heap.extract_max()
-            ordered_tasks.append(current_task.name)
-
-            neighbors = graph.get(current_task.name)
-            if neighbors:
-                for neighbor_name in neighbors:
-                    current_degree = in_degree.get(neighbor_name)
-                    new_degree = current_degree - 1
-                    in_degree.put(neighbor_name, new_degree)
+            block = heap.extract_max()
+            ordered_tasks.extend(task.name for task in members[block])
+            for target in successors[block]:
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    heap.insert(target)
 
-                    if new_degree == 0:
-                        neighbor_task = task_map.get(neighbor_name)
-                        if neighbor_task:
-                            heap.insert(neighbor_task)
-        
-        # Si no se ordenaron todas las tareas, hay un ciclo (aunque aquí asumimos que se valida antes)
         return ordered_tasks
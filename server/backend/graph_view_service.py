@@ -0,0 +1,290 @@
+import hashlib
+from typing import List, Dict, Any, Optional, Tuple, TypedDict
+
+from task import Task
+from component_service import ComponentService
+from schedule_service import build_index_graph, topological_order
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_queue import CustomQueue
+
+VIEW_MODES = ("level", "component", "subproject")
+
+# Separación entre columnas (niveles) y filas de la disposición por capas
+COLUMN_SPACING = 300.0
+ROW_SPACING = 80.0
+# Máximo de clústeres de una vista agregada; por encima se unen grupos vecinos
+MAX_CLUSTERS = 200
+
+def compute_layers(predecessors: List[List[int]], successors: List[List[int]]) -> Tuple[List[int], List[int], List[List[int]]]:
+    """
+    Disposición por capas en O(n + m): el nivel es el camino más largo en aristas desde
+    una tarea inicial (-1 para tareas en ciclos) y la fila, el índice dentro del nivel.
+    Devuelve (level, row, level_members); level_members[0] agrupa las tareas cíclicas y
+    level_members[l + 1] el nivel l.
+    """
+    count = len(successors)
+    level = [-1] * count
+    for node in topological_order(successors):
+        level[node] = max((level[p] + 1 for p in predecessors[node]), default=0)
+
+    level_members: List[List[int]] = [[] for _ in range(max(level, default=-1) + 2)]
+    row = [0] * count
+    for node in range(count):
+        members = level_members[level[node] + 1]
+        row[node] = len(members)
+        members.append(node)
+    return level, row, level_members
+
+class ViewElements(TypedDict):
+    nodes: List[Dict[str, Any]]
+    edges: List[Dict[str, Any]]
+
+class GraphView:
+    """
+    Vista compilada de un proyecto para mostrarlo por niveles de detalle.
+    Cada tarea tiene un clúster (según el modo) y una posición en una disposición por
+    capas (columna = nivel topológico, fila = índice dentro del nivel), lo que permite
+    responder consultas de clúster o de ventana visible sin recorrer todo el proyecto.
+    """
+    def __init__(self, view_id: str, mode: str, tasks: List[Task], max_cluster_size: int, max_clusters: int = MAX_CLUSTERS):
+        self.view_id = view_id
+        self.mode = mode
+        self.names = [task.name for task in tasks]
+        self.durations = [task.duration for task in tasks]
+        self.priorities = [task.priority for task in tasks]
+        self.predecessors, self.successors = build_index_graph(tasks)
+        self.edge_count = sum(len(targets) for targets in self.successors)
+
+        count = len(tasks)
+        self.level, self.row, self.level_members = compute_layers(self.predecessors, self.successors)
+
+        # Clústeres: grupos según el modo, partidos en bloques y unidos hasta max_clusters
+        clusters = self._clusters(self._groups(tasks), max_cluster_size, max(1, max_clusters))
+        self.cluster_ids: List[str] = []
+        self.cluster_labels: List[str] = []
+        self.cluster_members: List[List[int]] = []
+        self.cluster_of = [0] * count
+        self.cluster_index = CustomHashTable(capacity=max(16, len(clusters) * 2))
+        for cluster_id, label, members in clusters:
+            self.cluster_index.put(cluster_id, len(self.cluster_ids))
+            for node in members:
+                self.cluster_of[node] = len(self.cluster_ids)
+            self.cluster_ids.append(cluster_id)
+            self.cluster_labels.append(label)
+            self.cluster_members.append(members)
+
+    @staticmethod
+    def _clusters(groups: List[Tuple[str, str, List[int]]], max_cluster_size: int, max_clusters: int) -> List[Tuple[str, str, List[int]]]:
+        """
+        Parte cada grupo en bloques de hasta max_cluster_size tareas. Si salen más de
+        max_clusters, une bloques consecutivos (niveles contiguos, componentes o
+        subproyectos pequeños vecinos) mientras no superen un límite que parte del
+        tamaño medio necesario y se duplica hasta cumplir el presupuesto.
+        """
+        total = sum(len(members) for _, _, members in groups)
+        limit = max(1, -(-total // max_clusters))
+        while True:
+            size = max(max_cluster_size, limit)
+            pieces: List[Tuple[str, str, List[int]]] = []
+            for key, label, members in groups:
+                chunks = [members[i:i + size] for i in range(0, len(members), size)]
+                for position, chunk in enumerate(chunks):
+                    if len(chunks) > 1:
+                        pieces.append((f"{key}#{position}", f"{label} ({position + 1}/{len(chunks)})", chunk))
+                    else:
+                        pieces.append((key, label, chunk))
+            if len(pieces) <= max_clusters:
+                return pieces
+
+            # Cada unión guarda la primera y la última pieza para su clave y etiqueta
+            merged: List[Tuple[str, str, str, str, List[int]]] = []
+            for key, label, members in pieces:
+                if merged and len(merged[-1][4]) + len(members) <= limit:
+                    first_key, first_label, _, _, combined = merged[-1]
+                    combined.extend(members)
+                    merged[-1] = (first_key, first_label, key, label, combined)
+                else:
+                    merged.append((key, label, key, label, list(members)))
+            if len(merged) <= max_clusters:
+                return [
+                    (first_key, first_label, members) if first_key == last_key
+                    else (f"{first_key}..{last_key}", f"{first_label} – {last_label}", members)
+                    for first_key, first_label, last_key, last_label, members in merged
+                ]
+            limit *= 2
+
+    def _groups(self, tasks: List[Task]) -> List[Tuple[str, str, List[int]]]:
+        """Grupos (clave, etiqueta, miembros) antes de partirlos por tamaño."""
+        if self.mode == "level":
+            groups = []
+            for index, members in enumerate(self.level_members):
+                if members:
+                    level = index - 1
+                    groups.append((f"level:{level}", "Ciclos" if level < 0 else f"Nivel {level}", members))
+            return groups
+
+        if self.mode == "component":
+            position = CustomHashTable(capacity=len(tasks) * 2 + 1)
+            for node, task in enumerate(tasks):
+                position.put(task.name, node)
+            components = ComponentService().split_components(tasks)
+            return [
+                (f"component:{i}", f"Componente {i + 1}", [position.get(task.name) for task in component])
+                for i, component in enumerate(components)
+            ]
+
+        groups: Dict[str, List[int]] = {}
+        for node, task in enumerate(tasks):
+            path = task.subproject or ""
+            if path not in groups:
+                groups[path] = []
+            groups[path].append(node)
+        return [(f"subproject:{path}", path or "(raíz)", members) for path, members in groups.items()]
+
+    def position(self, node: int) -> Dict[str, float]:
+        return {"x": (self.level[node] + 1) * COLUMN_SPACING, "y": self.row[node] * ROW_SPACING}
+
+    def _task_element(self, node: int) -> Dict[str, Any]:
+        return {
+            "data": {
+                "id": self.names[node],
+                "label": self.names[node],
+                "priority": self.priorities[node],
+                "duration": self.durations[node],
+                "dependencies": [self.names[p] for p in self.predecessors[node]],
+                "cluster": self.cluster_ids[self.cluster_of[node]],
+            },
+            "position": self.position(node),
+        }
+
+    def _cluster_element(self, cluster: int) -> Dict[str, Any]:
+        members = self.cluster_members[cluster]
+        return {
+            "data": {
+                "id": self.cluster_ids[cluster],
+                "label": self.cluster_labels[cluster],
+                "is_cluster": True,
+                "size": len(members),
+                "duration": sum(self.durations[node] for node in members),
+                "critical_count": sum(1 for node in members if self.priorities[node] == "Crítica"),
+            }
+        }
+
+    def cluster_edges(self) -> Dict[Tuple[int, int], int]:
+        """Número de dependencias entre cada par de clústeres distintos (origen, destino)."""
+        edge_counts: Dict[Tuple[int, int], int] = {}
+        for source, targets in enumerate(self.successors):
+            source_cluster = self.cluster_of[source]
+            for target in targets:
+                key = (source_cluster, self.cluster_of[target])
+                if key[0] != key[1]:
+                    edge_counts[key] = edge_counts.get(key, 0) + 1
+        return edge_counts
+
+    def overview(self) -> ViewElements:
+        """Vista agregada: un nodo por clúster y una arista por par de clústeres con su conteo."""
+        return {
+            "nodes": [self._cluster_element(cluster) for cluster in range(len(self.cluster_ids))],
+            "edges": [
+                {"data": {"source": self.cluster_ids[a], "target": self.cluster_ids[b], "count": n}}
+                for (a, b), n in self.cluster_edges().items()
+            ],
+        }
+
+    def cluster_detail(self, cluster_id: str) -> Optional[ViewElements]:
+        """
+        Detalle de un clúster: sus tareas y aristas internas; las aristas hacia otros
+        clústeres se agregan contra el nodo de ese clúster.
+        """
+        cluster = self.cluster_index.get(cluster_id)
+        if cluster is None:
+            return None
+        members = self.cluster_members[cluster]
+        nodes = [self._task_element(node) for node in members]
+        edges: List[Dict[str, Any]] = []
+        boundary: Dict[Tuple[str, str], int] = {}
+        neighbors: Dict[int, bool] = {}
+
+        for node in members:
+            for target in self.successors[node]:
+                if self.cluster_of[target] == cluster:
+                    edges.append({"data": {"source": self.names[node], "target": self.names[target]}})
+                else:
+                    neighbors[self.cluster_of[target]] = True
+                    key = (self.names[node], self.cluster_ids[self.cluster_of[target]])
+                    boundary[key] = boundary.get(key, 0) + 1
+            for source in self.predecessors[node]:
+                if self.cluster_of[source] != cluster:
+                    neighbors[self.cluster_of[source]] = True
+                    key = (self.cluster_ids[self.cluster_of[source]], self.names[node])
+                    boundary[key] = boundary.get(key, 0) + 1
+
+        nodes.extend(self._cluster_element(other) for other in neighbors)
+        edges.extend({"data": {"source": a, "target": b, "count": n}} for (a, b), n in boundary.items())
+        return {"nodes": nodes, "edges": edges}
+
+    def viewport(self, x_min: float, x_max: float, y_min: float, y_max: float, max_nodes: int) -> Tuple[ViewElements, bool]:
+        """
+        Tareas cuya posición cae en la ventana visible y las aristas entre ellas.
+        Como la disposición es una rejilla, solo se recorren las columnas y filas visibles.
+        Devuelve también si el resultado se truncó a max_nodes.
+        """
+        if x_max < x_min or y_max < y_min or x_max < 0 or y_max < 0:
+            return {"nodes": [], "edges": []}, False
+        first_column = max(0, int(-(-x_min // COLUMN_SPACING)))
+        last_column = min(len(self.level_members) - 1, int(x_max // COLUMN_SPACING))
+        first_row = max(0, int(-(-y_min // ROW_SPACING)))
+        last_row = max(-1, int(y_max // ROW_SPACING))
+
+        visible: Dict[int, bool] = {}
+        truncated = False
+        for column in range(first_column, last_column + 1):
+            members = self.level_members[column]
+            for node in members[first_row:last_row + 1]:
+                if len(visible) >= max_nodes:
+                    truncated = True
+                    break
+                visible[node] = True
+
+        nodes = [self._task_element(node) for node in visible]
+        edges = [
+            {"data": {"source": self.names[node], "target": self.names[target]}}
+            for node in visible for target in self.successors[node] if target in visible
+        ]
+        return {"nodes": nodes, "edges": edges}, truncated
+
+class GraphViewService:
+    """
+    Compila y conserva vistas de detalle por niveles. Cada vista se identifica por el
+    hash de su contenido, así que las consultas de detalle no reenvían el proyecto.
+    """
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = cache_size
+        self.views = CustomHashTable(capacity=cache_size * 2)
+        self._view_order = CustomQueue() # Orden de inserción para desalojo FIFO
+
+    def _view_key(self, tasks: List[Task], mode: str, max_cluster_size: int) -> str:
+        digest = hashlib.sha256(f"{mode}\x1f{max_cluster_size}".encode("utf-8"))
+        for task in tasks:
+            row = f"{task.name}\x1f{task.duration!r}\x1f{task.priority}\x1f{task.subproject}\x1f{chr(0x1f).join(task.dependencies)}"
+            digest.update(b"\x1e" + row.encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def build_view(self, tasks: List[Task], mode: str = "level", max_cluster_size: int = 200) -> GraphView:
+        """Compila (o reutiliza) la vista del proyecto en el modo indicado."""
+        if mode not in VIEW_MODES:
+            raise ValueError(f"Unknown view mode '{mode}'")
+        if max_cluster_size < 1:
+            raise ValueError("max_cluster_size must be positive")
+        view_id = self._view_key(tasks, mode, max_cluster_size)
+        view = self.views.get(view_id)
+        if view is None:
+            view = GraphView(view_id, mode, tasks, max_cluster_size)
+            if self._view_order.size() >= self.cache_size:
+                self.views.remove(self._view_order.dequeue())
+            self.views.put(view_id, view)
+            self._view_order.enqueue(view_id)
+        return view
+
+    def get_view(self, view_id: str) -> Optional[GraphView]:
+        return self.views.get(view_id)
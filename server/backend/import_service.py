@@ -0,0 +1,249 @@
+import csv
+import io
+import math
+import re
+import xml.etree.ElementTree as ElementTree
+from typing import BinaryIO, Dict, Iterator, List, Optional, TypedDict
+
+from units import convert_to_minutes
+from structures.compiled_project import CompiledProject, PRIORITY_NAMES
+from structures.custom_hash_table import CustomHashTable
+
+# Máximo de identificadores problemáticos que se reportan (el conteo siempre es completo)
+MAX_REPORTED = 100
+
+class ImportReport(TypedDict):
+    project: CompiledProject
+    skipped_rows: int
+    duplicate_ids: List[str]
+    duplicate_count: int
+    missing_dependencies: List[str]
+    missing_count: int
+
+class _DependencyResolver:
+    """
+    Resuelve dependencias por identificador externo en una sola pasada.
+    Las referencias a tareas que aún no aparecieron quedan pendientes y se resuelven
+    en cuanto llega la fila correspondiente; al final solo quedan las inexistentes.
+    """
+    def __init__(self, project: CompiledProject):
+        self.project = project
+        self.index = CustomHashTable(capacity=1024)
+        self.pending = CustomHashTable(capacity=64)
+        self._pending_ids: List[str] = []
+        self.duplicates: List[str] = []
+        self.duplicate_count = 0
+
+    def add(self, external_id: str, name: str, duration: float, priority: str, subproject: str, dependencies: List[str]) -> bool:
+        if self.index.contains(external_id):
+            self.duplicate_count += 1
+            if len(self.duplicates) < MAX_REPORTED:
+                self.duplicates.append(external_id)
+            return False
+
+        position = self.project.add_task(external_id, name, duration, priority, subproject)
+        self.index.put(external_id, position)
+
+        waiting = self.pending.get(external_id)
+        if waiting is not None:
+            for task in waiting:
+                self.project.add_dependency(position, task)
+            self.pending.remove(external_id)
+
+        for dep_id in dependencies:
+            dep = self.index.get(dep_id)
+            if dep is not None:
+                self.project.add_dependency(dep, position)
+            else:
+                waiting = self.pending.get(dep_id)
+                if waiting is None:
+                    waiting = []
+                    self.pending.put(dep_id, waiting)
+                    self._pending_ids.append(dep_id)
+                waiting.append(position)
+        return True
+
+    def finish(self, skipped_rows: int) -> ImportReport:
+        missing = [dep_id for dep_id in self._pending_ids if self.pending.contains(dep_id)]
+        self.project.finalize()
+        return {
+            "project": self.project,
+            "skipped_rows": skipped_rows,
+            "duplicate_ids": self.duplicates,
+            "duplicate_count": self.duplicate_count,
+            "missing_dependencies": missing[:MAX_REPORTED],
+            "missing_count": len(missing),
+        }
+
+def _split_dependencies(value: str) -> List[str]:
+    return [part.strip() for part in re.split(r"[;,|]", value or "") if part.strip()]
+
+def import_csv(
+    stream: BinaryIO,
+    default_unit: str = "hours",
+    encoding: str = "utf-8-sig",
+    columns: Optional[Dict[str, str]] = None,
+) -> ImportReport:
+    """
+    Importa un CSV con encabezado leyendo el archivo por bloques (no se carga completo).
+    Columnas por defecto: id, name, duration, unit, priority, dependencies, subproject;
+    'columns' permite renombrarlas (p. ej. {"name": "Tarea"}). Las filas sin id o con una
+    duración inválida, negativa o no finita se omiten y se cuentan en skipped_rows; un
+    CSV mal formado lanza ValueError.
+    """
+    mapping = {key: key for key in ("id", "name", "duration", "unit", "priority", "dependencies", "subproject")}
+    mapping.update(columns or {})
+
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    reader = csv.reader(text)
+    try:
+        return _read_csv_rows(reader, mapping, default_unit)
+    except csv.Error as e:
+        raise ValueError(f"Invalid CSV at line {reader.line_num}: {e}")
+    finally:
+        text.detach() # No cerrar el archivo subyacente (lo gestiona el llamador)
+
+def _read_csv_rows(reader: Iterator[List[str]], mapping: Dict[str, str], default_unit: str) -> ImportReport:
+    header = next(reader, None)
+    if header is None:
+        raise ValueError("Empty CSV file")
+    position = {column.strip(): i for i, column in enumerate(header)}
+    for required in ("id", "name", "duration"):
+        if mapping[required] not in position:
+            raise ValueError(f"Missing CSV column '{mapping[required]}'")
+
+    def column(row: List[str], key: str) -> str:
+        i = position.get(mapping[key])
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    resolver = _DependencyResolver(CompiledProject())
+    skipped = 0
+    for row in reader:
+        if not row or not column(row, "id"):
+            skipped += 1
+            continue
+        try:
+            duration = convert_to_minutes(float(column(row, "duration") or 0), column(row, "unit") or default_unit)
+        except ValueError:
+            skipped += 1
+            continue
+        if not math.isfinite(duration) or duration < 0:
+            skipped += 1
+            continue
+        resolver.add(
+            column(row, "id"),
+            column(row, "name") or column(row, "id"),
+            duration,
+            column(row, "priority") or "Media",
+            column(row, "subproject"),
+            _split_dependencies(column(row, "dependencies")),
+        )
+    return resolver.finish(skipped)
+
+_ISO_DURATION = re.compile(r"^P(?:(\d+(?:\.\d+)?)D)?(?:T(?:(\d+(?:\.\d+)?)H)?(?:(\d+(?:\.\d+)?)M)?(?:(\d+(?:\.\d+)?)S)?)?$")
+
+def parse_project_duration(value: str) -> float:
+    """Convierte una duración ISO 8601 de MS Project (p. ej. 'PT16H0M0S') a minutos."""
+    match = _ISO_DURATION.match((value or "").strip())
+    if not match:
+        return 0.0
+    days, hours, minutes, seconds = (float(group) if group else 0.0 for group in match.groups())
+    return days * 24 * 60 + hours * 60 + minutes + seconds / 60.0
+
+def project_priority(value: str) -> str:
+    """Traduce la prioridad numérica de MS Project (0-1000, 500 = media)."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return "Media"
+    if number >= 800:
+        return "Crítica"
+    if number >= 600:
+        return "Alta"
+    if number >= 400:
+        return "Media"
+    return "Baja"
+
+def _local(tag: str) -> str:
+    """Nombre del elemento sin el espacio de nombres XML."""
+    return tag.rsplit("}", 1)[-1]
+
+def import_msproject(stream: BinaryIO) -> ImportReport:
+    """
+    Importa un XML de MS Project con iterparse: cada <Task> se procesa al cerrarse y se
+    libera de inmediato, por lo que la memoria no depende del tamaño del archivo.
+    Las tareas resumen (Summary=1) se convierten en la ruta de sub-proyecto de sus hijas;
+    todos los tipos de PredecessorLink se tratan como fin-inicio. Las tareas sin UID o
+    con un OutlineLevel no numérico o negativo se omiten y se cuentan en skipped_rows.
+    """
+    resolver = _DependencyResolver(CompiledProject())
+    skipped = 0
+    outline: List[str] = [] # Nombres de las tareas resumen abiertas por nivel
+    parents: List[ElementTree.Element] = []
+
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            parents.append(element)
+            continue
+        parents.pop()
+        # Solo interesan los elementos dentro de los contenedores del proyecto (Tasks, Resources, ...)
+        if len(parents) != 2:
+            continue
+        container = parents[-1]
+        is_task = _local(element.tag) == "Task" and _local(container.tag) == "Tasks"
+
+        fields: Dict[str, str] = {}
+        predecessors: List[str] = []
+        if is_task:
+            for child in element:
+                name = _local(child.tag)
+                if name == "PredecessorLink":
+                    for link_field in child:
+                        if _local(link_field.tag) == "PredecessorUID" and link_field.text:
+                            predecessors.append(link_field.text.strip())
+                elif child.text is not None:
+                    fields[name] = child.text.strip()
+        # Liberar el elemento ya procesado (y sus hijos) del árbol en construcción
+        element.clear()
+        container.remove(element)
+        if not is_task:
+            continue
+
+        uid = fields.get("UID")
+        try:
+            level = int(fields.get("OutlineLevel", "1") or 1)
+        except ValueError:
+            level = -1 # Nivel inválido: la fila se omite como las demás filas incorrectas
+        if not uid or level <= 0 or fields.get("IsNull") == "1":
+            skipped += 1
+            continue
+        task_name = fields.get("Name") or uid
+        if fields.get("Summary") == "1":
+            del outline[level - 1:]
+            outline.append(task_name)
+            skipped += 1
+            continue
+
+        resolver.add(
+            uid,
+            task_name,
+            parse_project_duration(fields.get("Duration", "")),
+            project_priority(fields.get("Priority", "500")),
+            "/".join(outline[:level - 1]),
+            predecessors,
+        )
+    return resolver.finish(skipped)
+
+def export_task_inputs(project: CompiledProject) -> Iterator[Dict[str, object]]:
+    """Convierte el proyecto compilado a la forma JSON de TaskInput (ids numéricos 1..n)."""
+    dependency_lists = project.dependency_lists()
+    for position in range(project.task_count()):
+        yield {
+            "id": position + 1,
+            "name": project.names[position],
+            "duration": project.durations[position],
+            "unit": "minutes",
+            "priority": PRIORITY_NAMES[project.priorities[position]],
+            "dependencies": [dep + 1 for dep in dependency_lists[position]],
+            "subproject": project.subprojects[position] or None,
+        }
@@ -0,0 +1,164 @@
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from structures.custom_graph import ProgressCallback
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_queue import CustomQueue
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATUSES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+class JobCancelled(Exception):
+    """Se lanza en un punto de control cuando se pidió cancelar el trabajo."""
+
+class JobQueueFull(Exception):
+    """Hay demasiados trabajos pendientes o en ejecución."""
+
+class Job:
+    """
+    Estado de un trabajo en segundo plano. Lo escribe el hilo que lo ejecuta y lo leen
+    las peticiones; 'revision' aumenta con cada cambio para que los suscriptores solo
+    envíen actualizaciones cuando hay algo nuevo.
+    """
+    def __init__(self, job_id: str, kind: str):
+        self.job_id = job_id
+        self.kind = kind
+        self.status = JOB_QUEUED
+        self.stage: Optional[str] = None
+        self.progress = 0.0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.revision = 0
+        self._cancel_requested = threading.Event()
+        self._future: Optional[Future] = None
+
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def cancel_requested(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def _update(self, **changes: Any):
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.revision += 1
+
+class JobContext:
+    """
+    Lo que recibe el trabajo: declara sus etapas y obtiene para cada una un callback
+    de avance (compatible con ProgressCallback) que también es punto de cancelación.
+    """
+    def __init__(self, job: Job):
+        self.job = job
+
+    def checkpoint(self):
+        if self.job.cancel_requested():
+            raise JobCancelled()
+
+    def stage(self, name: str, start: float, end: float) -> ProgressCallback:
+        """Inicia una etapa que ocupa [start, end] del avance total."""
+        self.checkpoint()
+        self.job._update(stage=name, progress=start)
+
+        def report(fraction: float):
+            self.checkpoint()
+            self.job._update(progress=start + (end - start) * min(1.0, max(0.0, fraction)))
+
+        return report
+
+class JobService:
+    """
+    Ejecuta análisis largos en un pool de hilos propio, fuera del ciclo de la petición.
+    Los trabajos terminados se conservan (con su resultado) hasta 'retention_seconds'
+    o hasta que haya más de 'max_finished'; se descartan los más antiguos primero.
+    """
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, max_finished: int = 64, retention_seconds: float = 900.0):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self.retention_seconds = retention_seconds
+        self.jobs = CustomHashTable(capacity=(max_pending + max_finished) * 2)
+        self._finished_order = CustomQueue() # Identificadores en orden de finalización
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        return self._executor
+
+    def shutdown(self):
+        """Cancela los trabajos pendientes y libera el pool de hilos si fue creado."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, kind: str, work: Callable[[JobContext], Any]) -> Job:
+        """Encola el trabajo y devuelve su estado inicial (lanza JobQueueFull si no hay cupo)."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"Too many active jobs (limit {self.max_pending})")
+            self._pending += 1
+            job = Job(uuid.uuid4().hex, kind)
+            self.jobs.put(job.job_id, job)
+        job._future = self._get_executor().submit(self._run, job, work)
+        return job
+
+    def _run(self, job: Job, work: Callable[[JobContext], Any]):
+        if job.cancel_requested():
+            self._finish(job, status=JOB_CANCELLED)
+            return
+        job._update(status=JOB_RUNNING)
+        try:
+            result = work(JobContext(job))
+        except JobCancelled:
+            self._finish(job, status=JOB_CANCELLED)
+        except Exception as e:
+            self._finish(job, status=JOB_FAILED, error=str(e) or type(e).__name__)
+        else:
+            self._finish(job, status=JOB_DONE, progress=1.0, result=result)
+
+    def _finish(self, job: Job, **changes: Any):
+        with self._lock:
+            job._update(finished_at=time.time(), **changes)
+            self._pending -= 1
+            self._finished_order.enqueue(job.job_id)
+            self._prune()
+
+    def _prune(self):
+        """Descarta trabajos terminados por antigüedad o por exceso (requiere el lock)."""
+        now = time.time()
+        while not self._finished_order.is_empty():
+            oldest = self.jobs.get(self._finished_order.peek())
+            expired = oldest is None or now - oldest.finished_at > self.retention_seconds
+            if not expired and self._finished_order.size() <= self.max_finished:
+                break
+            self.jobs.remove(self._finished_order.dequeue())
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._prune()
+            return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Pide cancelar el trabajo. Si aún no empezó se cancela de inmediato; si está en
+        ejecución se detiene en su siguiente punto de control.
+        """
+        job = self.get(job_id)
+        if job is None or job.is_finished():
+            return job
+        job._cancel_requested.set()
+        if job._future is not None and job._future.cancel():
+            self._finish(job, status=JOB_CANCELLED)
+        return job
@@ -0,0 +1,335 @@
+"""
+Generador de carga para la API.
+
+Ejecuta escenarios contra la app servida por uvicorn en un hilo del mismo proceso (por
+defecto) o contra un servidor ya levantado (--url) y reporta por escenario: throughput,
+latencias p50/p95/p99, retraso del event loop y pico de RSS. Puede guardar una línea base y fallar si los
+resultados empeoran más de un umbral.
+
+Las mezclas de peticiones usan el formato de requests.jsonl: una petición por línea con
+"request_id", "title" y "body" (el cuerpo JSON a enviar, como objeto o como texto), y
+opcionalmente "method", "path" (por defecto /generate-plan) y "weight".
+
+Ejemplos:
+    python load_test.py --synthetic 200 --concurrency 1,8 --requests 100
+    python load_test.py --mix recorded.jsonl --url http://localhost:8000 --save-baseline base.json
+    python load_test.py --synthetic 200 --baseline base.json --max-regression 0.2
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, TypedDict
+
+class RequestSpec(TypedDict):
+    request_id: str
+    method: str
+    path: str
+    body: Any
+    weight: float
+
+class ScenarioResult(TypedDict):
+    scenario: str
+    requests: int
+    errors: int
+    concurrency: int
+    duration_seconds: float
+    throughput_rps: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    latency_p99_ms: float
+    loop_lag_max_ms: float
+    loop_lag_p99_ms: float
+    peak_rss_mb: float
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por interpolación lineal entre rangos (fraction entre 0 y 1)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = fraction * (len(ordered) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+def load_mix(path: str) -> List[RequestSpec]:
+    """Lee una mezcla de peticiones en formato requests.jsonl."""
+    mix: List[RequestSpec] = []
+    with open(path, encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = record.get("body")
+            if isinstance(body, str):
+                try:
+                    body = json.loads(body)
+                except json.JSONDecodeError:
+                    raise ValueError(f"{path}:{line_number}: body is not a JSON request payload")
+            mix.append({
+                "request_id": str(record.get("request_id", line_number)),
+                "method": record.get("method", "POST").upper(),
+                "path": record.get("path", "/generate-plan"),
+                "body": body,
+                "weight": float(record.get("weight", 1.0)),
+            })
+    if not mix:
+        raise ValueError(f"{path}: empty request mix")
+    return mix
+
+def synthetic_tasks(size: int, seed: int = 0, max_dependencies: int = 3) -> List[Dict[str, Any]]:
+    """Proyecto sintético acíclico en forma TaskInput (dependencias solo hacia tareas previas)."""
+    rng = random.Random(seed)
+    priorities = ["Baja", "Media", "Alta", "Crítica"]
+    tasks = []
+    for i in range(1, size + 1):
+        candidates = range(max(1, i - 20), i)
+        dependencies = sorted(rng.sample(candidates, min(len(candidates), rng.randint(0, max_dependencies))))
+        tasks.append({
+            "id": i,
+            "name": f"Tarea {i}",
+            "duration": rng.randint(1, 16),
+            "unit": "hours",
+            "priority": rng.choice(priorities),
+            "dependencies": dependencies,
+        })
+    return tasks
+
+def synthetic_mix(size: int, path: str = "/generate-plan") -> List[RequestSpec]:
+    return [{
+        "request_id": f"synthetic-{size}",
+        "method": "POST",
+        "path": path,
+        "body": synthetic_tasks(size),
+        "weight": 1.0,
+    }]
+
+def current_rss_mb() -> float:
+    """RSS actual del proceso (Linux: /proc; en otros sistemas, el pico de getrusage)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            pages = int(handle.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+class _LoopMonitor:
+    """
+    Mide el retraso del event loop: duerme 'interval' y registra cuánto tarde despierta.
+    En modo en proceso corre en el loop del servidor, de forma continua mientras atiende
+    peticiones; contra --url mide el cliente. También muestrea el RSS para el pico.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self.peak_rss = current_rss_mb()
+        self._running = True
+
+    async def run(self):
+        while self._running:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - started - self.interval))
+            self.peak_rss = max(self.peak_rss, current_rss_mb())
+
+    def stop(self):
+        self._running = False
+
+class _InProcessServer:
+    """
+    La app servida por uvicorn en un hilo con su propio event loop, en un puerto libre de
+    127.0.0.1. Con ASGITransport cada petición se ejecutaría dentro del loop del cliente
+    y las peticiones "concurrentes" quedarían serializadas; aquí llegan por sockets
+    reales y el servidor las atiende como en producción (comparten el GIL con el
+    cliente, cuyo costo es pequeño frente al de la app).
+    """
+    def __init__(self):
+        import uvicorn # Solo se necesita al ejecutar la carga
+        from api import app
+
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(("127.0.0.1", 0))
+        self.url = f"http://127.0.0.1:{self._socket.getsockname()[1]}"
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning"))
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread = threading.Thread(target=self._run, name="load-test-server", daemon=True)
+
+    def _run(self):
+        asyncio.run(self._serve())
+
+    async def _serve(self):
+        self.loop = asyncio.get_running_loop()
+        await self.server.serve(sockets=[self._socket])
+
+    def __enter__(self) -> "_InProcessServer":
+        self._thread.start()
+        deadline = time.monotonic() + 30
+        while not self.server.started:
+            if not self._thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("In-process server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self._thread.join()
+        self._socket.close()
+
+async def run_scenario(name: str, mix: List[RequestSpec], concurrency: int, total_requests: int, url: str, seed: int = 0, server_loop: Optional[asyncio.AbstractEventLoop] = None) -> ScenarioResult:
+    """
+    Envía total_requests peticiones de la mezcla (por peso) con 'concurrency' clientes
+    simultáneos. Con server_loop (servidor en proceso) el retraso del loop se mide en
+    el del servidor; si no, en el del cliente.
+    """
+    import httpx # Solo se necesita al ejecutar la carga
+
+    client = httpx.AsyncClient(base_url=url, timeout=None, limits=httpx.Limits(max_connections=concurrency))
+
+    rng = random.Random(seed)
+    plan = rng.choices(mix, weights=[spec["weight"] for spec in mix], k=total_requests)
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < len(plan):
+            spec = plan[next_index]
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                response = await client.request(spec["method"], spec["path"], json=spec["body"])
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    monitor = _LoopMonitor()
+    if server_loop is not None:
+        monitor_task = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(monitor.run(), server_loop))
+    else:
+        monitor_task = asyncio.create_task(monitor.run())
+    started = time.perf_counter()
+    async with client:
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    monitor.stop()
+    await monitor_task
+
+    return {
+        "scenario": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "concurrency": concurrency,
+        "duration_seconds": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed > 0 else 0.0,
+        "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+        "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+        "latency_p99_ms": percentile(latencies, 0.99) * 1000,
+        "loop_lag_max_ms": max(monitor.lags, default=0.0) * 1000,
+        "loop_lag_p99_ms": percentile(monitor.lags, 0.99) * 1000,
+        "peak_rss_mb": monitor.peak_rss,
+    }
+
+# Métricas comparadas con la línea base: True si "más alto es mejor"
+REGRESSION_METRICS = {
+    "throughput_rps": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "loop_lag_p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+def compare_to_baseline(results: List[ScenarioResult], baseline: Dict[str, ScenarioResult], max_regression: float) -> List[str]:
+    """
+    Devuelve una descripción por cada métrica que empeoró más que max_regression
+    (fracción relativa, p. ej. 0.2 = 20 %) respecto a la línea base del mismo escenario.
+    """
+    failures: List[str] = []
+    for result in results:
+        reference = baseline.get(result["scenario"])
+        if reference is None:
+            continue
+        for metric, higher_is_better in REGRESSION_METRICS.items():
+            old, new = reference.get(metric), result[metric]
+            if not old:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > max_regression:
+                failures.append(f"{result['scenario']}: {metric} {old:.2f} -> {new:.2f} ({change:+.0%})")
+        if result["errors"] > reference.get("errors", 0):
+            failures.append(f"{result['scenario']}: errors {reference.get('errors', 0)} -> {result['errors']}")
+    return failures
+
+def format_results(results: List[ScenarioResult]) -> str:
+    header = f"{'escenario':<28}{'req':>6}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'lag p99':>9}{'lag max':>9}{'RSS MB':>9}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['scenario']:<28}{r['requests']:>6}{r['errors']:>5}{r['throughput_rps']:>9.1f}"
+            f"{r['latency_p50_ms']:>9.1f}{r['latency_p95_ms']:>9.1f}{r['latency_p99_ms']:>9.1f}"
+            f"{r['loop_lag_p99_ms']:>9.1f}{r['loop_lag_max_ms']:>9.1f}{r['peak_rss_mb']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API de planificación")
+    parser.add_argument("--mix", action="append", default=[], help="Mezcla de peticiones en formato requests.jsonl (repetible)")
+    parser.add_argument("--synthetic", action="append", type=int, default=[], help="Tamaño de un proyecto sintético (repetible)")
+    parser.add_argument("--path", default="/generate-plan", help="Endpoint para las mezclas sintéticas")
+    parser.add_argument("--concurrency", default="1,8", help="Niveles de concurrencia separados por comas")
+    parser.add_argument("--requests", type=int, default=100, help="Peticiones por escenario")
+    parser.add_argument("--url", help="URL de un servidor ya levantado (por defecto, uvicorn en un hilo de este proceso)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--save-baseline", help="Guardar los resultados como línea base")
+    parser.add_argument("--baseline", help="Comparar con esta línea base")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Empeoramiento relativo tolerado (0.2 = 20 %%)")
+    args = parser.parse_args(argv)
+
+    sources = [(os.path.splitext(os.path.basename(path))[0], load_mix(path)) for path in args.mix]
+    sources += [(f"synthetic-{size}", synthetic_mix(size, args.path)) for size in args.synthetic]
+    if not sources:
+        sources = [("synthetic-100", synthetic_mix(100, args.path))]
+
+    results: List[ScenarioResult] = []
+    server = None if args.url else _InProcessServer()
+    with server or contextlib.nullcontext():
+        url = args.url or server.url
+        for name, mix in sources:
+            for concurrency in (int(level) for level in args.concurrency.split(",")):
+                scenario = run_scenario(f"{name}@c{concurrency}", mix, concurrency, args.requests, url, args.seed, server.loop if server else None)
+                results.append(asyncio.run(scenario))
+                print(format_results(results[-1:]).splitlines()[-1] if len(results) > 1 else format_results(results), flush=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump({r["scenario"]: r for r in results}, handle, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        failures = compare_to_baseline(results, baseline, args.max_regression)
+        if failures:
+            print("\nRegresiones respecto a la línea base:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print("\nSin regresiones respecto a la línea base.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+from typing import List, Dict, Optional, Tuple, TypedDict, Union
+
+from task import Task
+from component_service import ComponentService, ComponentResult, ProjectAnalysis
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_queue import CustomQueue
+from structures.persistent_map import PersistentHashMap
+
+# Registro inmutable de una tarea dentro de una versión:
+# (duración en minutos, prioridad, sub-proyecto, dependencias, secuencia de inserción).
+# Las dependencias son la lista de adyacencia del grafo, así que tabla y aristas
+# se versionan juntas en el mismo mapa persistente.
+TaskRecord = Tuple[float, str, str, Tuple[str, ...], int]
+
+Edge = Tuple[str, str] # (dependencia, tarea)
+
+class ProjectVersion:
+    """Versión inmutable del proyecto. Comparte con su padre todo lo que no cambió."""
+    def __init__(self, version_id: int, parent_id: Optional[int], tasks: PersistentHashMap, next_sequence: int, label: Optional[str] = None):
+        self.version_id = version_id
+        self.parent_id = parent_id
+        self.tasks = tasks
+        self.next_sequence = next_sequence
+        self.label = label
+
+    def __repr__(self):
+        return f"ProjectVersion(id={self.version_id}, parent={self.parent_id}, tasks={self.tasks.size()}, label={self.label!r})"
+
+class VersionDiff(TypedDict):
+    from_version: int
+    to_version: int
+    added_tasks: List[str]
+    removed_tasks: List[str]
+    changed_tasks: List[str]
+    added_edges: List[Edge]
+    removed_edges: List[Edge]
+
+class HistoryAnalysis(TypedDict):
+    version_id: int
+    analysis: ProjectAnalysis
+    reused_components: int
+    recomputed_components: int
+
+def _to_record(task: Task, sequence: int) -> TaskRecord:
+    return (task.duration, task.priority, task.subproject or "", tuple(task.dependencies), sequence)
+
+def _same_content(old: TaskRecord, new: TaskRecord) -> bool:
+    """Compara dos registros ignorando la secuencia de inserción."""
+    return old[:4] == new[:4]
+
+class ProjectHistory:
+    """
+    Historial de versiones de un proyecto sobre un mapa persistente (HAMT).
+    Cada edición crea una versión nueva en O(k log n) para k tareas modificadas,
+    compartiendo el resto de nodos con la anterior; las instantáneas con nombre y el
+    deshacer solo mueven referencias. Las duraciones se expresan en minutos.
+    """
+    def __init__(self, component_service: Optional[ComponentService] = None):
+        self.component_service = component_service or ComponentService()
+        self.versions: List[ProjectVersion] = [ProjectVersion(0, None, PersistentHashMap(), 0, "inicial")]
+        self.head = 0
+        self.snapshots = CustomHashTable(capacity=16)
+        self._snapshot_names: List[str] = []
+        # Resultados por componente de la última versión analizada
+        self._analyzed: Optional[ProjectVersion] = None
+        self._component_of: Dict[str, int] = {}
+        self._component_sizes: List[int] = []
+        self._component_results: List[ComponentResult] = []
+
+    def head_version(self) -> ProjectVersion:
+        return self.versions[self.head]
+
+    def get_version(self, reference: Union[int, str]) -> ProjectVersion:
+        """Resuelve un identificador numérico o el nombre de una instantánea."""
+        if isinstance(reference, str):
+            version_id = self.snapshots.get(reference)
+            if version_id is None:
+                if not reference.isdigit():
+                    raise KeyError(f"Unknown snapshot '{reference}'")
+                version_id = int(reference)
+        else:
+            version_id = reference
+        if not 0 <= version_id < len(self.versions):
+            raise KeyError(f"Unknown version {version_id}")
+        return self.versions[version_id]
+
+    def apply(self, upserts: List[Task], removals: List[str] = None, label: Optional[str] = None) -> ProjectVersion:
+        """Crea una versión a partir de la actual con las tareas añadidas/editadas y eliminadas."""
+        base = self.head_version()
+        tasks = base.tasks
+        sequence = base.next_sequence
+        for task in upserts:
+            previous = tasks.get(task.name)
+            if previous is None:
+                tasks = tasks.set(task.name, _to_record(task, sequence))
+                sequence += 1
+            else:
+                record = _to_record(task, previous[4])
+                if not _same_content(previous, record):
+                    tasks = tasks.set(task.name, record)
+        for name in removals or []:
+            tasks = tasks.remove(name)
+
+        version = ProjectVersion(len(self.versions), base.version_id, tasks, sequence, label)
+        self.versions.append(version)
+        self.head = version.version_id
+        return version
+
+    def commit_tasks(self, tasks: List[Task], label: Optional[str] = None) -> ProjectVersion:
+        """
+        Registra la lista completa de tareas como nueva versión. Solo los registros
+        que cambiaron se reescriben, así que la versión comparte el resto con la anterior.
+        """
+        current = self.head_version().tasks
+        incoming = CustomHashTable(capacity=len(tasks) * 2 + 1)
+        for task in tasks:
+            incoming.put(task.name, True)
+        removals = [name for name in current.keys() if not incoming.contains(name)]
+        return self.apply(tasks, removals, label)
+
+    def snapshot(self, name: str, reference: Union[int, str, None] = None) -> ProjectVersion:
+        """Asocia un nombre a una versión (por defecto la actual)."""
+        version = self.head_version() if reference is None else self.get_version(reference)
+        if not self.snapshots.contains(name):
+            self._snapshot_names.append(name)
+        self.snapshots.put(name, version.version_id)
+        return version
+
+    def list_snapshots(self) -> List[Tuple[str, int]]:
+        return [(name, self.snapshots.get(name)) for name in self._snapshot_names]
+
+    def undo(self) -> ProjectVersion:
+        """Vuelve a la versión padre de la actual (la siguiente edición parte de ahí)."""
+        parent_id = self.head_version().parent_id
+        if parent_id is None:
+            raise ValueError("Nothing to undo")
+        self.head = parent_id
+        return self.head_version()
+
+    def checkout(self, reference: Union[int, str]) -> ProjectVersion:
+        self.head = self.get_version(reference).version_id
+        return self.head_version()
+
+    def diff(self, from_reference: Union[int, str], to_reference: Union[int, str]) -> VersionDiff:
+        """
+        Diferencia estructural entre dos versiones. Recorre los dos HAMT a la vez y salta
+        los subárboles compartidos, así que el costo depende de los cambios.
+        """
+        old = self.get_version(from_reference)
+        new = self.get_version(to_reference)
+        result: VersionDiff = {
+            "from_version": old.version_id,
+            "to_version": new.version_id,
+            "added_tasks": [],
+            "removed_tasks": [],
+            "changed_tasks": [],
+            "added_edges": [],
+            "removed_edges": [],
+        }
+        for name, before, after in old.tasks.diff(new.tasks):
+            old_deps = before[3] if before is not None else ()
+            new_deps = after[3] if after is not None else ()
+            if before is None:
+                result["added_tasks"].append(name)
+            elif after is None:
+                result["removed_tasks"].append(name)
+            elif not _same_content(before, after):
+                result["changed_tasks"].append(name)
+            result["added_edges"].extend((dep, name) for dep in new_deps if dep not in old_deps)
+            result["removed_edges"].extend((dep, name) for dep in old_deps if dep not in new_deps)
+        return result
+
+    def tasks(self, reference: Union[int, str, None] = None) -> List[Task]:
+        """Materializa las tareas de una versión en su orden de inserción."""
+        version = self.head_version() if reference is None else self.get_version(reference)
+        records = sorted(version.tasks.items(), key=lambda item: item[1][4])
+        return [
+            Task(name, duration, "minutes", priority, list(dependencies), subproject)
+            for name, (duration, priority, subproject, dependencies, _) in records
+        ]
+
+    def analyze(self, reference: Union[int, str, None] = None) -> HistoryAnalysis:
+        """
+        Analiza una versión reutilizando los resultados por componente de la última
+        versión analizada: un componente se reutiliza si el diff no toca ninguna de sus
+        tareas y conserva exactamente los mismos miembros.
+        """
+        version = self.head_version() if reference is None else self.get_version(reference)
+        tasks = self.tasks(version.version_id)
+        components = self.component_service.split_components(tasks)
+        cached: List[Optional[ComponentResult]] = [None] * len(components)
+
+        if self._analyzed is not None:
+            touched = {name for name, _, _ in self._analyzed.tasks.diff(version.tasks)}
+            dirty = {self._component_of[name] for name in touched if name in self._component_of}
+            for index, component in enumerate(components):
+                previous = self._component_of.get(component[0].name)
+                if previous is None or previous in dirty or len(component) != self._component_sizes[previous]:
+                    continue
+                if any(task.name in touched for task in component):
+                    continue
+                cached[index] = self._component_results[previous]
+
+        reused = sum(1 for result in cached if result is not None)
+        results = self.component_service.analyze_components(components, cached)
+
+        self._analyzed = version
+        self._component_of = {task.name: index for index, component in enumerate(components) for task in component}
+        self._component_sizes = [len(component) for component in components]
+        self._component_results = results
+
+        return {
+            "version_id": version.version_id,
+            "analysis": self.component_service.merge(tasks, results),
+            "reused_components": reused,
+            "recomputed_components": len(components) - reused,
+        }
+
+class HistoryService:
+    """Historiales por proyecto, con desalojo FIFO cuando se supera max_projects."""
+    def __init__(self, component_service: Optional[ComponentService] = None, max_projects: int = 64):
+        self.component_service = component_service
+        self.max_projects = max_projects
+        self.projects = CustomHashTable(capacity=max_projects * 2)
+        self._project_order = CustomQueue()
+
+    def get(self, project_id: str) -> Optional[ProjectHistory]:
+        return self.projects.get(project_id)
+
+    def get_or_create(self, project_id: str) -> ProjectHistory:
+        history = self.projects.get(project_id)
+        if history is None:
+            history = ProjectHistory(self.component_service)
+            if self._project_order.size() >= self.max_projects:
+                self.projects.remove(self._project_order.dequeue())
+            self.projects.put(project_id, history)
+            self._project_order.enqueue(project_id)
+        return history
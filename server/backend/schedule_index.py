@@ -0,0 +1,97 @@
+import hashlib
+from typing import List, Optional
+
+from schedule_service import ScheduleResult, ScheduledTask
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_interval_tree import CustomIntervalTree
+from structures.custom_queue import CustomQueue
+from structures.sorted_search import first_at_least, first_greater
+
+class ScheduleIndex:
+    """
+    Índice de consultas temporales sobre un proyecto programado.
+    Las ventanas tempranas [inicio, fin] de las tareas van en un árbol de intervalos
+    ponderado por holgura (qué se ejecuta entre t1 y t2, qué se ejecuta en t y con
+    holgura menor que h) y dos arreglos ordenados por holgura y por inicio responden
+    "holgura menor que h" en todo el proyecto y "qué empieza después".
+    Todas las consultas cuestan O(log n + k). Los tiempos son minutos absolutos.
+    """
+    def __init__(self, schedule_id: str, result: ScheduleResult):
+        self.schedule_id = schedule_id
+        self.project_start = result["project_start"]
+        self.project_finish = result["project_finish"]
+        self.tasks: List[ScheduledTask] = result["tasks"]
+        self.tree = CustomIntervalTree(
+            [(task["early_start"], task["early_finish"]) for task in self.tasks],
+            [task["slack"] for task in self.tasks],
+        )
+
+        self.by_slack = sorted(range(len(self.tasks)), key=lambda i: self.tasks[i]["slack"])
+        self.slacks = [self.tasks[i]["slack"] for i in self.by_slack]
+        self.by_start = sorted(range(len(self.tasks)), key=lambda i: self.tasks[i]["early_start"])
+        self.starts = [self.tasks[i]["early_start"] for i in self.by_start]
+
+    def _sorted_tasks(self, positions: List[int]) -> List[ScheduledTask]:
+        return [self.tasks[i] for i in sorted(positions, key=lambda i: (self.tasks[i]["early_start"], i))]
+
+    def running(self, start: float, end: float) -> List[ScheduledTask]:
+        """Tareas cuya ventana [inicio, fin] se solapa con [start, end], por inicio."""
+        if end < start:
+            raise ValueError("end must not be before start")
+        return self._sorted_tasks(self.tree.overlap(start, end))
+
+    def at(self, moment: float) -> List[ScheduledTask]:
+        """Tareas en ejecución en un instante (incluye las que empiezan o terminan en él)."""
+        return self._sorted_tasks(self.tree.stab(moment))
+
+    def low_slack(self, max_slack: float, start: Optional[float] = None, end: Optional[float] = None) -> List[ScheduledTask]:
+        """
+        Tareas con holgura estrictamente menor que max_slack (minutos), de menor a mayor.
+        Con start/end se conservan solo las que se ejecutan en esa ventana.
+        """
+        if start is None and end is None:
+            count = first_at_least(self.slacks, max_slack)
+            return [self.tasks[i] for i in self.by_slack[:count]]
+        low = self.project_start if start is None else start
+        high = self.project_finish if end is None else end
+        positions = self.tree.overlap_below(low, high, max_slack)
+        return [self.tasks[i] for i in sorted(positions, key=lambda i: (self.tasks[i]["slack"], i))]
+
+    def starting_after(self, moment: float, limit: int = 10, inclusive: bool = False) -> List[ScheduledTask]:
+        """Próximas tareas en empezar después de 'moment' (o en él, si inclusive)."""
+        first = first_at_least(self.starts, moment) if inclusive else first_greater(self.starts, moment)
+        return [self.tasks[i] for i in self.by_start[first:first + max(0, limit)]]
+
+class ScheduleIndexService:
+    """
+    Conserva el índice de cada programación calculada, identificado por el hash de sus
+    ventanas, para que las consultas temporales no reenvíen ni reprogramen el proyecto.
+    """
+    def __init__(self, cache_size: int = 32):
+        self.cache_size = cache_size
+        self.indexes = CustomHashTable(capacity=cache_size * 2)
+        self._index_order = CustomQueue() # Orden de inserción para desalojo FIFO
+
+    def _schedule_key(self, result: ScheduleResult) -> str:
+        digest = hashlib.sha256(f"{result['project_start']!r}\x1f{result['project_finish']!r}".encode("utf-8"))
+        for task in result["tasks"]:
+            row = "\x1f".join([task["name"], task["calendar"] or ""] + [
+                repr(task[field]) for field in ("early_start", "early_finish", "late_start", "late_finish", "slack")
+            ])
+            digest.update(b"\x1e" + row.encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def build_index(self, result: ScheduleResult) -> ScheduleIndex:
+        """Compila (o reutiliza) el índice de una programación."""
+        schedule_id = self._schedule_key(result)
+        index = self.indexes.get(schedule_id)
+        if index is None:
+            index = ScheduleIndex(schedule_id, result)
+            if self._index_order.size() >= self.cache_size:
+                self.indexes.remove(self._index_order.dequeue())
+            self.indexes.put(schedule_id, index)
+            self._index_order.enqueue(schedule_id)
+        return index
+
+    def get_index(self, schedule_id: str) -> Optional[ScheduleIndex]:
+        return self.indexes.get(schedule_id)
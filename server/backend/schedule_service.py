@@ -0,0 +1,206 @@
+from typing import List, Optional, Tuple, TypedDict
+
+from task import Task
+from structures.custom_graph import CustomGraph
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_queue import CustomQueue
+from structures.working_calendar import WorkingCalendar
+
+class ScheduledTask(TypedDict):
+    name: str
+    calendar: Optional[str]
+    early_start: float
+    early_finish: float
+    late_start: float
+    late_finish: float
+    slack: float # Holgura en minutos laborables del calendario de la tarea
+    critical: bool
+
+class ScheduleResult(TypedDict):
+    cycles: List[List[str]]
+    project_start: float
+    project_finish: float
+    tasks: List[ScheduledTask]
+    critical_path: List[str]
+
+def build_index_graph(tasks: List[Task]) -> Tuple[List[List[int]], List[List[int]]]:
+    """Construye listas de predecesores y sucesores por índice a partir de las dependencias."""
+    index = CustomHashTable(capacity=len(tasks) * 2 + 1)
+    for position, task in enumerate(tasks):
+        index.put(task.name, position)
+    predecessors: List[List[int]] = [[] for _ in tasks]
+    successors: List[List[int]] = [[] for _ in tasks]
+    for position, task in enumerate(tasks):
+        for dep_name in task.dependencies:
+            dep = index.get(dep_name)
+            if dep is not None:
+                predecessors[position].append(dep)
+                successors[dep].append(position)
+    return predecessors, successors
+
+def topological_order(successors: List[List[int]]) -> List[int]:
+    """Orden topológico por índices (Kahn con Cola); es incompleto si hay ciclos."""
+    remaining = [0] * len(successors)
+    for targets in successors:
+        for target in targets:
+            remaining[target] += 1
+    order: List[int] = []
+    queue = CustomQueue()
+    for position in range(len(successors)):
+        if remaining[position] == 0:
+            queue.enqueue(position)
+    while not queue.is_empty():
+        current = queue.dequeue()
+        order.append(current)
+        for target in successors[current]:
+            remaining[target] -= 1
+            if remaining[target] == 0:
+                queue.enqueue(target)
+    return order
+
+def find_cycles(tasks: List[Task], predecessors: List[List[int]]) -> List[List[str]]:
+    """Un ciclo por bloque cíclico de la condensación de CustomGraph (sin recursión)."""
+    graph = CustomGraph(capacity=len(tasks) * 2)
+    for task in tasks:
+        graph.add_node(task.name, data=task)
+    for position, task in enumerate(tasks):
+        for dep in predecessors[position]:
+            graph.add_edge(tasks[dep].name, task.name)
+    return graph.condense()["cycles"]
+
+class _ContinuousCalendar:
+    """Calendario 24/7: el tiempo laboral coincide con el tiempo transcurrido."""
+    name = None
+
+    def next_working_minute(self, moment: float) -> float:
+        return moment
+
+    def add_working_time(self, start: float, duration: float) -> float:
+        return start + duration
+
+    def subtract_working_time(self, finish: float, duration: float) -> float:
+        return finish - duration
+
+    def working_minutes_between(self, start: float, finish: float) -> float:
+        return finish - start
+
+CONTINUOUS = _ContinuousCalendar()
+
+class ScheduleService:
+    """
+    Programa el proyecto con el método de la ruta crítica (pasadas hacia adelante
+    y hacia atrás) respetando el calendario laboral de cada tarea.
+    Los tiempos son minutos absolutos (ver structures.working_calendar.EPOCH).
+    """
+    def __init__(self):
+        self.calendars = CustomHashTable(capacity=64)
+        self._calendar_names: List[str] = []
+
+    def register_calendar(self, calendar: WorkingCalendar):
+        """Registra (o reemplaza) un calendario compilado."""
+        if not self.calendars.contains(calendar.name):
+            self._calendar_names.append(calendar.name)
+        self.calendars.put(calendar.name, calendar)
+
+    def get_calendar(self, name: str) -> Optional[WorkingCalendar]:
+        return self.calendars.get(name)
+
+    def get_all_calendars(self) -> List[WorkingCalendar]:
+        return [self.calendars.get(name) for name in self._calendar_names]
+
+    def resolve_calendar(self, name: Optional[str]):
+        """Devuelve el calendario registrado o el continuo si no se especifica ninguno."""
+        if not name:
+            return CONTINUOUS
+        calendar = self.calendars.get(name)
+        if calendar is None:
+            raise ValueError(f"Calendar {name} does not exist")
+        return calendar
+
+    def schedule(self, tasks: List[Task], project_start: float, default_calendar: Optional[str] = None) -> ScheduleResult:
+        """
+        Calcula inicio/fin tempranos y tardíos, holguras y ruta crítica.
+        Las duraciones de las tareas deben venir en minutos laborables.
+        """
+        count = len(tasks)
+        calendars = [self.resolve_calendar(task.calendar or default_calendar) for task in tasks]
+        predecessors, successors = build_index_graph(tasks)
+
+        # Orden topológico (Kahn); si no se completa, hay ciclos
+        order = topological_order(successors)
+        if len(order) < count:
+            return {
+                "cycles": find_cycles(tasks, predecessors),
+                "project_start": project_start,
+                "project_finish": project_start,
+                "tasks": [],
+                "critical_path": [],
+            }
+
+        # Pasada hacia adelante: inicio y fin tempranos
+        early_start = [0.0] * count
+        early_finish = [0.0] * count
+        for current in order:
+            start = project_start
+            for dep in predecessors[current]:
+                if early_finish[dep] > start:
+                    start = early_finish[dep]
+            calendar = calendars[current]
+            duration = tasks[current].duration
+            if duration > 0:
+                start = calendar.next_working_minute(start)
+            early_start[current] = start
+            early_finish[current] = calendar.add_working_time(start, duration)
+
+        project_finish = max(early_finish) if early_finish else project_start
+
+        # Pasada hacia atrás: inicio y fin tardíos
+        late_start = [0.0] * count
+        late_finish = [0.0] * count
+        for current in reversed(order):
+            finish = project_finish
+            for target in successors[current]:
+                if late_start[target] < finish:
+                    finish = late_start[target]
+            late_finish[current] = finish
+            late_start[current] = calendars[current].subtract_working_time(finish, tasks[current].duration)
+
+        scheduled: List[ScheduledTask] = []
+        critical = [False] * count
+        for current in order:
+            slack = calendars[current].working_minutes_between(early_start[current], late_start[current])
+            critical[current] = slack <= 1e-6
+            scheduled.append({
+                "name": tasks[current].name,
+                "calendar": calendars[current].name,
+                "early_start": early_start[current],
+                "early_finish": early_finish[current],
+                "late_start": late_start[current],
+                "late_finish": late_finish[current],
+                "slack": max(0.0, slack),
+                "critical": critical[current],
+            })
+
+        # Ruta crítica: desde la tarea crítica que termina el proyecto, retrocediendo
+        # por el predecesor crítico que determina su inicio
+        critical_path: List[str] = []
+        current = None
+        for position in order:
+            if critical[position] and early_finish[position] >= project_finish and (current is None or early_finish[position] > early_finish[current]):
+                current = position
+        while current is not None:
+            critical_path.append(tasks[current].name)
+            driver = None
+            for dep in predecessors[current]:
+                if critical[dep] and (driver is None or early_finish[dep] > early_finish[driver]):
+                    driver = dep
+            current = driver
+        critical_path.reverse()
+
+        return {
+            "cycles": [],
+            "project_start": project_start,
+            "project_finish": project_finish,
+            "tasks": scheduled,
+            "critical_path": critical_path,
+        }
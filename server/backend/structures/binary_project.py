@@ -0,0 +1,224 @@
+import mmap
+import struct
+from array import array
+from typing import BinaryIO, List, TypedDict
+
+import numpy as np
+
+from .compiled_project import CompiledProject, PRIORITY_CODES
+
+# Formato binario (little-endian, secciones alineadas a 8 bytes):
+#   encabezado | offsets de cadenas (u8, 2n + s + 1) | bytes UTF-8 de las cadenas |
+#   sub-proyecto por tarea (i4, índice de cadena) | duraciones (f8, minutos) |
+#   prioridades (i1) | offsets CSR (i8, n + 1) | destinos CSR (i4, m)
+# La tabla de cadenas guarda los nombres (0..n-1), los identificadores externos
+# (n..2n-1) y los s sub-proyectos distintos a continuación.
+MAGIC = b"TFPB"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHHQQQ8Q")
+_ALIGNMENT = 8
+
+# Máximo de tareas bloqueadas por ciclos que se reportan por nombre
+MAX_REPORTED = 100
+
+class BinaryAnalysis(TypedDict):
+    task_count: int
+    dependency_count: int
+    cyclic_task_count: int # Tareas en ciclos o que dependen de ellos (no entran en el orden)
+    level_count: int
+    total_duration_minutes: float
+    longest_path_minutes: float # Sobre la parte acíclica del proyecto
+    critical_priority_count: int
+    critical_path: List[str]
+    blocked_tasks: List[str] # Muestra de tareas bloqueadas por ciclos
+    order: np.ndarray # Índices de tarea en orden topológico (sin las bloqueadas)
+
+def _pad(handle: BinaryIO) -> int:
+    """Rellena con ceros hasta el siguiente múltiplo de _ALIGNMENT y devuelve la posición."""
+    position = handle.tell()
+    padding = -position % _ALIGNMENT
+    if padding:
+        handle.write(b"\0" * padding)
+    return position + padding
+
+def write_binary_project(project: CompiledProject, path: str):
+    """Escribe el proyecto compilado (ya finalizado) en el formato binario."""
+    count = project.task_count()
+    if len(project.offsets) != count + 1:
+        raise ValueError("CompiledProject must be finalized before writing")
+    subproject_index = {}
+    subproject_refs = array("i")
+    for path_name in project.subprojects:
+        if path_name not in subproject_index:
+            subproject_index[path_name] = 2 * count + len(subproject_index)
+        subproject_refs.append(subproject_index[path_name])
+
+    with open(path, "wb") as handle:
+        handle.write(b"\0" * _HEADER.size)
+        sections = []
+
+        # Tabla de cadenas: primero los bytes (para conocer los offsets) y luego el índice
+        string_offsets = array("q", [0])
+        blob_start = _pad(handle)
+        for text in (*project.names, *project.external_ids, *subproject_index):
+            handle.write(text.encode("utf-8"))
+            string_offsets.append(handle.tell() - blob_start)
+        sections.append(_pad(handle))
+        handle.write(string_offsets.tobytes())
+        sections.append(blob_start)
+
+        # array("l") ocupa 8 bytes en Linux de 64 bits: los destinos se fijan a i4
+        targets = array("i", project.targets)
+        for column in (subproject_refs, project.durations, project.priorities, project.offsets, targets):
+            sections.append(_pad(handle))
+            handle.write(column.tobytes())
+
+        handle.seek(0)
+        handle.write(_HEADER.pack(
+            MAGIC, FORMAT_VERSION, 0, count, len(project.targets), len(subproject_index),
+            *sections, 0,
+        ))
+
+class BinaryProject:
+    """
+    Proyecto binario abierto con mmap. Abrirlo solo lee el encabezado: las columnas son
+    vistas NumPy sin copia sobre el buffer mapeado y el sistema operativo carga las páginas
+    a medida que el análisis las recorre; las cadenas se decodifican solo al pedirlas.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError("Empty binary project file")
+        header = _HEADER.unpack_from(self._buffer, 0)
+        magic, version, _, count, edges, subproject_count = header[:6]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("Not a binary project file")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported binary project version {version}")
+        self.count = count
+        self.edge_count = edges
+        self.subproject_count = subproject_count
+        offsets_at, blob_at, subprojects_at, durations_at, priorities_at, csr_offsets_at, targets_at, _ = header[6:]
+
+        self._string_offsets = self._view(np.int64, 2 * count + subproject_count + 1, offsets_at)
+        self._blob_at = blob_at
+        self.subproject_refs = self._view(np.int32, count, subprojects_at)
+        self.durations = self._view(np.float64, count, durations_at)
+        self.priorities = self._view(np.int8, count, priorities_at)
+        self.offsets = self._view(np.int64, count + 1, csr_offsets_at)
+        self.targets = self._view(np.int32, edges, targets_at)
+
+    def _view(self, dtype, count: int, offset: int) -> np.ndarray:
+        return np.frombuffer(self._buffer, dtype=dtype, count=count, offset=offset)
+
+    def close(self):
+        # Las vistas NumPy mantienen exportado el buffer: se sueltan antes de cerrar el mmap
+        for name in ("_string_offsets", "subproject_refs", "durations", "priorities", "offsets", "targets"):
+            if hasattr(self, name):
+                delattr(self, name)
+        self._buffer.close()
+        self._file.close()
+
+    def __enter__(self) -> "BinaryProject":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def task_count(self) -> int:
+        return self.count
+
+    def _string(self, index: int) -> str:
+        start = self._blob_at + int(self._string_offsets[index])
+        end = self._blob_at + int(self._string_offsets[index + 1])
+        return self._buffer[start:end].decode("utf-8")
+
+    def name(self, task: int) -> str:
+        return self._string(task)
+
+    def external_id(self, task: int) -> str:
+        return self._string(self.count + task)
+
+    def subproject(self, task: int) -> str:
+        return self._string(int(self.subproject_refs[task]))
+
+    def successors(self, task: int) -> np.ndarray:
+        return self.targets[self.offsets[task]:self.offsets[task + 1]]
+
+    def _expand(self, frontier: np.ndarray):
+        """Sucesores de todas las tareas de la frontera (posiciones CSR sin bucles en Python)."""
+        starts = self.offsets[frontier]
+        lengths = self.offsets[frontier + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int32), lengths
+        shifts = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.targets[shifts + np.arange(total)], lengths
+
+    def analyze(self) -> BinaryAnalysis:
+        """
+        Kahn por frentes sobre el CSR mapeado: cada nivel se procesa con operaciones
+        vectorizadas (grado de entrada, inicio más temprano y mejor predecesor), así que
+        el trabajo en Python es proporcional al número de niveles y no de tareas.
+        Las tareas que no entran en el orden están en ciclos o dependen de ellos.
+        """
+        count = self.count
+        in_degree = np.bincount(self.targets, minlength=count).astype(np.int64)
+        start = np.zeros(count, dtype=np.float64)
+        finish = np.zeros(count, dtype=np.float64)
+        best_pred = np.full(count, -1, dtype=np.int64)
+
+        frontier = np.flatnonzero(in_degree == 0)
+        frontiers = []
+        while frontier.size:
+            finish[frontier] = start[frontier] + self.durations[frontier]
+            frontiers.append(frontier)
+            successors, lengths = self._expand(frontier)
+            if not successors.size:
+                break
+            sources = np.repeat(frontier, lengths)
+            arrivals = finish[sources]
+            np.maximum.at(start, successors, arrivals)
+            on_max = arrivals == start[successors]
+            best_pred[successors[on_max]] = sources[on_max]
+            np.subtract.at(in_degree, successors, 1)
+            frontier = np.unique(successors[in_degree[successors] == 0])
+
+        order = np.concatenate(frontiers) if frontiers else np.empty(0, dtype=np.int64)
+        blocked = count - order.size
+
+        critical_path: List[str] = []
+        longest = 0.0
+        if order.size:
+            last = int(order[np.argmax(finish[order])])
+            longest = float(finish[last])
+            chain = []
+            while last != -1:
+                chain.append(last)
+                last = int(best_pred[last])
+            critical_path = [self.name(task) for task in reversed(chain)]
+
+        blocked_tasks: List[str] = []
+        if blocked:
+            reached = np.zeros(count, dtype=bool)
+            reached[order] = True
+            blocked_tasks = [self.name(int(task)) for task in np.flatnonzero(~reached)[:MAX_REPORTED]]
+
+        return {
+            "task_count": count,
+            "dependency_count": self.edge_count,
+            "cyclic_task_count": blocked,
+            "level_count": len(frontiers),
+            "total_duration_minutes": float(self.durations.sum()),
+            "longest_path_minutes": longest,
+            "critical_priority_count": int(np.count_nonzero(self.priorities == PRIORITY_CODES["Crítica"])),
+            "critical_path": critical_path,
+            "blocked_tasks": blocked_tasks,
+            "order": order,
+        }
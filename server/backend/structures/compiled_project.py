@@ -0,0 +1,120 @@
+from array import array
+from typing import List, Optional, TypedDict
+
+# Códigos compactos de prioridad (un byte por tarea)
+PRIORITY_CODES = {"Baja": 1, "Media": 2, "Alta": 3, "Crítica": 4}
+PRIORITY_NAMES = {code: name for name, code in PRIORITY_CODES.items()}
+
+class CompiledAnalysis(TypedDict):
+    task_count: int
+    dependency_count: int
+    cyclic_task_count: int
+    level_count: int
+    total_duration_minutes: float
+    longest_path_minutes: Optional[float]
+    critical_priority_count: int
+
+class CompiledProject:
+    """
+    Proyecto compilado en columnas compactas en lugar de objetos Task/GraphNode.
+    Duraciones y prioridades viven en arreglos tipados y las dependencias se guardan
+    como pares de índices que finalize() convierte a adyacencia CSR (offsets + targets).
+    """
+    def __init__(self):
+        self.external_ids: List[str] = []
+        self.names: List[str] = []
+        self.subprojects: List[str] = []
+        self.durations = array("d")  # Minutos
+        self.priorities = array("b")
+        self._edge_sources = array("l")
+        self._edge_targets = array("l")
+        # CSR de sucesores: los sucesores de i son targets[offsets[i]:offsets[i + 1]]
+        self.offsets = array("q")
+        self.targets = array("l")
+
+    def add_task(self, external_id: str, name: str, duration: float, priority: str = "Media", subproject: str = "") -> int:
+        """Añade una tarea y devuelve su índice."""
+        self.external_ids.append(external_id)
+        self.names.append(name)
+        self.subprojects.append(subproject)
+        self.durations.append(duration)
+        self.priorities.append(PRIORITY_CODES.get(priority, PRIORITY_CODES["Media"]))
+        return len(self.names) - 1
+
+    def add_dependency(self, dependency: int, task: int):
+        """Registra que 'task' depende de 'dependency' (arista dependency -> task)."""
+        self._edge_sources.append(dependency)
+        self._edge_targets.append(task)
+
+    def task_count(self) -> int:
+        return len(self.names)
+
+    def dependency_count(self) -> int:
+        return len(self._edge_sources)
+
+    def finalize(self):
+        """Construye la adyacencia CSR con un ordenamiento por conteo de las aristas."""
+        count = len(self.names)
+        offsets = array("q", [0]) * (count + 1)
+        for source in self._edge_sources:
+            offsets[source + 1] += 1
+        for i in range(count):
+            offsets[i + 1] += offsets[i]
+
+        targets = array("l", [0]) * len(self._edge_sources)
+        cursor = array("q", offsets[:count]) if count else array("q")
+        for source, target in zip(self._edge_sources, self._edge_targets):
+            targets[cursor[source]] = target
+            cursor[source] += 1
+
+        self.offsets = offsets
+        self.targets = targets
+
+    def successors(self, task: int) -> array:
+        return self.targets[self.offsets[task]:self.offsets[task + 1]]
+
+    def dependency_lists(self) -> List[List[int]]:
+        """Dependencias de cada tarea (una pasada sobre las aristas)."""
+        result: List[List[int]] = [[] for _ in self.names]
+        for source, target in zip(self._edge_sources, self._edge_targets):
+            result[target].append(source)
+        return result
+
+    def analyze(self) -> CompiledAnalysis:
+        """
+        Orden topológico (Kahn), niveles y camino más largo directamente sobre el CSR.
+        Las tareas que no entran en el orden pertenecen a ciclos o dependen de ellos.
+        """
+        count = len(self.names)
+        in_degree = array("l", [0]) * count
+        for target in self.targets:
+            in_degree[target] += 1
+
+        # El propio arreglo del orden sirve de cola: se lee desde 'head' y se escribe al final
+        order = array("l", (i for i in range(count) if in_degree[i] == 0))
+        level = array("l", [0]) * count
+        finish = array("d", self.durations)
+        head = 0
+        while head < len(order):
+            current = order[head]
+            head += 1
+            for position in range(self.offsets[current], self.offsets[current + 1]):
+                target = self.targets[position]
+                if level[current] + 1 > level[target]:
+                    level[target] = level[current] + 1
+                if finish[current] + self.durations[target] > finish[target]:
+                    finish[target] = finish[current] + self.durations[target]
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    order.append(target)
+
+        cyclic = count - len(order)
+        return {
+            "task_count": count,
+            "dependency_count": len(self.targets),
+            "cyclic_task_count": cyclic,
+            "level_count": (max(level[i] for i in order) + 1) if len(order) else 0,
+            "total_duration_minutes": sum(self.durations),
+            "longest_path_minutes": (max(finish[i] for i in order) if len(order) else 0.0) if cyclic == 0 else None,
+            "critical_priority_count": sum(1 for code in self.priorities if code == PRIORITY_CODES["Crítica"]),
+        }
@@ -0,0 +1,75 @@
+from typing import List
+
+from .custom_queue import CustomQueue
+
+INFINITY = float("inf")
+
+class CustomFlowNetwork:
+    """
+    Red de flujo sobre listas de adyacencia con aristas residuales emparejadas.
+    Calcula el flujo máximo con Edmonds-Karp (caminos aumentantes más cortos por BFS)
+    y el corte mínimo asociado.
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self.adjacency: List[List[int]] = [[] for _ in range(size)]
+        # Arreglos paralelos por arista; la arista i ^ 1 es la residual de i
+        self.targets: List[int] = []
+        self.capacities: List[float] = []
+
+    def add_edge(self, source: int, target: int, capacity: float):
+        """Añade una arista dirigida con su capacidad (y su residual con capacidad 0)."""
+        self.adjacency[source].append(len(self.targets))
+        self.targets.append(target)
+        self.capacities.append(capacity)
+        self.adjacency[target].append(len(self.targets))
+        self.targets.append(source)
+        self.capacities.append(0.0)
+
+    def _bfs_parents(self, source: int) -> List[int]:
+        """BFS en la red residual; devuelve la arista por la que se llegó a cada nodo (-1 si no)."""
+        parent_edge = [-1] * self.size
+        visited = [False] * self.size
+        visited[source] = True
+        queue = CustomQueue()
+        queue.enqueue(source)
+        while not queue.is_empty():
+            current = queue.dequeue()
+            for edge in self.adjacency[current]:
+                target = self.targets[edge]
+                if not visited[target] and self.capacities[edge] > 1e-12:
+                    visited[target] = True
+                    parent_edge[target] = edge
+                    queue.enqueue(target)
+        return parent_edge
+
+    def max_flow(self, source: int, sink: int) -> float:
+        """Calcula el flujo máximo de source a sink (INFINITY si no hay corte finito)."""
+        total = 0.0
+        while True:
+            parent_edge = self._bfs_parents(source)
+            if parent_edge[sink] == -1:
+                return total
+
+            # Cuello de botella del camino aumentante
+            bottleneck = INFINITY
+            node = sink
+            while node != source:
+                edge = parent_edge[node]
+                bottleneck = min(bottleneck, self.capacities[edge])
+                node = self.targets[edge ^ 1]
+            if bottleneck == INFINITY:
+                return INFINITY
+
+            node = sink
+            while node != source:
+                edge = parent_edge[node]
+                self.capacities[edge] -= bottleneck
+                self.capacities[edge ^ 1] += bottleneck
+                node = self.targets[edge ^ 1]
+            total += bottleneck
+
+    def reachable_from(self, source: int) -> List[bool]:
+        """Nodos alcanzables en la red residual (el lado 'source' del corte mínimo)."""
+        parent_edge = self._bfs_parents(source)
+        return [node == source or parent_edge[node] != -1 for node in range(self.size)]
@@ -1,23 +1,55 @@
-from typing import List, Dict, Any, Optional, TypedDict
+from typing import List, Dict, Any, Callable, Optional, Tuple, TypedDict
 
 from .custom_hash_table import CustomHashTable
 from .graph_node import GraphNode
 from .custom_stack import CustomStack
 from .custom_set import CustomSet
+from .custom_heap import CustomMaxHeap
+
+# condense() llama a progress(fracción completada) cada PROGRESS_INTERVAL nodos cerrados.
+# El callback puede lanzar una excepción para cancelar el análisis en ese punto.
+PROGRESS_INTERVAL = 1024
+ProgressCallback = Callable[[float], None]
 
 class OrderResult(TypedDict):
     order: List[str]
     total_duration_hours: float
     critical_tasks_count: int
 
+class CondensationResult(OrderResult):
+    blocks: List[List[str]] # Componentes fuertemente conexos en orden topológico
+    block_successors: List[List[int]] # Grafo de bloques: índices en 'blocks' de los sucesores (una entrada por arista)
+    cyclic_blocks: List[List[str]] # Bloques con un ciclo (más de una tarea o auto-dependencia)
+    cycles: List[List[str]] # Un ciclo por bloque cíclico, cerrado con su primera tarea repetida
+    levels: Dict[int, List[str]]
+    critical_path: List[str]
+    longest_path_minutes: float
+
+class RankedPath(TypedDict):
+    tasks: List[str] # De una tarea inicial a una final
+    length_minutes: float
+
+class RankedPathsResult(TypedDict):
+    longest_path_minutes: float
+    paths: List[RankedPath] # De mayor a menor duración
+    truncated: bool # Quedaban caminos que cumplían el criterio
+
+def _task_metrics(task_data: Any) -> Tuple[float, bool]:
+    """Duración (minutos) y si es de prioridad "Crítica", para un objeto Task o un dict."""
+    if hasattr(task_data, 'duration'):
+        return task_data.duration, task_data.priority == "Crítica"
+    if isinstance(task_data, dict):
+        return task_data.get('duration', 0), task_data.get('priority') == "Crítica"
+    return 0, False
+
 class CustomGraph:
     """
     Implementación de un Grafo Dirigido personalizado.
     Incluye lógica de detección de ciclos (DFS) y ordenamiento topológico.
     """
-    def __init__(self):
+    def __init__(self, capacity: int = 100):
         # Usamos nuestra Tabla Hash para almacenar los nodos: nombre -> GraphNode
-        self.nodes = CustomHashTable(capacity=100)
+        self.nodes = CustomHashTable(capacity=capacity)
         self._node_keys: List[str] = [] # Lista auxiliar para iterar sobre las claves
 
     def add_node(self, name: str, data: Any = None):
@@ -135,22 +167,10 @@ class CustomGraph:
         for task_name in order:
             node = self.nodes.get(task_name)
             if node and node.data:
-                # Asumimos que node.data es un objeto Task o dict con 'duration' y 'priority'
-                # En api.py pasaremos el objeto Task completo o un dict con atributos
-                # Ajustaremos esto para que sea compatible con lo que guardemos en 'data'
-                task_data = node.data
-                # Si es objeto Task
-                if hasattr(task_data, 'duration'):
-                     # Convertir a minutos si es necesario, pero asumiremos que ya viene en minutos o se maneja antes
-                     # En graph_builder original convertía a minutos. Haremos eso al insertar.
-                     total_duration_minutes += task_data.duration
-                     if task_data.priority == "Crítica":
-                         critical_tasks_count += 1
-                # Si es dict (compatibilidad con networkx node attrs)
-                elif isinstance(task_data, dict):
-                    total_duration_minutes += task_data.get('duration', 0)
-                    if task_data.get('priority') == "Crítica":
-                        critical_tasks_count += 1
+                duration, is_critical = _task_metrics(node.data)
+                total_duration_minutes += duration
+                if is_critical:
+                    critical_tasks_count += 1
 
         total_duration_hours = total_duration_minutes / 60.0
 
@@ -159,3 +179,248 @@ class CustomGraph:
             "total_duration_hours": total_duration_hours,
             "critical_tasks_count": critical_tasks_count
         }
+
+    def _index_successors(self) -> List[List[int]]:
+        """Listas de sucesores por posición de nodo (en el orden de inserción)."""
+        position = CustomHashTable(capacity=len(self._node_keys) * 2 + 1)
+        for i, name in enumerate(self._node_keys):
+            position.put(name, i)
+        return [
+            [position.get(neighbor.name) for neighbor in self.nodes.get(name).neighbors]
+            for name in self._node_keys
+        ]
+
+    def condense(self, progress: Optional[ProgressCallback] = None) -> CondensationResult:
+        """
+        Analiza el grafo sobre su condensación: cada componente fuertemente conexo (Tarjan
+        iterativo) se reduce a un bloque, y el grafo de bloques siempre es acíclico.
+        Tarjan emite los bloques en orden topológico inverso, así que una segunda pasada
+        lineal sobre las aristas calcula niveles y camino más largo. En total O(V + E).
+
+        Sin ciclos, el orden coincide con el de get_tasks_order(). Un bloque cíclico ocupa
+        un solo nivel y su duración es la suma de la de sus tareas (se ejecutan en serie).
+        """
+        count = len(self._node_keys)
+        successors = self._index_successors()
+
+        # Tarjan iterativo: 'work' simula la pila de llamadas (nodo, siguiente vecino a visitar)
+        index = [-1] * count
+        lowlink = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        block_of = [-1] * count
+        blocks_reversed: List[List[int]] = []
+        counter = 0
+        closed = 0
+        for root in range(count):
+            if index[root] != -1:
+                continue
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                node, next_neighbor = work[-1]
+                neighbors = successors[node]
+                while next_neighbor < len(neighbors):
+                    neighbor = neighbors[next_neighbor]
+                    next_neighbor += 1
+                    if index[neighbor] == -1:
+                        break
+                    if on_stack[neighbor] and index[neighbor] < lowlink[node]:
+                        lowlink[node] = index[neighbor]
+                else:
+                    # Todos los vecinos procesados: cerrar el nodo
+                    work.pop()
+                    closed += 1
+                    if progress is not None and closed % PROGRESS_INTERVAL == 0:
+                        progress(closed / count)
+                    if work and lowlink[node] < lowlink[work[-1][0]]:
+                        lowlink[work[-1][0]] = lowlink[node]
+                    if lowlink[node] == index[node]:
+                        members: List[int] = []
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = False
+                            block_of[member] = len(blocks_reversed)
+                            members.append(member)
+                            if member == node:
+                                break
+                        members.reverse() # Orden de descubrimiento
+                        blocks_reversed.append(members)
+                    continue
+                # Descender al vecino no visitado
+                work[-1] = (node, next_neighbor)
+                index[neighbor] = lowlink[neighbor] = counter
+                counter += 1
+                stack.append(neighbor)
+                on_stack[neighbor] = True
+                work.append((neighbor, 0))
+
+        # Pasada en orden topológico de bloques: niveles y camino más largo (en minutos)
+        block_count = len(blocks_reversed)
+        durations = [0.0] * count
+        critical_tasks_count = 0
+        for i, name in enumerate(self._node_keys):
+            node = self.nodes.get(name)
+            if node.data:
+                duration, is_critical = _task_metrics(node.data)
+                durations[i] = duration
+                if is_critical:
+                    critical_tasks_count += 1
+
+        weight = [sum(durations[m] for m in members) for members in blocks_reversed]
+        finish = list(weight)
+        level = [0] * block_count
+        best_pred = [-1] * block_count
+        is_cyclic = [False] * block_count
+        block_successors: List[List[int]] = [[] for _ in range(block_count)]
+        for block in range(block_count - 1, -1, -1):
+            members = blocks_reversed[block]
+            is_cyclic[block] = len(members) > 1
+            for member in members:
+                for target in successors[member]:
+                    target_block = block_of[target]
+                    if target_block == block:
+                        is_cyclic[block] = True # Incluye auto-dependencias
+                        continue
+                    block_successors[block_count - 1 - block].append(block_count - 1 - target_block)
+                    if level[block] + 1 > level[target_block]:
+                        level[target_block] = level[block] + 1
+                    if finish[block] + weight[target_block] > finish[target_block]:
+                        finish[target_block] = finish[block] + weight[target_block]
+                        best_pred[target_block] = block
+
+        blocks: List[List[str]] = []
+        cyclic_blocks: List[List[str]] = []
+        cycles: List[List[str]] = []
+        order: List[str] = []
+        levels: Dict[int, List[str]] = {}
+        for block in range(block_count - 1, -1, -1):
+            names = [self._node_keys[m] for m in blocks_reversed[block]]
+            blocks.append(names)
+            if is_cyclic[block]:
+                cyclic_blocks.append(names)
+                cycles.append(self._block_cycle(blocks_reversed[block], block, block_of, successors))
+            order.extend(names)
+            if level[block] not in levels:
+                levels[level[block]] = []
+            levels[level[block]].extend(names)
+
+        critical_path: List[str] = []
+        last = max(range(block_count), key=lambda b: finish[b], default=-1)
+        chain: List[int] = []
+        while last != -1:
+            chain.append(last)
+            last = best_pred[last]
+        for block in reversed(chain):
+            critical_path.extend(self._node_keys[m] for m in blocks_reversed[block])
+
+        return {
+            "order": order,
+            "total_duration_hours": sum(durations) / 60.0,
+            "critical_tasks_count": critical_tasks_count,
+            "blocks": blocks,
+            "block_successors": block_successors,
+            "cyclic_blocks": cyclic_blocks,
+            "cycles": cycles,
+            "levels": dict(sorted(levels.items())),
+            "critical_path": critical_path,
+            "longest_path_minutes": max(finish, default=0.0),
+        }
+
+    def _block_cycle(self, members: List[int], block: int, block_of: List[int], successors: List[List[int]]) -> List[str]:
+        """
+        Un ciclo dentro de un bloque cíclico, en O(tamaño del bloque) y sin recursión:
+        en un componente fuertemente conexo toda tarea tiene un sucesor en el mismo bloque,
+        así que basta avanzar por él hasta repetir una tarea.
+        """
+        seen_at: Dict[int, int] = {}
+        path: List[int] = []
+        node = members[0]
+        while node not in seen_at:
+            seen_at[node] = len(path)
+            path.append(node)
+            node = next(target for target in successors[node] if block_of[target] == block)
+        cycle = path[seen_at[node]:] + [node]
+        return [self._node_keys[i] for i in cycle]
+
+    def longest_paths(self, k: int, within_minutes: Optional[float] = None) -> RankedPathsResult:
+        """
+        Los k caminos más largos (de una tarea inicial a una final, por suma de duraciones)
+        o, con within_minutes, todos los que quedan a menos de ese margen del más largo
+        (hasta k). Requiere un grafo acíclico; con ciclos lanza ValueError.
+
+        Algoritmo de desviaciones: en orden topológico inverso se calcula para cada tarea
+        el mejor sufijo (camino más largo hasta el final). Cada camino se representa como
+        "prefijo de su camino padre + desvío por otra arista + mejor sufijo", y su duración
+        se conoce sin construirlo. Un montículo máximo entrega los caminos en orden; al
+        extraer uno solo se generan sus desvíos (uno por arista alternativa a lo largo del
+        camino), así que el costo es O(V + E + k·L·d·log) para caminos de L tareas y grado
+        d, sin enumerar los caminos que no se devuelven.
+        """
+        count = len(self._node_keys)
+        successors = self._index_successors()
+        durations = [0.0] * count
+        in_degree = [0] * count
+        for i, name in enumerate(self._node_keys):
+            data = self.nodes.get(name).data
+            if data:
+                durations[i] = _task_metrics(data)[0]
+            for target in successors[i]:
+                in_degree[target] += 1
+
+        # Kahn: orden topológico (y detección de ciclos)
+        sources = [i for i in range(count) if in_degree[i] == 0]
+        order = list(sources)
+        remaining = list(in_degree)
+        for node in order:
+            for target in successors[node]:
+                remaining[target] -= 1
+                if remaining[target] == 0:
+                    order.append(target)
+        if len(order) < count:
+            raise ValueError("Longest paths require a graph without cycles")
+
+        # Mejor sufijo: duración del camino más largo que empieza en cada tarea
+        tail = [0.0] * count
+        best_next = [-1] * count
+        for node in reversed(order):
+            best = 0.0
+            for target in successors[node]:
+                if best_next[node] == -1 or tail[target] > best:
+                    best, best_next[node] = tail[target], target
+            tail[node] = durations[node] + best
+
+        longest = max((tail[s] for s in sources), default=0.0)
+        threshold = longest - within_minutes - 1e-9 if within_minutes is not None else None
+
+        # Candidato: (duración, camino padre, posición del desvío, tarea de desvío, duración del prefijo)
+        candidates = CustomMaxHeap(key=lambda candidate: candidate[0])
+        for source in sources:
+            candidates.insert((tail[source], -1, 0, source, 0.0))
+
+        paths: List[List[int]] = []
+        result: List[RankedPath] = []
+        while len(result) < k and not candidates.is_empty():
+            if threshold is not None and candidates.peek()[0] < threshold:
+                break
+            length, parent, deviation, node, prefix = candidates.extract_max()
+            path = paths[parent][:deviation] if parent != -1 else []
+            while node != -1:
+                path.append(node)
+                node = best_next[node]
+            paths.append(path)
+            result.append({"tasks": [self._node_keys[i] for i in path], "length_minutes": length})
+
+            # Desvíos a partir de la posición del último desvío (los anteriores ya los generó el padre)
+            for i in range(deviation, len(path)):
+                prefix += durations[path[i]]
+                following = path[i + 1] if i + 1 < len(path) else -1
+                for target in successors[path[i]]:
+                    if target != following:
+                        candidates.insert((prefix + tail[target], len(paths) - 1, i + 1, target, prefix))
+
+        truncated = not candidates.is_empty() and (threshold is None or candidates.peek()[0] >= threshold)
+        return {"longest_path_minutes": longest, "paths": result, "truncated": truncated}
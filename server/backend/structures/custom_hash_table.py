@@ -3,19 +3,34 @@ from typing import Any, Optional, List, Tuple
 class CustomHashTable:
     """
     Implementación de una Tabla Hash con resolución de colisiones por encadenamiento.
+    La tabla duplica su capacidad cuando el factor de carga supera MAX_LOAD_FACTOR.
     """
+    MAX_LOAD_FACTOR = 0.75
+
     def __init__(self, capacity: int = 100):
-        self.capacity = capacity
+        self.capacity = max(1, capacity)
         self.size = 0
         # Inicializamos los buckets como listas vacías
-        self.buckets: List[List[Tuple[str, Any]]] = [[] for _ in range(capacity)]
+        self.buckets: List[List[Tuple[str, Any]]] = [[] for _ in range(self.capacity)]
 
     def _hash(self, key: str) -> int:
-        """Función hash simple para cadenas."""
-        hash_sum = 0
+        """
+        Hash polinomial (base 31) para cadenas. A diferencia de sumar los códigos,
+        distingue permutaciones ("12" y "21") y reparte bien identificadores numéricos.
+        """
+        hash_value = 0
         for char in key:
-            hash_sum += ord(char)
-        return hash_sum % self.capacity
+            hash_value = (hash_value * 31 + ord(char)) & 0xFFFFFFFF
+        return hash_value % self.capacity
+
+    def _resize(self, new_capacity: int):
+        """Redistribuye todos los pares en una tabla de mayor capacidad."""
+        old_buckets = self.buckets
+        self.capacity = new_capacity
+        self.buckets = [[] for _ in range(new_capacity)]
+        for bucket in old_buckets:
+            for key, value in bucket:
+                self.buckets[self._hash(key)].append((key, value))
 
     def put(self, key: str, value: Any):
         """Inserta o actualiza un par clave-valor."""
@@ -29,6 +44,8 @@ class CustomHashTable:
 
         bucket.append((key, value)) # Insertar nuevo
         self.size += 1
+        if self.size > self.capacity * self.MAX_LOAD_FACTOR:
+            self._resize(self.capacity * 2)
 
     def get(self, key: str) -> Optional[Any]:
         """Obtiene el valor asociado a una clave."""
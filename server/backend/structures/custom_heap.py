@@ -1,11 +1,13 @@
-from typing import Any, List
+from typing import Any, Callable, List, Optional
 
 class CustomMaxHeap:
     """
     Implementación de un Montículo Máximo (Max Heap) para priorizar tareas.
+    Opcionalmente recibe una función 'key' para ordenar por un valor numérico arbitrario.
     """
-    def __init__(self):
+    def __init__(self, key: Optional[Callable[[Any], float]] = None):
         self.heap: List[Any] = []
+        self.key = key
         # Mapa de prioridades a valores numéricos para comparación
         self.priority_map = {
             "Crítica": 4,
@@ -16,6 +18,8 @@ class CustomMaxHeap:
 
     def _get_priority_value(self, task: Any) -> int:
         """Obtiene el valor numérico de la prioridad de una tarea."""
+        if self.key is not None:
+            return self.key(task)
         # Asumimos que el objeto task tiene un atributo 'priority'
         return self.priority_map.get(task.priority, 0)
 
@@ -38,10 +42,20 @@ class CustomMaxHeap:
 
         return max_item
 
+    def peek(self) -> Any:
+        """Devuelve el elemento de mayor prioridad sin extraerlo."""
+        if self.is_empty():
+            raise IndexError("Peek from empty heap")
+        return self.heap[0]
+
     def is_empty(self) -> bool:
         """Verifica si el heap está vacío."""
         return len(self.heap) == 0
 
+    def size(self) -> int:
+        """Devuelve el número de elementos en el heap."""
+        return len(self.heap)
+
     def _sift_up(self, index: int):
         """Mueve un elemento hacia arriba para mantener la propiedad de heap."""
         parent_index = (index - 1) // 2
@@ -0,0 +1,183 @@
+from typing import List, Optional, Tuple
+
+from .sorted_search import first_greater
+
+class _RangeMin:
+    """
+    Tabla dispersa sobre una lista de pesos: mínimo de cualquier rango en O(1) tras
+    O(m log m) de preparación. Permite listar los elementos de un rango con peso menor
+    que un umbral en O(1 + k), partiendo el rango en el mínimo.
+    """
+    def __init__(self, weights: List[float]):
+        self.weights = weights
+        self.table: List[List[int]] = [list(range(len(weights)))] # table[j][i]: mínimo de [i, i + 2^j)
+        width = 1
+        while 2 * width <= len(weights):
+            previous = self.table[-1]
+            self.table.append([
+                previous[i] if weights[previous[i]] <= weights[previous[i + width]] else previous[i + width]
+                for i in range(len(weights) - 2 * width + 1)
+            ])
+            width *= 2
+
+    def argmin(self, low: int, high: int) -> int:
+        """Posición del peso mínimo en [low, high) (rango no vacío)."""
+        level = (high - low).bit_length() - 1
+        a, b = self.table[level][low], self.table[level][high - (1 << level)]
+        return a if self.weights[a] <= self.weights[b] else b
+
+    def below(self, low: int, high: int, threshold: float) -> List[int]:
+        """Posiciones de [low, high) con peso estrictamente menor que threshold."""
+        result: List[int] = []
+        pending = [(low, high)]
+        while pending:
+            low, high = pending.pop()
+            if low >= high:
+                continue
+            position = self.argmin(low, high)
+            if self.weights[position] >= threshold:
+                continue
+            result.append(position)
+            pending.append((low, position))
+            pending.append((position + 1, high))
+        return result
+
+class _IntervalNode:
+    """
+    Nodo del árbol: guarda los intervalos que contienen su centro, ordenados por inicio
+    (ascendente) y por fin (descendente) para poder cortar el recorrido en cuanto dejan
+    de solaparse con la consulta. Con pesos guarda además el mínimo del subárbol y un
+    índice de mínimos por rango sobre cada orden.
+    """
+    def __init__(self, center: float, by_start: List[int], by_end: List[int]):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left: Optional["_IntervalNode"] = None
+        self.right: Optional["_IntervalNode"] = None
+        self.min_weight = float("inf")
+        self.start_keys: List[float] = []      # Inicios en el orden de by_start
+        self.end_keys: List[float] = []        # Fines negados en el orden de by_end (ascendente)
+        self.start_min: Optional[_RangeMin] = None
+        self.end_min: Optional[_RangeMin] = None
+
+class CustomIntervalTree:
+    """
+    Árbol de intervalos centrado y estático sobre intervalos cerrados [inicio, fin].
+    Cada nodo usa como centro la mediana de los extremos de sus intervalos, así que la
+    altura es O(log n); las consultas de solapamiento y de punto cuestan O(log n + k)
+    para k resultados. Devuelve las posiciones de los intervalos en la lista original.
+    Con 'weights' (un peso por intervalo) el solapamiento admite además un umbral de peso
+    que poda los subárboles cuyo mínimo no lo cumple.
+    """
+    def __init__(self, intervals: List[Tuple[float, float]], weights: Optional[List[float]] = None):
+        self.starts = [start for start, _ in intervals]
+        self.ends = [end for _, end in intervals]
+        for start, end in intervals:
+            if end < start:
+                raise ValueError(f"Invalid interval [{start}, {end}]")
+        if weights is not None and len(weights) != len(intervals):
+            raise ValueError("weights must have one value per interval")
+        self.weights = weights
+        self.root = self._build(list(range(len(intervals))))
+
+    def _build(self, members: List[int]) -> Optional[_IntervalNode]:
+        if not members:
+            return None
+        endpoints = sorted([self.starts[i] for i in members] + [self.ends[i] for i in members])
+        center = endpoints[len(endpoints) // 2]
+
+        left: List[int] = []
+        right: List[int] = []
+        here: List[int] = []
+        for i in members:
+            if self.ends[i] < center:
+                left.append(i)
+            elif self.starts[i] > center:
+                right.append(i)
+            else:
+                here.append(i)
+
+        node = _IntervalNode(
+            center,
+            sorted(here, key=lambda i: self.starts[i]),
+            sorted(here, key=lambda i: self.ends[i], reverse=True),
+        )
+        node.left = self._build(left)
+        node.right = self._build(right)
+        if self.weights is not None:
+            weights = self.weights
+            node.start_keys = [self.starts[i] for i in node.by_start]
+            node.end_keys = [-self.ends[i] for i in node.by_end]
+            node.start_min = _RangeMin([weights[i] for i in node.by_start])
+            node.end_min = _RangeMin([weights[i] for i in node.by_end])
+            node.min_weight = min(
+                weights[node.by_start[node.start_min.argmin(0, len(here))]],
+                node.left.min_weight if node.left else float("inf"),
+                node.right.min_weight if node.right else float("inf"),
+            )
+        return node
+
+    def size(self) -> int:
+        return len(self.starts)
+
+    def overlap(self, low: float, high: float) -> List[int]:
+        """Intervalos que se solapan con [low, high] (comparten al menos un punto)."""
+        result: List[int] = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node is None:
+                continue
+            if high < node.center:
+                # Todo el subárbol derecho empieza después de high
+                for i in node.by_start:
+                    if self.starts[i] > high:
+                        break
+                    result.append(i)
+                pending.append(node.left)
+            elif low > node.center:
+                # Todo el subárbol izquierdo termina antes de low
+                for i in node.by_end:
+                    if self.ends[i] < low:
+                        break
+                    result.append(i)
+                pending.append(node.right)
+            else:
+                # La consulta contiene el centro: todos los intervalos del nodo se solapan
+                result.extend(node.by_start)
+                pending.append(node.left)
+                pending.append(node.right)
+        return result
+
+    def overlap_below(self, low: float, high: float, max_weight: float) -> List[int]:
+        """
+        Intervalos que se solapan con [low, high] y cuyo peso es estrictamente menor que
+        max_weight. Los subárboles sin ningún peso menor se descartan sin recorrerlos y,
+        dentro de cada nodo, solo se visitan los intervalos que cumplen ambas condiciones.
+        """
+        if self.weights is None:
+            raise ValueError("The tree was built without weights")
+        result: List[int] = []
+        pending = [self.root]
+        while pending:
+            node = pending.pop()
+            if node is None or node.min_weight >= max_weight:
+                continue
+            if high < node.center:
+                count = first_greater(node.start_keys, high) # Los que empiezan en o antes de high
+                result.extend(node.by_start[p] for p in node.start_min.below(0, count, max_weight))
+                pending.append(node.left)
+            elif low > node.center:
+                count = first_greater(node.end_keys, -low) # Los que terminan en o después de low
+                result.extend(node.by_end[p] for p in node.end_min.below(0, count, max_weight))
+                pending.append(node.right)
+            else:
+                result.extend(node.by_start[p] for p in node.start_min.below(0, len(node.by_start), max_weight))
+                pending.append(node.left)
+                pending.append(node.right)
+        return result
+
+    def stab(self, point: float) -> List[int]:
+        """Intervalos que contienen el punto."""
+        return self.overlap(point, point)
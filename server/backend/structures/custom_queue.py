@@ -35,6 +35,12 @@ class CustomQueue:
         self._size -= 1
         return temp.data
 
+    def peek(self) -> Any:
+        """Devuelve el elemento del frente sin eliminarlo."""
+        if self.is_empty():
+            raise IndexError("Peek from empty queue")
+        return self.front.data
+
     def is_empty(self) -> bool:
         """Verifica si la cola está vacía."""
         return self.front is None
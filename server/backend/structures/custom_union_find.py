@@ -0,0 +1,90 @@
+from typing import Any, List
+
+from .custom_hash_table import CustomHashTable
+
+class CustomUnionFind:
+    """
+    Implementación de Conjuntos Disjuntos (Union-Find).
+    Usa compresión de caminos y unión por rango, por lo que cada operación
+    cuesta O(α(n)) amortizado (prácticamente constante).
+    """
+    def __init__(self, capacity: int = 100):
+        # Tabla Hash: elemento -> índice en los arreglos parent/rank
+        self.index = CustomHashTable(capacity=capacity)
+        self.items: List[Any] = []
+        self.parent: List[int] = []
+        self.rank: List[int] = []
+        self._count = 0 # Número de conjuntos disjuntos
+
+    def add(self, item: Any):
+        """Añade un elemento como conjunto unitario si no existe."""
+        if self.index.contains(item):
+            return
+        position = len(self.items)
+        self.index.put(item, position)
+        self.items.append(item)
+        self.parent.append(position)
+        self.rank.append(0)
+        self._count += 1
+
+    def _find_index(self, position: int) -> int:
+        """Encuentra la raíz de un índice aplicando compresión de caminos (halving)."""
+        parent = self.parent
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    def find(self, item: Any) -> Any:
+        """Devuelve el representante del conjunto que contiene al elemento."""
+        position = self.index.get(item)
+        if position is None:
+            raise KeyError(f"Item {item} does not exist")
+        return self.items[self._find_index(position)]
+
+    def union(self, a: Any, b: Any) -> bool:
+        """Une los conjuntos de a y b. Devuelve True si estaban separados."""
+        self.add(a)
+        self.add(b)
+        root_a = self._find_index(self.index.get(a))
+        root_b = self._find_index(self.index.get(b))
+        if root_a == root_b:
+            return False
+
+        # Unión por rango: el árbol más bajo cuelga del más alto
+        if self.rank[root_a] < self.rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        if self.rank[root_a] == self.rank[root_b]:
+            self.rank[root_a] += 1
+        self._count -= 1
+        return True
+
+    def connected(self, a: Any, b: Any) -> bool:
+        """Verifica si a y b pertenecen al mismo conjunto."""
+        if not self.index.contains(a) or not self.index.contains(b):
+            return False
+        return self._find_index(self.index.get(a)) == self._find_index(self.index.get(b))
+
+    def groups(self) -> List[List[Any]]:
+        """
+        Devuelve los conjuntos disjuntos como listas de elementos.
+        Los grupos y sus elementos conservan el orden de inserción.
+        """
+        group_of_root: List[int] = [-1] * len(self.items)
+        result: List[List[Any]] = []
+        for position, item in enumerate(self.items):
+            root = self._find_index(position)
+            if group_of_root[root] == -1:
+                group_of_root[root] = len(result)
+                result.append([])
+            result[group_of_root[root]].append(item)
+        return result
+
+    def count(self) -> int:
+        """Devuelve el número de conjuntos disjuntos."""
+        return self._count
+
+    def size(self) -> int:
+        """Devuelve el número total de elementos."""
+        return len(self.items)
@@ -0,0 +1,231 @@
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Bits del hash que consume cada nivel del trie (32 ramas por nodo)
+BITS_PER_LEVEL = 5
+BRANCH_MASK = (1 << BITS_PER_LEVEL) - 1
+HASH_BITS = 32
+
+def _hash_key(key: str) -> int:
+    """
+    Hash polinomial (base 31) de 32 bits, como el de CustomHashTable, con una mezcla
+    final para que los 5 bits que usa cada nivel del trie queden bien repartidos.
+    """
+    hash_value = 0
+    for char in key:
+        hash_value = (hash_value * 31 + ord(char)) & 0xFFFFFFFF
+    hash_value ^= hash_value >> 16
+    hash_value = (hash_value * 0x45D9F3B) & 0xFFFFFFFF
+    hash_value ^= hash_value >> 16
+    return hash_value
+
+def _same_value(old: Any, new: Any) -> bool:
+    return old is new or old == new
+
+def _popcount(value: int) -> int:
+    return bin(value).count("1")
+
+class _Leaf:
+    """Par clave-valor inmutable."""
+    __slots__ = ("hash", "key", "value")
+
+    def __init__(self, hash_value: int, key: str, value: Any):
+        self.hash = hash_value
+        self.key = key
+        self.value = value
+
+class _Collision:
+    """Claves distintas con el mismo hash de 32 bits (solo aparecen al fondo del trie)."""
+    __slots__ = ("hash", "leaves")
+
+    def __init__(self, hash_value: int, leaves: Tuple[_Leaf, ...]):
+        self.hash = hash_value
+        self.leaves = leaves
+
+class _Node:
+    """
+    Nodo interno comprimido: 'bitmap' marca qué ramas existen y 'entries' guarda solo
+    esas ramas en orden. La posición de la rama b es popcount(bitmap & ((1 << b) - 1)).
+    """
+    __slots__ = ("bitmap", "entries")
+
+    def __init__(self, bitmap: int, entries: Tuple[Any, ...]):
+        self.bitmap = bitmap
+        self.entries = entries
+
+_EMPTY_NODE = _Node(0, ())
+
+def _merge_leaves(shift: int, first: _Leaf, second: _Leaf) -> Any:
+    """Crea el subárbol mínimo que separa dos hojas cuyos hashes coinciden hasta 'shift'."""
+    if shift >= HASH_BITS or first.hash == second.hash:
+        return _Collision(first.hash, (first, second))
+    first_bit = (first.hash >> shift) & BRANCH_MASK
+    second_bit = (second.hash >> shift) & BRANCH_MASK
+    if first_bit == second_bit:
+        return _Node(1 << first_bit, (_merge_leaves(shift + BITS_PER_LEVEL, first, second),))
+    if first_bit < second_bit:
+        return _Node((1 << first_bit) | (1 << second_bit), (first, second))
+    return _Node((1 << first_bit) | (1 << second_bit), (second, first))
+
+def _assoc(entry: Any, shift: int, leaf: _Leaf) -> Tuple[Any, bool]:
+    """Devuelve (nuevo subárbol, si la clave es nueva). Copia solo el camino modificado."""
+    if isinstance(entry, _Leaf):
+        if entry.key == leaf.key:
+            return (entry if _same_value(entry.value, leaf.value) else leaf), False
+        return _merge_leaves(shift, entry, leaf), True
+
+    if isinstance(entry, _Collision):
+        if entry.hash != leaf.hash:
+            # Solo ocurre si la colisión quedó antes del fondo; se separa como dos hojas
+            node = _Node(1 << ((entry.hash >> shift) & BRANCH_MASK), (entry,))
+            return _assoc(node, shift, leaf)
+        for i, existing in enumerate(entry.leaves):
+            if existing.key == leaf.key:
+                if _same_value(existing.value, leaf.value):
+                    return entry, False
+                return _Collision(entry.hash, entry.leaves[:i] + (leaf,) + entry.leaves[i + 1:]), False
+        return _Collision(entry.hash, entry.leaves + (leaf,)), True
+
+    bit = 1 << ((leaf.hash >> shift) & BRANCH_MASK)
+    position = _popcount(entry.bitmap & (bit - 1))
+    if not entry.bitmap & bit:
+        entries = entry.entries[:position] + (leaf,) + entry.entries[position:]
+        return _Node(entry.bitmap | bit, entries), True
+    child, added = _assoc(entry.entries[position], shift + BITS_PER_LEVEL, leaf)
+    if child is entry.entries[position]:
+        return entry, False
+    return _Node(entry.bitmap, entry.entries[:position] + (child,) + entry.entries[position + 1:]), added
+
+def _dissoc(entry: Any, shift: int, hash_value: int, key: str) -> Any:
+    """Devuelve el subárbol sin la clave (None si queda vacío; el mismo objeto si no estaba)."""
+    if isinstance(entry, _Leaf):
+        return None if entry.key == key else entry
+
+    if isinstance(entry, _Collision):
+        leaves = tuple(leaf for leaf in entry.leaves if leaf.key != key)
+        if len(leaves) == len(entry.leaves):
+            return entry
+        return leaves[0] if len(leaves) == 1 else _Collision(entry.hash, leaves)
+
+    bit = 1 << ((hash_value >> shift) & BRANCH_MASK)
+    if not entry.bitmap & bit:
+        return entry
+    position = _popcount(entry.bitmap & (bit - 1))
+    child = _dissoc(entry.entries[position], shift + BITS_PER_LEVEL, hash_value, key)
+    if child is entry.entries[position]:
+        return entry
+    if child is None:
+        if len(entry.entries) == 1:
+            return None
+        entries = entry.entries[:position] + entry.entries[position + 1:]
+        # Un nodo con una sola hoja se colapsa hacia el padre (la raíz siempre es un _Node)
+        if len(entries) == 1 and not isinstance(entries[0], _Node) and shift > 0:
+            return entries[0]
+        return _Node(entry.bitmap & ~bit, entries)
+    if len(entry.entries) == 1 and not isinstance(child, _Node) and shift > 0:
+        return child
+    return _Node(entry.bitmap, entry.entries[:position] + (child,) + entry.entries[position + 1:])
+
+def _leaves(entry: Any) -> Iterator[_Leaf]:
+    if isinstance(entry, _Leaf):
+        yield entry
+    elif isinstance(entry, _Collision):
+        yield from entry.leaves
+    elif entry is not None:
+        for child in entry.entries:
+            yield from _leaves(child)
+
+def _diff(old: Any, new: Any, changes: List[Tuple[str, Any, Any]]):
+    """Compara dos subárboles saltando los que comparten (misma identidad de objeto)."""
+    if old is new:
+        return
+    if isinstance(old, _Node) and isinstance(new, _Node):
+        for branch in range(1 << BITS_PER_LEVEL):
+            bit = 1 << branch
+            old_child = old.entries[_popcount(old.bitmap & (bit - 1))] if old.bitmap & bit else None
+            new_child = new.entries[_popcount(new.bitmap & (bit - 1))] if new.bitmap & bit else None
+            if old_child is not new_child:
+                _diff(old_child, new_child, changes)
+        return
+    # Hojas, colisiones o ramas con forma distinta: comparar por clave (subárbol pequeño)
+    old_values = {leaf.key: leaf.value for leaf in _leaves(old)}
+    for leaf in _leaves(new):
+        if leaf.key not in old_values:
+            changes.append((leaf.key, None, leaf.value))
+        else:
+            previous = old_values.pop(leaf.key)
+            if not _same_value(previous, leaf.value):
+                changes.append((leaf.key, previous, leaf.value))
+    for key, previous in old_values.items():
+        changes.append((key, previous, None))
+
+class PersistentHashMap:
+    """
+    Mapa inmutable implementado como un Hash Array Mapped Trie (HAMT).
+    set() y remove() devuelven un mapa nuevo que comparte con el original todos los
+    nodos fuera del camino modificado, así que cada versión cuesta O(log32 n) memoria
+    adicional. diff() recorre ambas versiones a la vez y salta los subárboles
+    compartidos, de modo que su costo depende del número de cambios y no del tamaño.
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self, _root: _Node = _EMPTY_NODE, _size: int = 0):
+        self._root = _root
+        self._size = _size
+
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
+        hash_value = _hash_key(key)
+        entry: Any = self._root
+        shift = 0
+        while isinstance(entry, _Node):
+            bit = 1 << ((hash_value >> shift) & BRANCH_MASK)
+            if not entry.bitmap & bit:
+                return default
+            entry = entry.entries[_popcount(entry.bitmap & (bit - 1))]
+            shift += BITS_PER_LEVEL
+        if isinstance(entry, _Leaf):
+            return entry.value if entry.key == key else default
+        for leaf in entry.leaves:
+            if leaf.key == key:
+                return leaf.value
+        return default
+
+    def contains(self, key: str) -> bool:
+        sentinel = object()
+        return self.get(key, sentinel) is not sentinel
+
+    def set(self, key: str, value: Any) -> "PersistentHashMap":
+        """Devuelve un mapa con la clave asociada a 'value' (el mismo mapa si no cambia)."""
+        root, added = _assoc(self._root, 0, _Leaf(_hash_key(key), key, value))
+        if root is self._root:
+            return self
+        return PersistentHashMap(root, self._size + (1 if added else 0))
+
+    def remove(self, key: str) -> "PersistentHashMap":
+        """Devuelve un mapa sin la clave (el mismo mapa si no estaba)."""
+        root = _dissoc(self._root, 0, _hash_key(key), key)
+        if root is self._root:
+            return self
+        return PersistentHashMap(root if root is not None else _EMPTY_NODE, self._size - 1)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for leaf in _leaves(self._root):
+            yield leaf.key, leaf.value
+
+    def keys(self) -> Iterator[str]:
+        for leaf in _leaves(self._root):
+            yield leaf.key
+
+    def diff(self, other: "PersistentHashMap") -> List[Tuple[str, Any, Any]]:
+        """
+        Cambios para pasar de este mapa a 'other' como (clave, valor anterior, valor nuevo);
+        None como valor anterior indica una clave añadida y como valor nuevo una eliminada.
+        """
+        changes: List[Tuple[str, Any, Any]] = []
+        _diff(self._root, other._root, changes)
+        return changes
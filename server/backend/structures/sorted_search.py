@@ -0,0 +1,23 @@
+from typing import List
+
+def first_greater(values: List[float], target: float) -> int:
+    """Búsqueda binaria: primer índice i con values[i] > target (len si no existe)."""
+    low, high = 0, len(values)
+    while low < high:
+        mid = (low + high) // 2
+        if values[mid] > target:
+            high = mid
+        else:
+            low = mid + 1
+    return low
+
+def first_at_least(values: List[float], target: float) -> int:
+    """Búsqueda binaria: primer índice i con values[i] >= target (len si no existe)."""
+    low, high = 0, len(values)
+    while low < high:
+        mid = (low + high) // 2
+        if values[mid] >= target:
+            high = mid
+        else:
+            low = mid + 1
+    return low
@@ -0,0 +1,137 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from .sorted_search import first_at_least, first_greater
+
+# Todas las fechas se expresan como minutos absolutos desde esta época común,
+# así que calendarios distintos comparten la misma línea de tiempo.
+EPOCH = datetime(2000, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+
+def to_minutes(moment: datetime) -> float:
+    """
+    Convierte un datetime a minutos desde EPOCH. Los datetime con zona horaria
+    (p. ej. con sufijo "Z") se pasan antes a UTC sin zona.
+    """
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return (moment - EPOCH).total_seconds() / 60.0
+
+def from_minutes(minutes: float) -> datetime:
+    """Convierte minutos desde EPOCH a datetime."""
+    return EPOCH + timedelta(minutes=minutes)
+
+class WorkingCalendar:
+    """
+    Calendario laboral precompilado en arreglos de sumas prefijas.
+    Cada intervalo laborable [starts[i], ends[i]) guarda en prefix[i] los minutos
+    laborables acumulados antes de él, por lo que "inicio + duración en tiempo laboral"
+    se resuelve con una búsqueda binaria O(log n) en lugar de recorrer día por día.
+    """
+    def __init__(
+        self,
+        name: str,
+        start_date: date,
+        horizon_days: int,
+        weekly_periods: Dict[int, List[Tuple[int, int]]],
+        holidays: Optional[List[date]] = None,
+        minutes_per_day: Optional[float] = None,
+    ):
+        """
+        weekly_periods: día de la semana (0 = lunes) -> lista de (minuto_inicio, minuto_fin) del día.
+        minutes_per_day: minutos de un "día" laboral al convertir duraciones en días;
+        por defecto, el promedio de los días laborables de la semana.
+        """
+        self.name = name
+        self.start_date = start_date
+        self.end_date = start_date + timedelta(days=horizon_days)
+        self.starts: List[float] = []
+        self.ends: List[float] = []
+        self.prefix: List[float] = []   # Minutos laborables antes del intervalo i
+        self.cum_end: List[float] = []  # Minutos laborables hasta el final del intervalo i
+
+        holiday_days = set(holidays or [])
+        day_zero = to_minutes(datetime(start_date.year, start_date.month, start_date.day))
+        self.start_minute = day_zero
+        total = 0.0
+        for offset in range(horizon_days):
+            current = start_date + timedelta(days=offset)
+            if current in holiday_days:
+                continue
+            for period_start, period_end in sorted(weekly_periods.get(current.weekday(), [])):
+                if period_end <= period_start:
+                    continue
+                start = day_zero + offset * MINUTES_PER_DAY + period_start
+                end = day_zero + offset * MINUTES_PER_DAY + period_end
+                if self.ends and self.ends[-1] >= start:
+                    # Intervalos contiguos (p. ej. turnos que cruzan la medianoche) se fusionan
+                    if end > self.ends[-1]:
+                        total += end - self.ends[-1]
+                        self.ends[-1] = end
+                        self.cum_end[-1] = total
+                    continue
+                self.starts.append(start)
+                self.ends.append(end)
+                self.prefix.append(total)
+                total += end - start
+                self.cum_end.append(total)
+
+        if minutes_per_day is None:
+            working_days = [periods for periods in weekly_periods.values() if periods]
+            weekly_total = sum(max(0, end - start) for periods in working_days for start, end in periods)
+            minutes_per_day = weekly_total / len(working_days) if working_days else MINUTES_PER_DAY
+        self.minutes_per_day = minutes_per_day
+
+    def total_working_minutes(self) -> float:
+        return self.cum_end[-1] if self.cum_end else 0.0
+
+    def working_before(self, moment: float) -> float:
+        """Minutos laborables del calendario transcurridos antes de 'moment'."""
+        if moment < self.start_minute:
+            raise ValueError(f"Date before the horizon of calendar '{self.name}'")
+        i = first_greater(self.ends, moment)
+        if i == len(self.ends):
+            if moment > to_minutes(datetime(self.end_date.year, self.end_date.month, self.end_date.day)):
+                raise ValueError(f"Date beyond the horizon of calendar '{self.name}'")
+            return self.total_working_minutes()
+        return self.prefix[i] + max(0.0, moment - self.starts[i])
+
+    def _moment_at(self, working: float, prefer_next_start: bool) -> float:
+        """
+        Momento en que se alcanzan 'working' minutos laborables.
+        prefer_next_start elige el inicio del siguiente intervalo cuando el valor cae
+        justo en una frontera (útil para inicios); si no, el final del intervalo (finales).
+        """
+        if prefer_next_start:
+            i = first_greater(self.cum_end, working)
+        else:
+            i = first_at_least(self.cum_end, working)
+        if i == len(self.cum_end):
+            raise ValueError(f"Duration exceeds the horizon of calendar '{self.name}'")
+        return self.starts[i] + (working - self.prefix[i])
+
+    def next_working_minute(self, moment: float) -> float:
+        """Primer minuto laborable en o después de 'moment'."""
+        return self._moment_at(self.working_before(moment), prefer_next_start=True)
+
+    def add_working_time(self, start: float, duration: float) -> float:
+        """Momento de finalización al trabajar 'duration' minutos laborables desde 'start'."""
+        if duration <= 0:
+            return start
+        return self._moment_at(self.working_before(start) + duration, prefer_next_start=False)
+
+    def subtract_working_time(self, finish: float, duration: float) -> float:
+        """Inicio más tardío que permite trabajar 'duration' minutos laborables antes de 'finish'."""
+        if duration <= 0:
+            return finish
+        target = self.working_before(finish) - duration
+        if target < 0:
+            raise ValueError(f"Duration exceeds the horizon of calendar '{self.name}'")
+        return self._moment_at(target, prefer_next_start=True)
+
+    def working_minutes_between(self, start: float, finish: float) -> float:
+        """Minutos laborables entre dos momentos (negativo si finish < start)."""
+        return self.working_before(finish) - self.working_before(start)
+
+    def __repr__(self):
+        return f"WorkingCalendar(name='{self.name}', {self.start_date} -> {self.end_date}, intervals={len(self.starts)})"
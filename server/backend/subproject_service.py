@@ -0,0 +1,294 @@
+import hashlib
+from typing import List, Dict, Optional, Tuple, TypedDict
+
+from task import Task
+from structures.custom_hash_table import CustomHashTable
+from structures.custom_queue import CustomQueue
+
+SEPARATOR = "/"
+ROOT = ""
+
+def normalize_path(path: Optional[str]) -> str:
+    """Normaliza la ruta de un sub-proyecto ('a/b/c'); None o vacío es la raíz."""
+    if not path:
+        return ROOT
+    return SEPARATOR.join(part.strip() for part in path.split(SEPARATOR) if part.strip())
+
+def parent_path(path: str) -> str:
+    if SEPARATOR not in path:
+        return ROOT
+    return path.rsplit(SEPARATOR, 1)[0]
+
+def ancestor_paths(path: str) -> List[str]:
+    """Devuelve la ruta y todos sus ancestros, del más profundo a la raíz."""
+    chain = [path]
+    while path != ROOT:
+        path = parent_path(path)
+        chain.append(path)
+    return chain
+
+class SubprojectSummary:
+    """
+    Resumen memoizado de un sub-proyecto analizado.
+    Reduce su interior a los nodos frontera (entradas y salidas) y a los caminos
+    más largos entre ellos, de modo que el padre nunca vuelve a recorrer sus tareas.
+    Las duraciones se expresan en minutos.
+    """
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+        self.task_count = 0
+        self.has_cycles = False
+        # Entradas: tareas sin dependencias o con dependencias fuera del sub-proyecto
+        self.entries: List[str] = []
+        self.entry_deps: Dict[str, List[str]] = {}
+        # Salidas: sumideros internos y tareas de las que depende algo externo
+        self.exits: List[str] = []
+        # Duración propia de cada nodo frontera
+        self.durations: Dict[str, float] = {}
+        # (entrada, salida, duración de las tareas intermedias del camino más largo)
+        self.paths: List[Tuple[str, str, float]] = []
+        # Camino interno más largo (incluye ambos extremos)
+        self.longest_path: Optional[float] = 0.0
+
+    def __repr__(self):
+        return f"SubprojectSummary(path='{self.path}', entries={len(self.entries)}, exits={len(self.exits)}, longest={self.longest_path})"
+
+class SubprojectReport(TypedDict):
+    path: str
+    key: str
+    task_count: int
+    entries: List[str]
+    exits: List[str]
+    longest_path_minutes: Optional[float]
+    has_cycles: bool
+    recomputed: bool
+
+class HierarchyAnalysis(TypedDict):
+    root: SubprojectSummary
+    subprojects: List[SubprojectReport]
+    recomputed: List[str]
+
+class SubprojectService:
+    """
+    Analiza proyectos anidados en sub-proyectos de forma incremental.
+    Cada sub-proyecto se identifica por un hash de contenido (estilo Merkle: incluye
+    los hashes de sus hijos), así que al editar una hoja solo cambian los hashes de
+    esa hoja y sus ancestros; el resto de resúmenes se reutiliza desde la caché.
+    """
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self.cache = CustomHashTable(capacity=cache_size * 2)
+        self._cache_order = CustomQueue() # Orden de inserción para desalojo FIFO
+
+    def _cache_get(self, key: str) -> Optional[SubprojectSummary]:
+        return self.cache.get(key)
+
+    def _cache_put(self, summary: SubprojectSummary):
+        if self.cache.contains(summary.key):
+            return
+        if self._cache_order.size() >= self.cache_size:
+            self.cache.remove(self._cache_order.dequeue())
+        self.cache.put(summary.key, summary)
+        self._cache_order.enqueue(summary.key)
+
+    def analyze(self, tasks: List[Task]) -> HierarchyAnalysis:
+        """Analiza la jerarquía completa reutilizando los resúmenes memoizados."""
+        task_map = CustomHashTable(capacity=len(tasks) * 2)
+        for task in tasks:
+            task.subproject = normalize_path(task.subproject)
+            task_map.put(task.name, task)
+
+        # Árbol de sub-proyectos: ruta -> tareas directas / hijos
+        direct_tasks: Dict[str, List[Task]] = {ROOT: []}
+        children: Dict[str, List[str]] = {ROOT: []}
+        for task in tasks:
+            for path in reversed(ancestor_paths(task.subproject)):
+                if path not in direct_tasks:
+                    direct_tasks[path] = []
+                    children[path] = []
+                    children[parent_path(path)].append(path)
+            direct_tasks[task.subproject].append(task)
+
+        # Nombres exportados: tareas de un sub-proyecto de las que depende una tarea externa.
+        # Forman parte de la interfaz (y del hash) porque determinan las salidas.
+        exported: Dict[str, List[str]] = {path: [] for path in direct_tasks}
+        for task in tasks:
+            task_chain = ancestor_paths(task.subproject)
+            for dep_name in task.dependencies:
+                dep_task = task_map.get(dep_name)
+                if dep_task is None:
+                    continue
+                for path in ancestor_paths(dep_task.subproject):
+                    if path in task_chain:
+                        break
+                    exported[path].append(dep_name)
+
+        summaries: Dict[str, SubprojectSummary] = {}
+        recomputed: List[str] = []
+        # Post-orden: los sub-proyectos más profundos primero
+        for path in sorted(direct_tasks, key=lambda p: (-p.count(SEPARATOR) if p else 1, p)):
+            child_summaries = [summaries[child] for child in sorted(children[path])]
+            key = self._content_key(path, direct_tasks[path], child_summaries, exported[path])
+            summary = self._cache_get(key)
+            if summary is None:
+                summary = self._summarize(path, key, direct_tasks[path], child_summaries, exported[path])
+                self._cache_put(summary)
+                recomputed.append(path)
+            summaries[path] = summary
+
+        reports: List[SubprojectReport] = []
+        for path in sorted(summaries):
+            summary = summaries[path]
+            reports.append({
+                "path": path,
+                "key": summary.key,
+                "task_count": summary.task_count,
+                "entries": summary.entries,
+                "exits": summary.exits,
+                "longest_path_minutes": summary.longest_path,
+                "has_cycles": summary.has_cycles,
+                "recomputed": path in recomputed,
+            })
+
+        return {
+            "root": summaries[ROOT],
+            "subprojects": reports,
+            "recomputed": recomputed,
+        }
+
+    def _content_key(self, path: str, tasks: List[Task], child_summaries: List[SubprojectSummary], exported: List[str]) -> str:
+        """Hash de contenido: tareas directas, hashes de los hijos e interfaz exportada."""
+        digest = hashlib.sha256()
+        digest.update(path.encode("utf-8"))
+        rows = sorted(
+            f"{t.name}\x1f{t.duration!r}\x1f{t.priority}\x1f{chr(0x1f).join(sorted(t.dependencies))}"
+            for t in tasks
+        )
+        for row in rows:
+            digest.update(b"\x1e" + row.encode("utf-8"))
+        for child in child_summaries:
+            digest.update(b"\x1d" + child.key.encode("utf-8"))
+        for name in sorted(set(exported)):
+            digest.update(b"\x1c" + name.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _summarize(self, path: str, key: str, tasks: List[Task], child_summaries: List[SubprojectSummary], exported: List[str]) -> SubprojectSummary:
+        """
+        Construye el resumen de un sub-proyecto sobre un grafo reducido cuyos nodos son
+        sus tareas directas y los nodos frontera de sus hijos. Las aristas internas de
+        cada hijo se sustituyen por sus caminos más largos entre entradas y salidas.
+        """
+        summary = SubprojectSummary(path, key)
+        summary.task_count = len(tasks) + sum(child.task_count for child in child_summaries)
+
+        # Nodos del grafo reducido (índices) y sus duraciones
+        index = CustomHashTable(capacity=(len(tasks) + sum(len(c.durations) for c in child_summaries)) * 2 + 1)
+        names: List[str] = []
+        durations: List[float] = []
+        # None: nodo frontera interno de un hijo (sus dependencias ya están resumidas)
+        node_deps: List[Optional[List[str]]] = []
+
+        def add_node(name: str, duration: float, deps: Optional[List[str]]):
+            if index.contains(name):
+                return
+            index.put(name, len(names))
+            names.append(name)
+            durations.append(duration)
+            node_deps.append(deps)
+
+        for task in tasks:
+            add_node(task.name, task.duration, task.dependencies)
+        for child in child_summaries:
+            if child.has_cycles:
+                summary.has_cycles = True
+            for name, duration in child.durations.items():
+                add_node(name, duration, child.entry_deps.get(name))
+
+        count = len(names)
+        successors: List[List[Tuple[int, float]]] = [[] for _ in range(count)]
+        in_degree = [0] * count
+        is_entry = [False] * count
+
+        def add_edge(source: int, target: int, gap: float):
+            successors[source].append((target, gap))
+            in_degree[target] += 1
+
+        for position in range(count):
+            if node_deps[position] is None:
+                continue
+            outside = [dep for dep in node_deps[position] if not index.contains(dep)]
+            if not node_deps[position] or outside:
+                is_entry[position] = True
+                summary.entry_deps[names[position]] = outside
+            for dep_name in node_deps[position]:
+                dep_index = index.get(dep_name)
+                if dep_index is not None:
+                    add_edge(dep_index, position, 0.0)
+        for child in child_summaries:
+            for entry, exit_, gap in child.paths:
+                add_edge(index.get(entry), index.get(exit_), gap)
+
+        # Orden topológico (Kahn con Cola personalizada)
+        order: List[int] = []
+        remaining = list(in_degree)
+        queue = CustomQueue()
+        for position in range(count):
+            if remaining[position] == 0:
+                queue.enqueue(position)
+        while not queue.is_empty():
+            current = queue.dequeue()
+            order.append(current)
+            for target, _ in successors[current]:
+                remaining[target] -= 1
+                if remaining[target] == 0:
+                    queue.enqueue(target)
+
+        if len(order) < count:
+            summary.has_cycles = True
+
+        exported_set = CustomHashTable(capacity=len(exported) * 2 + 1)
+        for name in exported:
+            exported_set.put(name, True)
+        entries = [p for p in range(count) if is_entry[p]]
+        exits = [p for p in range(count) if not successors[p] or exported_set.contains(names[p])]
+        summary.entries = [names[p] for p in entries]
+        summary.exits = [names[p] for p in exits]
+        for p in entries + exits:
+            summary.durations[names[p]] = durations[p]
+
+        if summary.has_cycles:
+            summary.longest_path = None
+            return summary
+
+        # Camino más largo de todo el sub-proyecto
+        finish = [0.0] * count
+        for current in order:
+            finish[current] += durations[current]
+            for target, gap in successors[current]:
+                if finish[current] + gap > finish[target]:
+                    finish[target] = finish[current] + gap
+        summary.longest_path = max(finish) if finish else 0.0
+
+        # Caminos más largos desde cada entrada hasta cada salida alcanzable
+        is_exit = [False] * count
+        for p in exits:
+            is_exit[p] = True
+        position_in_order = [0] * count
+        for rank, node in enumerate(order):
+            position_in_order[node] = rank
+        for entry in entries:
+            best: List[Optional[float]] = [None] * count
+            best[entry] = durations[entry]
+            for current in order[position_in_order[entry]:]:
+                if best[current] is None:
+                    continue
+                for target, gap in successors[current]:
+                    candidate = best[current] + gap + durations[target]
+                    if best[target] is None or candidate > best[target]:
+                        best[target] = candidate
+            for p in exits:
+                if p != entry and best[p] is not None:
+                    summary.paths.append((names[entry], names[p], best[p] - durations[entry] - durations[p]))
+
+        return summary
@@ -0,0 +1,223 @@
+from typing import Collection, Iterator, List, Optional, Tuple, TypedDict
+from xml.sax.saxutils import escape
+
+from task import Task
+from schedule_service import ScheduledTask, build_index_graph
+from graph_view_service import COLUMN_SPACING, ROW_SPACING, GraphView, compute_layers
+from structures.custom_graph import PROGRESS_INTERVAL, ProgressCallback
+from structures.working_calendar import from_minutes
+
+# Elementos por fragmento emitido: suficientes para no escribir etiqueta a etiqueta
+CHUNK_ELEMENTS = 256
+
+# Grafo: tamaño de cada tarea y margen alrededor del dibujo
+NODE_WIDTH = 180.0
+NODE_HEIGHT = 40.0
+MARGIN = 40.0
+TITLE_HEIGHT = 40.0
+MAX_LABEL_CHARS = 24
+
+# Gantt: columna de nombres, alto de fila y ancho del área de barras
+LABEL_WIDTH = 220.0
+BAR_ROW_HEIGHT = 24.0
+CHART_WIDTH = 1200.0
+AXIS_HEIGHT = 30.0
+# Pasos candidatos del eje de tiempo (minutos): 1 h, 2 h, 4 h, 8 h, 1 d, 2 d, 1 sem, 2 sem, 30 d, 90 d
+TICK_STEPS = (60, 120, 240, 480, 1440, 2880, 10080, 20160, 43200, 129600)
+MAX_TICKS = 12
+
+PRIORITY_FILL = {
+    "Crítica": "#fecaca",
+    "Alta": "#fed7aa",
+    "Media": "#bfdbfe",
+    "Baja": "#d1fae5",
+}
+DEFAULT_FILL = "#e5e7eb"
+
+_STYLE = (
+    "<style>"
+    "text{font-family:sans-serif;font-size:12px;fill:#111827}"
+    ".title{font-size:18px;font-weight:bold}"
+    ".edge{stroke:#9ca3af;stroke-width:1.5;fill:none}"
+    ".node{stroke:#374151;stroke-width:1}"
+    ".highlight{stroke:#dc2626;stroke-width:3}"
+    ".bar{fill:#60a5fa}"
+    ".critical{fill:#dc2626}"
+    ".slack{fill:#e5e7eb}"
+    ".grid{stroke:#e5e7eb;stroke-width:1}"
+    "</style>"
+)
+
+class GraphLayout(TypedDict):
+    names: List[str]
+    priorities: List[str]
+    positions: List[Tuple[float, float]] # Esquina superior izquierda de cada tarea
+    edges: List[Tuple[int, int]]
+    width: float
+    height: float
+
+def _label(text: str) -> str:
+    return text if len(text) <= MAX_LABEL_CHARS else text[:MAX_LABEL_CHARS - 1] + "…"
+
+def _chunked(elements: Iterator[str]) -> Iterator[str]:
+    """Agrupa los elementos en fragmentos de CHUNK_ELEMENTS para la respuesta en streaming."""
+    chunk: List[str] = []
+    for element in elements:
+        chunk.append(element)
+        if len(chunk) >= CHUNK_ELEMENTS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+def _svg_open(width: float, height: float, title: str) -> str:
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:.0f}" height="{height:.0f}" '
+        f'viewBox="0 0 {width:.0f} {height:.0f}">'
+        f'<defs><marker id="arrow" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" '
+        f'markerHeight="8" orient="auto"><path d="M0,0 L10,5 L0,10 z" fill="#9ca3af"/></marker></defs>'
+        f"{_STYLE}"
+        f'<rect width="100%" height="100%" fill="white"/>'
+        f'<text class="title" x="{MARGIN:.0f}" y="{TITLE_HEIGHT - 12:.0f}">{escape(title)}</text>'
+    )
+
+def _layered(names: List[str], priorities: List[str], predecessors: List[List[int]], successors: List[List[int]], progress: Optional[ProgressCallback]) -> GraphLayout:
+    level, row, level_members = compute_layers(predecessors, successors)
+    if progress is not None:
+        progress(0.6)
+    positions: List[Tuple[float, float]] = []
+    for node in range(len(names)):
+        positions.append((MARGIN + (level[node] + 1) * COLUMN_SPACING, TITLE_HEIGHT + MARGIN + row[node] * ROW_SPACING))
+        if progress is not None and len(positions) % PROGRESS_INTERVAL == 0:
+            progress(0.6 + 0.4 * len(positions) / len(names))
+    rows = max((len(members) for members in level_members), default=0)
+    return {
+        "names": names,
+        "priorities": priorities,
+        "positions": positions,
+        "edges": [(source, target) for source, targets in enumerate(successors) for target in targets],
+        "width": 2 * MARGIN + max(0, len(level_members) - 1) * COLUMN_SPACING + NODE_WIDTH,
+        "height": TITLE_HEIGHT + 2 * MARGIN + max(0, rows - 1) * ROW_SPACING + NODE_HEIGHT,
+    }
+
+def layered_layout(tasks: List[Task], progress: Optional[ProgressCallback] = None) -> GraphLayout:
+    """
+    Coordenadas del grafo con la misma disposición por capas que las vistas agregadas
+    (columna = nivel topológico, fila = posición en el nivel; las tareas en ciclos en la
+    primera columna). Cuesta O(n + m), a diferencia de un layout por fuerzas.
+    """
+    predecessors, successors = build_index_graph(tasks)
+    if progress is not None:
+        progress(0.3)
+    return _layered([task.name for task in tasks], [task.priority for task in tasks], predecessors, successors, progress)
+
+def overview_layout(view: GraphView, progress: Optional[ProgressCallback] = None) -> GraphLayout:
+    """
+    Disposición por capas de la vista agregada: un nodo por clúster (con su número de
+    tareas) y una arista por par de clústeres dependientes. El dibujo crece con el
+    número de clústeres, no con el de tareas. Los clústeres con tareas críticas usan el
+    color de prioridad "Crítica".
+    """
+    count = len(view.cluster_ids)
+    predecessors: List[List[int]] = [[] for _ in range(count)]
+    successors: List[List[int]] = [[] for _ in range(count)]
+    for source, target in view.cluster_edges():
+        predecessors[target].append(source)
+        successors[source].append(target)
+    if progress is not None:
+        progress(0.3)
+    names = [f"{view.cluster_labels[c]} · {len(view.cluster_members[c])}" for c in range(count)]
+    priorities = [
+        "Crítica" if any(view.priorities[node] == "Crítica" for node in members) else ""
+        for members in view.cluster_members
+    ]
+    return _layered(names, priorities, predecessors, successors, progress)
+
+def _graph_elements(layout: GraphLayout, highlighted: Collection[str], progress: Optional[ProgressCallback]) -> Iterator[str]:
+    positions = layout["positions"]
+    total = len(layout["edges"]) + len(layout["names"])
+    emitted = 0
+    # Primero las aristas, para que las tareas queden dibujadas encima
+    for source, target in layout["edges"]:
+        x1, y1 = positions[source]
+        x2, y2 = positions[target]
+        if x2 > x1:
+            x1 += NODE_WIDTH
+        else:
+            x2 += NODE_WIDTH
+        yield (
+            f'<line class="edge" x1="{x1:.1f}" y1="{y1 + NODE_HEIGHT / 2:.1f}" '
+            f'x2="{x2:.1f}" y2="{y2 + NODE_HEIGHT / 2:.1f}" marker-end="url(#arrow)"/>'
+        )
+        emitted += 1
+        if progress is not None and emitted % PROGRESS_INTERVAL == 0:
+            progress(emitted / total)
+    for node, name in enumerate(layout["names"]):
+        x, y = positions[node]
+        css = "node highlight" if name in highlighted else "node"
+        fill = PRIORITY_FILL.get(layout["priorities"][node], DEFAULT_FILL)
+        yield (
+            f'<g><title>{escape(name)}</title>'
+            f'<rect class="{css}" x="{x:.1f}" y="{y:.1f}" width="{NODE_WIDTH:.0f}" height="{NODE_HEIGHT:.0f}" rx="6" fill="{fill}"/>'
+            f'<text x="{x + NODE_WIDTH / 2:.1f}" y="{y + NODE_HEIGHT / 2 + 4:.1f}" text-anchor="middle">{escape(_label(name))}</text></g>'
+        )
+        emitted += 1
+        if progress is not None and emitted % PROGRESS_INTERVAL == 0:
+            progress(emitted / total)
+
+def render_graph_svg(layout: GraphLayout, title: str, highlighted: Collection[str] = (), progress: Optional[ProgressCallback] = None) -> Iterator[str]:
+    """
+    Emite el SVG del grafo por fragmentos a medida que se genera (trabajo lineal en
+    tareas + dependencias). 'highlighted' marca con borde rojo tareas concretas
+    (p. ej. las de un ciclo o la ruta crítica); debe admitir búsquedas O(1).
+    """
+    yield _svg_open(layout["width"], layout["height"], title)
+    yield from _chunked(_graph_elements(layout, highlighted, progress))
+    yield "</svg>"
+
+def _tick_step(span: float) -> int:
+    for step in TICK_STEPS:
+        if span / step <= MAX_TICKS:
+            return step
+    return TICK_STEPS[-1] * int(span // (TICK_STEPS[-1] * MAX_TICKS) + 1)
+
+def _gantt_elements(tasks: List[ScheduledTask], project_start: float, scale: float, height: float) -> Iterator[str]:
+    chart_top = TITLE_HEIGHT + AXIS_HEIGHT
+    bars_height = max(0.0, height - chart_top - MARGIN)
+    step = _tick_step(max(1.0, CHART_WIDTH / scale))
+    tick = 0.0
+    while tick * scale <= CHART_WIDTH:
+        x = LABEL_WIDTH + tick * scale
+        label = from_minutes(project_start + tick).strftime("%d/%m %H:%M")
+        yield (
+            f'<line class="grid" x1="{x:.1f}" y1="{chart_top:.1f}" x2="{x:.1f}" y2="{chart_top + bars_height:.1f}"/>'
+            f'<text x="{x:.1f}" y="{chart_top - 8:.1f}" text-anchor="middle">{label}</text>'
+        )
+        tick += step
+
+    for row, task in enumerate(tasks):
+        y = chart_top + row * BAR_ROW_HEIGHT
+        x = LABEL_WIDTH + (task["early_start"] - project_start) * scale
+        width = max(1.0, (task["early_finish"] - task["early_start"]) * scale)
+        slack_width = max(0.0, (task["late_finish"] - task["early_finish"]) * scale)
+        css = "critical" if task["critical"] else "bar"
+        tooltip = f'{task["name"]}: {from_minutes(task["early_start"]):%Y-%m-%d %H:%M} - {from_minutes(task["early_finish"]):%Y-%m-%d %H:%M}'
+        yield (
+            f'<g><title>{escape(tooltip)}</title>'
+            f'<text x="{LABEL_WIDTH - 8:.0f}" y="{y + BAR_ROW_HEIGHT / 2 + 4:.1f}" text-anchor="end">{escape(_label(task["name"]))}</text>'
+            + (f'<rect class="slack" x="{x + width:.1f}" y="{y + 6:.1f}" width="{slack_width:.1f}" height="{BAR_ROW_HEIGHT - 12:.0f}"/>' if slack_width else "")
+            + f'<rect class="{css}" x="{x:.1f}" y="{y + 3:.1f}" width="{width:.1f}" height="{BAR_ROW_HEIGHT - 6:.0f}" rx="3"/></g>'
+        )
+
+def render_gantt_svg(tasks: List[ScheduledTask], project_start: float, project_finish: float, title: str) -> Iterator[str]:
+    """
+    Emite el diagrama de Gantt por fragmentos: una fila por tarea en el orden recibido
+    (normalmente por inicio temprano), la barra de la ventana temprana (roja si es
+    crítica) y, a continuación, su holgura hasta el fin tardío.
+    """
+    span = max(1.0, project_finish - project_start)
+    scale = CHART_WIDTH / span # Píxeles por minuto
+    height = TITLE_HEIGHT + AXIS_HEIGHT + len(tasks) * BAR_ROW_HEIGHT + MARGIN
+    yield _svg_open(LABEL_WIDTH + CHART_WIDTH + MARGIN, height, title)
+    yield from _chunked(_gantt_elements(tasks, project_start, scale, height))
+    yield "</svg>"
@@ -1,13 +1,19 @@
 class Task:
     """
-    Representa una tarea con sus propiedades: nombre, duración, unidad de duración (minutos/horas), prioridad y dependencias.
+    Representa una tarea con sus propiedades: nombre, duración, unidad de duración (minutos/horas), prioridad, dependencias,
+    el sub-proyecto al que pertenece (ruta 'programa/fase/módulo', vacía para la raíz), su calendario laboral
+    y sus datos de compresión (duración mínima y costo por unidad de reducción).
     """
-    def __init__(self, name: str, duration: float, duration_unit: str = "minutes", priority: str = "Media", dependencies: list = None):
+    def __init__(self, name: str, duration: float, duration_unit: str = "minutes", priority: str = "Media", dependencies: list = None, subproject: str = "", calendar: str = None, min_duration: float = None, crash_cost: float = None):
         self.name = name
         self.duration = duration
         self.duration_unit = duration_unit.lower() # Almacenar en minúsculas para consistencia
         self.priority = priority
         self.dependencies = dependencies if dependencies is not None else []
+        self.subproject = subproject
+        self.calendar = calendar # Nombre del calendario laboral (None: tiempo continuo)
+        self.min_duration = min_duration # Duración mínima alcanzable al comprimir (misma unidad que duration)
+        self.crash_cost = crash_cost # Costo por unidad de duración reducida (None: no comprimible)
 
     def __repr__(self):
         return f"Task(name='{self.name}', duration={self.duration} {self.duration_unit}, priority='{self.priority}', dependencies={self.dependencies})"
@@ -1,5 +1,15 @@
-import sys
+import base64
+import csv
+import io
+import json
 import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+from xml.etree import ElementTree
 
 # Añadir el directorio actual al path para importar módulos
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -34,6 +44,13 @@ def test_hash_table():
     assert ht.contains("key1")
     ht.remove("key1")
     assert not ht.contains("key1")
+
+    # Crece al superar el factor de carga y distingue claves con los mismos caracteres
+    grow = CustomHashTable(capacity=4)
+    for i in range(1000):
+        grow.put(str(i), i)
+    assert grow.capacity > 1000 and grow.size == 1000
+    assert grow.get("12") == 12 and grow.get("21") == 21
     print("CustomHashTable Passed!")
 
 def test_heap():
@@ -92,6 +109,18 @@ def test_service():
     assert order.index("D") < order.index("E")
     # D should be before A because D is Critical and A is Low, and both start with 0 deps
     assert order.index("D") < order.index("A") 
+
+    # Ciclo A <-> B con C -> B y D aparte: ninguna tarea queda fuera del orden
+    cyclic = [
+        Task("A", 10, priority="Media", dependencies=["B"]),
+        Task("B", 10, priority="Alta", dependencies=["A", "C"]),
+        Task("C", 10, priority="Baja"),
+        Task("D", 10, priority="Alta"),
+    ]
+    assert service.priority_ordering(cyclic) == ["D", "C", "B", "A"]
+    # Con la condensación ya calculada no se reconstruye el grafo
+    condensation = service._build_graph(cyclic).condense()
+    assert service.priority_ordering(cyclic, condensation) == ["D", "C", "B", "A"]
     
     print("CustomService Passed!")
 
@@ -158,9 +187,1007 @@ def test_custom_graph():
     
     print("CustomGraph Passed!")
 
+def test_condensation():
+    print("Testing CustomGraph.condense...")
+    # S -> A -> B -> C -> A (ciclo) -> D ; S -> E ; F con auto-dependencia
+    graph = CustomGraph()
+    for name, duration, priority in [("S", 10, "Media"), ("A", 20, "Crítica"), ("B", 30, "Media"),
+                                     ("C", 40, "Media"), ("D", 5, "Alta"), ("E", 50, "Baja"), ("F", 1, "Media")]:
+        graph.add_node(name, data=Task(name, duration, priority=priority))
+    for source, target in [("S", "A"), ("A", "B"), ("B", "C"), ("C", "A"), ("C", "D"), ("S", "E"), ("F", "F")]:
+        graph.add_edge(source, target)
+
+    result = graph.condense()
+    assert result["order"] == ["F", "S", "E", "A", "B", "C", "D"]
+    assert result["cyclic_blocks"] == [["F"], ["A", "B", "C"]]
+    assert result["blocks"] == [["F"], ["S"], ["E"], ["A", "B", "C"], ["D"]]
+    assert [sorted(targets) for targets in result["block_successors"]] == [[], [2, 3], [], [4], []]
+    assert result["levels"] == {0: ["F", "S"], 1: ["E", "A", "B", "C"], 2: ["D"]}
+    # Bloque cíclico = 90 minutos en serie: S(10) + bloque(90) + D(5) supera a S + E (60)
+    assert result["longest_path_minutes"] == 105
+    assert result["critical_path"] == ["S", "A", "B", "C", "D"]
+    assert result["critical_tasks_count"] == 1
+
+    # Sin ciclos el orden coincide con el de get_tasks_order
+    dag = CustomGraph()
+    for name in ["X", "Y", "Z", "W"]:
+        dag.add_node(name, data={"duration": 60, "priority": "Media"})
+    for source, target in [("X", "Z"), ("Y", "Z"), ("Z", "W"), ("X", "W")]:
+        dag.add_edge(source, target)
+    assert dag.condense()["order"] == dag.get_tasks_order()["order"]
+    assert dag.condense()["cyclic_blocks"] == []
+
+    # Cadena larga: el Tarjan iterativo no depende del límite de recursión
+    chain = CustomGraph(capacity=10000)
+    for i in range(5000):
+        chain.add_node(str(i), data={"duration": 1})
+        if i:
+            chain.add_edge(str(i - 1), str(i))
+    chain.add_edge("4999", "4000")
+    chain_result = chain.condense()
+    assert len(chain_result["cyclic_blocks"]) == 1 and len(chain_result["cyclic_blocks"][0]) == 1000
+    assert max(chain_result["levels"]) == 4000
+
+    # calculate_levels ya no descarta las tareas en ciclos ni las que dependen de ellas
+    levels = CustomService().calculate_levels([
+        Task("A", 10), Task("B", 10, dependencies=["A", "C"]), Task("C", 10, dependencies=["B"]), Task("D", 10, dependencies=["C"]),
+    ])
+    assert levels == {0: ["A"], 1: ["B", "C"], 2: ["D"]}
+    print("CustomGraph.condense Passed!")
+
+from structures.custom_union_find import CustomUnionFind
+from component_service import ComponentService
+
+def test_longest_paths():
+    print("Testing CustomGraph.longest_paths...")
+    # A(2) -> B(5) -> D(1);  A -> C(4) -> D;  E(1) aislada
+    graph = CustomGraph()
+    for name, duration in [("A", 2), ("B", 5), ("C", 4), ("D", 1), ("E", 1)]:
+        graph.add_node(name, {"duration": duration})
+    for source, target in [("A", "B"), ("A", "C"), ("B", "D"), ("C", "D")]:
+        graph.add_edge(source, target)
+
+    result = graph.longest_paths(10)
+    assert result["longest_path_minutes"] == 8
+    assert [(p["tasks"], p["length_minutes"]) for p in result["paths"]] == [
+        (["A", "B", "D"], 8), (["A", "C", "D"], 7), (["E"], 1)
+    ]
+    assert not result["truncated"]
+    assert graph.longest_paths(1)["truncated"]
+    near = graph.longest_paths(10, within_minutes=1)
+    assert [p["tasks"] for p in near["paths"]] == [["A", "B", "D"], ["A", "C", "D"]] and not near["truncated"]
+
+    # Proyecto muy paralelo: 20 capas de 20 tareas conectadas entre sí (20^20 caminos)
+    wide = CustomGraph(capacity=1000)
+    for layer in range(20):
+        for i in range(20):
+            wide.add_node(f"{layer}-{i}", {"duration": 10 if i == layer else 1})
+            if layer:
+                for j in range(20):
+                    wide.add_edge(f"{layer - 1}-{j}", f"{layer}-{i}")
+    top = wide.longest_paths(50)
+    assert top["paths"][0]["tasks"] == [f"{i}-{i}" for i in range(20)]
+    assert [p["length_minutes"] for p in top["paths"][:20]] == [200] + [191] * 19
+    assert len(top["paths"]) == 50 and top["truncated"]
+
+    cyclic = CustomGraph()
+    cyclic.add_node("X")
+    cyclic.add_node("Y")
+    cyclic.add_edge("X", "Y")
+    cyclic.add_edge("Y", "X")
+    try:
+        cyclic.longest_paths(3)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("CustomGraph.longest_paths Passed!")
+
+def test_deep_cyclic_plan_api():
+    print("Testing deep cyclic plan through the API...")
+    from fastapi.testclient import TestClient
+    from api import app
+    # Cadena de 3000 tareas con un solo ciclo T1 -> T2 -> T3 -> T1 al inicio
+    tasks = [
+        {"id": i, "name": f"T{i}", "duration": 1, "unit": "hours", "priority": "Media", "dependencies": [i - 1] if i > 1 else [3]}
+        for i in range(1, 3001)
+    ]
+    client = TestClient(app)
+    response = client.post("/generate-plan", json=tasks)
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["ciclos_detectados"] == [["T1", "T2", "T3", "T1"]]
+    assert data["bloques_ciclicos"] == [["T1", "T2", "T3"]]
+    assert len(data["orden_tareas"]) == 3000
+
+    response = client.post("/generate-custom-plan", json=tasks)
+    assert response.status_code == 200, response.text
+    assert len(response.json()["levels"]) == 2998
+    print("Deep cyclic plan Passed!")
+
+def test_union_find():
+    print("Testing CustomUnionFind...")
+    uf = CustomUnionFind(capacity=10)
+    for name in ["A", "B", "C", "D", "E"]:
+        uf.add(name)
+    assert uf.count() == 5
+    assert uf.union("A", "B")
+    assert uf.union("B", "C")
+    assert not uf.union("A", "C")
+    uf.union("D", "E")
+    assert uf.count() == 2
+    assert uf.connected("A", "C")
+    assert not uf.connected("A", "D")
+    assert uf.find("C") == uf.find("A")
+    assert uf.groups() == [["A", "B", "C"], ["D", "E"]]
+    print("CustomUnionFind Passed!")
+
+def test_component_service():
+    print("Testing ComponentService...")
+    # Dos flujos independientes: A -> B -> C y D -> E, más F aislada
+    tasks = [
+        Task("A", 60, priority="Baja"),
+        Task("B", 60, priority="Media", dependencies=["A"]),
+        Task("C", 60, priority="Alta", dependencies=["B"]),
+        Task("D", 120, priority="Crítica"),
+        Task("E", 60, priority="Baja", dependencies=["D"]),
+        Task("F", 60, priority="Alta"),
+    ]
+
+    sequential = ComponentService(parallel_threshold=10**9)
+    components = sequential.split_components(tasks)
+    assert [[t.name for t in c] for c in components] == [["A", "B", "C"], ["D", "E"], ["F"]]
+
+    result = sequential.analyze(tasks)
+    assert result["components"] == 3
+    assert result["cycles"] == []
+    assert result["order_result"]["total_duration_hours"] == 7.0
+    assert result["order_result"]["critical_tasks_count"] == 1
+    assert set(result["levels"][0]) == {"A", "D", "F"}
+    assert set(result["levels"][1]) == {"B", "E"}
+    assert result["levels"][2] == ["C"]
+    order = result["priority_order"]
+    assert order[0] == "D"
+    assert order.index("A") < order.index("B") < order.index("C")
+
+    # El camino en paralelo debe producir el mismo análisis
+    parallel = ComponentService(max_workers=2, parallel_threshold=0)
+    try:
+        parallel_result = parallel.analyze(tasks)
+    finally:
+        parallel.shutdown()
+    assert parallel_result["levels"] == result["levels"]
+    assert parallel_result["order_result"] == result["order_result"]
+
+    # Un ciclo en un componente se reduce a un bloque: el orden global se conserva
+    cyclic = tasks + [Task("G", 10, dependencies=["H"]), Task("H", 10, dependencies=["G"])]
+    cyclic_result = sequential.analyze(cyclic)
+    assert len(cyclic_result["cycles"]) == 1
+    assert [set(block) for block in cyclic_result["cyclic_blocks"]] == [{"G", "H"}]
+    assert len(cyclic_result["order_result"]["order"]) == len(cyclic)
+    assert "C" in cyclic_result["levels"][2]
+    assert {"G", "H"} <= set(cyclic_result["levels"][0])
+    assert result["critical_path"] == ["A", "B", "C"] and result["longest_path_minutes"] == 180
+    print("ComponentService Passed!")
+
+from subproject_service import SubprojectService
+
+def test_subproject_service():
+    print("Testing SubprojectService...")
+    # Programa/Fase1: A -> B ; Programa/Fase2: C -> D ; raíz: E depende de B y D
+    def build(duration_c):
+        return [
+            Task("A", 10, subproject="Programa/Fase1"),
+            Task("B", 20, dependencies=["A"], subproject="Programa/Fase1"),
+            Task("C", duration_c, subproject="Programa/Fase2"),
+            Task("D", 5, dependencies=["C", "A"], subproject="Programa/Fase2"),
+            Task("E", 1, dependencies=["B", "D"]),
+        ]
+
+    service = SubprojectService()
+    first = service.analyze(build(40))
+    # Camino más largo: C(40) -> D(5) -> E(1)
+    assert first["root"].longest_path == 46
+    assert set(first["recomputed"]) == {"", "Programa", "Programa/Fase1", "Programa/Fase2"}
+    fase1 = next(r for r in first["subprojects"] if r["path"] == "Programa/Fase1")
+    assert fase1["entries"] == ["A"] and set(fase1["exits"]) == {"A", "B"}
+
+    # Editar solo Fase2 recalcula esa hoja y sus ancestros, no la Fase1
+    second = service.analyze(build(2))
+    assert set(second["recomputed"]) == {"", "Programa", "Programa/Fase2"}
+    # Ahora domina A(10) -> B(20) -> E(1)
+    assert second["root"].longest_path == 31
+
+    # Un ciclo dentro de un sub-proyecto se propaga a sus ancestros
+    cyclic = build(40) + [Task("X", 1, dependencies=["Y"], subproject="Otro"), Task("Y", 1, dependencies=["X"], subproject="Otro")]
+    result = service.analyze(cyclic)
+    assert result["root"].has_cycles and result["root"].longest_path is None
+    print("SubprojectService Passed!")
+
+def test_subproject_service_matches_flat():
+    print("Testing SubprojectService vs flat longest path...")
+    rng = random.Random(7)
+    paths = ["", "a", "a/b", "a/c", "d", "d/e/f"]
+    for _ in range(20):
+        tasks = []
+        for i in range(40):
+            deps = [f"T{j}" for j in range(i) if rng.random() < 0.08]
+            tasks.append(Task(f"T{i}", rng.randint(1, 30), dependencies=deps, subproject=rng.choice(paths)))
+        finish = {}
+        for t in tasks:
+            finish[t.name] = t.duration + max((finish[d] for d in t.dependencies), default=0)
+        assert SubprojectService().analyze(tasks)["root"].longest_path == max(finish.values())
+    print("SubprojectService vs flat Passed!")
+
+from structures.working_calendar import WorkingCalendar, to_minutes, from_minutes
+from schedule_service import ScheduleService
+
+def make_office_calendar(years: int = 3) -> WorkingCalendar:
+    # Lunes a viernes, 08:00-12:00 y 13:00-17:00; 2024-01-01 es lunes y feriado
+    periods = [(8 * 60, 12 * 60), (13 * 60, 17 * 60)]
+    return WorkingCalendar("oficina", date(2024, 1, 1), years * 366, {d: periods for d in range(5)}, [date(2024, 1, 1)])
+
+def test_working_calendar():
+    print("Testing WorkingCalendar...")
+    calendar = make_office_calendar()
+    assert calendar.minutes_per_day == 480
+
+    # Desde el viernes 16:00, 2 horas laborables terminan el martes 09:00 (lunes normal)
+    start = to_minutes(datetime(2024, 1, 5, 16, 0))
+    assert from_minutes(calendar.add_working_time(start, 120)) == datetime(2024, 1, 8, 9, 0)
+    # Terminar justo al final de la jornada no salta al día siguiente
+    morning = to_minutes(datetime(2024, 1, 2, 8, 0))
+    assert from_minutes(calendar.add_working_time(morning, 480)) == datetime(2024, 1, 2, 17, 0)
+    # El feriado del lunes 1 se salta
+    assert from_minutes(calendar.next_working_minute(to_minutes(datetime(2024, 1, 1, 10, 0)))) == datetime(2024, 1, 2, 8, 0)
+    # Restar tiempo laborable es la operación inversa
+    finish = to_minutes(datetime(2024, 1, 8, 9, 0))
+    assert from_minutes(calendar.subtract_working_time(finish, 120)) == datetime(2024, 1, 5, 16, 0)
+    assert calendar.working_minutes_between(morning, to_minutes(datetime(2024, 1, 3, 8, 0))) == 480
+
+    # Horizonte de varios años: 2 años laborables (~500 días) se resuelven igual
+    two_years = calendar.add_working_time(morning, 500 * 480)
+    assert calendar.working_minutes_between(morning, two_years) == 500 * 480
+
+    # Las fechas con zona horaria se normalizan a UTC
+    assert to_minutes(datetime(2024, 1, 2, 8, 0, tzinfo=timezone.utc)) == morning
+    assert to_minutes(datetime(2024, 1, 2, 10, 0, tzinfo=timezone(timedelta(hours=2)))) == morning
+    # Antes del inicio del calendario no se recorta en silencio
+    try:
+        calendar.next_working_minute(to_minutes(datetime(2023, 12, 31, 9, 0)))
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        assert "before the horizon" in str(e)
+    print("WorkingCalendar Passed!")
+
+def test_schedule_service():
+    print("Testing ScheduleService...")
+    service = ScheduleService()
+    service.register_calendar(make_office_calendar())
+    # A (8h) -> B (4h) -> D (1h);  A -> C (1h) -> D
+    tasks = [
+        Task("A", 480, calendar="oficina"),
+        Task("B", 240, dependencies=["A"], calendar="oficina"),
+        Task("C", 60, dependencies=["A"], calendar="oficina"),
+        Task("D", 60, dependencies=["B", "C"], calendar="oficina"),
+    ]
+    result = service.schedule(tasks, to_minutes(datetime(2024, 1, 2, 8, 0)))
+    by_name = {t["name"]: t for t in result["tasks"]}
+    assert from_minutes(by_name["A"]["early_finish"]) == datetime(2024, 1, 2, 17, 0)
+    assert from_minutes(by_name["B"]["early_start"]) == datetime(2024, 1, 3, 8, 0)
+    assert from_minutes(result["project_finish"]) == datetime(2024, 1, 3, 14, 0)
+    assert result["critical_path"] == ["A", "B", "D"]
+    assert not by_name["C"]["critical"] and by_name["C"]["slack"] == 180
+
+    # Sin calendario el tiempo es continuo
+    plain = service.schedule([Task("X", 90), Task("Y", 30, dependencies=["X"])], 0)
+    assert plain["project_finish"] == 120
+
+    cyclic = service.schedule([Task("X", 1, dependencies=["Y"]), Task("Y", 1, dependencies=["X"])], 0)
+    assert cyclic["cycles"] and cyclic["tasks"] == []
+
+    from fastapi.testclient import TestClient
+    from api import app
+    client = TestClient(app)
+    calendar = {"name": "oficina-api", "start_date": "2024-01-01"}
+    body = {
+        "tasks": [{"id": 1, "name": "A", "duration": 8, "unit": "hours", "priority": "Media", "dependencies": []}],
+        "project_start": "2024-01-02T08:00:00Z",
+        "calendar": "oficina-api",
+        "calendars": [calendar],
+    }
+    response = client.post("/generate-schedule", json=body)
+    assert response.status_code == 200
+    assert response.json()["tasks"][0]["early_finish"] == "2024-01-02T17:00:00"
+    schedule_id = response.json()["schedule_id"]
+    running = client.get(f"/schedules/{schedule_id}/running", params={"start": "2024-01-02T09:00:00Z", "end": "2024-01-02T10:00:00"})
+    assert running.status_code == 200 and [t["name"] for t in running.json()["tasks"]] == ["A"]
+    assert client.get(f"/schedules/{schedule_id}/at", params={"moment": "2024-01-02T12:00:00+02:00"}).json()["tasks"][0]["name"] == "A"
+    inverted = {"max_slack_hours": 1, "start": "2024-01-02T12:00:00", "end": "2024-01-02T09:00:00"}
+    assert client.get(f"/schedules/{schedule_id}/low-slack", params=inverted).status_code == 400
+    assert client.get(f"/schedules/{schedule_id}/low-slack", params=dict(inverted, end="2024-01-02T13:00:00")).status_code == 200
+
+    body["project_start"] = "2023-12-20T08:00:00"
+    assert client.post("/generate-schedule", json=body).status_code == 400
+    for horizon in (0, -5, 10 ** 9):
+        assert client.post("/calendars", json={**calendar, "horizon_days": horizon}).status_code == 422
+    print("ScheduleService Passed!")
+
+from structures.custom_interval_tree import CustomIntervalTree
+from schedule_index import ScheduleIndexService
+
+def test_schedule_index():
+    print("Testing ScheduleIndex...")
+    rng = random.Random(7)
+    intervals = []
+    for _ in range(300):
+        start = rng.randint(0, 1000)
+        intervals.append((start, start + rng.randint(0, 60)))
+    tree = CustomIntervalTree(intervals)
+    for _ in range(200):
+        low = rng.randint(-50, 1050)
+        high = low + rng.randint(0, 100)
+        expected = sorted(i for i, (s, e) in enumerate(intervals) if s <= high and e >= low)
+        assert sorted(tree.overlap(low, high)) == expected
+        assert sorted(tree.stab(low)) == [i for i, (s, e) in enumerate(intervals) if s <= low <= e]
+    try:
+        CustomIntervalTree([(5, 1)])
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+
+    # Con pesos: solapamiento y peso menor que el umbral, contra fuerza bruta
+    weights = [rng.randint(0, 100) for _ in intervals]
+    weighted = CustomIntervalTree(intervals, weights)
+    for _ in range(200):
+        low = rng.randint(-50, 1050)
+        high = low + rng.randint(0, 200)
+        threshold = rng.randint(0, 110)
+        expected = sorted(i for i, (s, e) in enumerate(intervals) if s <= high and e >= low and weights[i] < threshold)
+        assert sorted(weighted.overlap_below(low, high, threshold)) == expected
+
+    # A(60) -> B(120) -> D(30);  A -> C(30) -> D   (tiempo continuo desde 0)
+    tasks = [
+        Task("A", 60),
+        Task("B", 120, dependencies=["A"]),
+        Task("C", 30, dependencies=["A"]),
+        Task("D", 30, dependencies=["B", "C"]),
+    ]
+    result = ScheduleService().schedule(tasks, 0)
+    service = ScheduleIndexService(cache_size=2)
+    index = service.build_index(result)
+    assert service.build_index(result) is index and service.get_index(index.schedule_id) is index
+
+    names = lambda items: [t["name"] for t in items]
+    assert names(index.running(70, 100)) == ["B", "C"]
+    assert names(index.at(60)) == ["A", "B", "C"] # Los extremos cuentan
+    assert names(index.at(200)) == ["D"]
+    assert names(index.low_slack(1)) == ["A", "B", "D"]
+    assert names(index.low_slack(100)) == ["A", "B", "D", "C"]
+    assert names(index.low_slack(100, 185, 300)) == ["D"]
+    assert names(index.starting_after(0)) == ["B", "C", "D"]
+    assert names(index.starting_after(0, limit=1, inclusive=True)) == ["A"]
+
+    # La clave distingue programaciones que solo difieren en fechas tardías o calendario
+    changed = dict(result, tasks=[dict(task) for task in result["tasks"]])
+    changed["tasks"][2]["late_finish"] += 1
+    assert service._schedule_key(changed) != index.schedule_id
+    changed["tasks"][2]["late_finish"] -= 1
+    changed["tasks"][2]["calendar"] = "oficina"
+    assert service._schedule_key(changed) != index.schedule_id
+
+    # Desalojo FIFO al superar cache_size
+    service.build_index(ScheduleService().schedule([Task("X", 10)], 0))
+    service.build_index(ScheduleService().schedule([Task("Y", 10)], 0))
+    assert service.get_index(index.schedule_id) is None
+    print("ScheduleIndex Passed!")
+
+from svg_renderer import CHUNK_ELEMENTS, layered_layout, render_graph_svg, render_gantt_svg
+
+def test_svg_renderer():
+    print("Testing SVG renderer...")
+    svg_ns = "{http://www.w3.org/2000/svg}"
+    tasks = [Task(f"T{i}", 10, dependencies=[f"T{i - 1}"] if i else []) for i in range(CHUNK_ELEMENTS)]
+    tasks.append(Task("<Cierre & fin>", 5, dependencies=["T0"]))
+    layout = layered_layout(tasks)
+    assert layout["positions"][1][0] > layout["positions"][0][0] # Una columna por nivel
+    assert layout["positions"][-1][0] == layout["positions"][1][0]
+
+    chunks = list(render_graph_svg(layout, "Grafo", {"T0"}))
+    assert len(chunks) > 3 # Se emite por fragmentos
+    root = ElementTree.fromstring("".join(chunks)) # SVG bien formado (nombres escapados)
+    nodes = root.findall(f"{svg_ns}g")
+    assert len(nodes) == len(tasks) and len(root.findall(f"{svg_ns}line")) == len(tasks) - 1
+    assert nodes[-1].find(f"{svg_ns}title").text == "<Cierre & fin>"
+    assert nodes[0].find(f"{svg_ns}rect").get("class") == "node highlight"
+
+    result = ScheduleService().schedule([Task("A", 60), Task("B", 120, dependencies=["A"]), Task("C", 30, dependencies=["A"])], 0)
+    root = ElementTree.fromstring("".join(render_gantt_svg(result["tasks"], 0, result["project_finish"], "Gantt")))
+    bars = {g.find(f"{svg_ns}text").text: g.findall(f"{svg_ns}rect") for g in root.findall(f"{svg_ns}g")}
+    assert [rect.get("class") for rect in bars["B"]] == ["critical"]
+    assert [rect.get("class") for rect in bars["C"]] == ["slack", "bar"] # C tiene 90 min de holgura
+    print("SVG renderer Passed!")
+
+from crashing_service import CrashingService, IncrementalCriticalPath
+from schedule_service import build_index_graph, topological_order
+
+def test_crashing_service():
+    print("Testing CrashingService...")
+    # A(10) -> C(5) y B(8) -> C; costos por minuto: A=2, B=1, C=5
+    tasks = [
+        Task("A", 10, min_duration=6, crash_cost=2),
+        Task("B", 8, min_duration=4, crash_cost=1),
+        Task("C", 5, dependencies=["A", "B"], min_duration=3, crash_cost=5),
+    ]
+    result = CrashingService().crash(tasks, 6)
+    assert result["initial_duration"] == 15
+    assert result["final_duration"] == 9
+    # Primero A (hasta igualar la ruta de B), luego A y B juntos (3 < 5), y por último C
+    assert [sorted(step["tasks"]) for step in result["steps"]] == [["A"], ["A", "B"], ["C"]]
+    assert result["total_cost"] == 2 * 2 + 2 * 3 + 2 * 5
+    assert result["durations"] == {"A": 6, "B": 6, "C": 3}
+
+    # Sin más tareas comprimibles se detiene antes de la meta
+    limited = CrashingService().crash([Task("X", 10, min_duration=8, crash_cost=1), Task("Y", 5, dependencies=["X"])], 10)
+    assert limited["final_duration"] == 13
+
+    # A -> B no es crítica (10 < 15) pero se vuelve crítica tras acortar C y D en 5
+    tasks = [
+        Task("A", 5),
+        Task("C", 10, dependencies=["A"], min_duration=0, crash_cost=1),
+        Task("D", 10, min_duration=0, crash_cost=1),
+        Task("B", 5, dependencies=["D", "A"]),
+    ]
+    edge_limited = CrashingService().crash(tasks, 10)
+    assert edge_limited["final_duration"] == 10 and edge_limited["total_cost"] == 10
+    assert [step["reduction"] for step in edge_limited["steps"]] == [5]
+
+    assert CrashingService().crash([], 120)["steps"] == []
+
+    from fastapi.testclient import TestClient
+    from api import app
+    client = TestClient(app)
+    body = {"tasks": [{"id": 1, "name": "A", "duration": 1, "unit": "hours", "priority": "Media", "dependencies": []}], "reduction": -1}
+    assert client.post("/crash-plan", json=body).status_code == 422
+    body["reduction"] = "NaN"
+    assert client.post("/crash-plan", json=body).status_code == 422
+
+    # Duración mínima o costo negativos: error de la petición, no duraciones negativas gratis
+    task = {"id": 1, "name": "A", "duration": 5, "unit": "hours", "priority": "Media", "dependencies": [], "min_duration": 0, "crash_cost": 1}
+    for field, value in (("min_duration", -10), ("crash_cost", -3)):
+        response = client.post("/crash-plan", json={"tasks": [dict(task, **{field: value})], "reduction": 12})
+        assert response.status_code == 400 and field in response.json()["detail"]
+    try:
+        CrashingService().crash([Task("A", 5, min_duration=-1, crash_cost=1)], 1)
+        assert False, "Expected ValueError"
+    except ValueError:
+        pass
+    print("CrashingService Passed!")
+
+def test_incremental_critical_path():
+    print("Testing IncrementalCriticalPath...")
+    rng = random.Random(3)
+    tasks = []
+    for i in range(60):
+        deps = [f"T{j}" for j in range(max(0, i - 10), i) if rng.random() < 0.2]
+        tasks.append(Task(f"T{i}", rng.randint(1, 20), dependencies=deps))
+    predecessors, successors = build_index_graph(tasks)
+    order = topological_order(successors)
+    state = IncrementalCriticalPath([t.duration for t in tasks], predecessors, successors, order)
+    durations = [t.duration for t in tasks]
+    for _ in range(30):
+        changes = [(rng.randrange(60), rng.randint(0, 20)) for _ in range(3)]
+        state.update_durations(changes)
+        for node, duration in changes:
+            durations[node] = duration
+        expected = IncrementalCriticalPath(durations, predecessors, successors, order)
+        assert state.head == expected.head and state.tail == expected.tail
+        assert state.length() == expected.length()
+        assert sorted(state.critical_nodes()[0]) == sorted(expected.critical_nodes()[0])
+    print("IncrementalCriticalPath Passed!")
+
+from graph_view_service import GraphViewService, COLUMN_SPACING, ROW_SPACING
+
+def test_graph_view_service():
+    print("Testing GraphViewService...")
+    # Nivel 0: A, B, C ; nivel 1: D (A, B) ; nivel 2: E (D) ; ciclo X <-> Y
+    tasks = [
+        Task("A", 10, priority="Crítica"),
+        Task("B", 10),
+        Task("C", 10),
+        Task("D", 10, dependencies=["A", "B"]),
+        Task("E", 10, dependencies=["D"]),
+        Task("X", 10, dependencies=["Y"]),
+        Task("Y", 10, dependencies=["X"]),
+    ]
+    service = GraphViewService()
+    view = service.build_view(tasks, "level", max_cluster_size=2)
+    assert service.build_view(tasks, "level", max_cluster_size=2) is view
+    assert service.get_view(view.view_id) is view
+
+    overview = view.overview()
+    sizes = {n["data"]["id"]: n["data"]["size"] for n in overview["nodes"]}
+    assert sizes == {"level:-1": 2, "level:0#0": 2, "level:0#1": 1, "level:1": 1, "level:2": 1}
+    counts = {(e["data"]["source"], e["data"]["target"]): e["data"]["count"] for e in overview["edges"]}
+    assert counts == {("level:0#0", "level:1"): 2, ("level:1", "level:2"): 1}
+
+    detail = view.cluster_detail("level:1")
+    ids = {n["data"]["id"] for n in detail["nodes"]}
+    assert ids == {"D", "level:0#0", "level:2"}
+    assert {"source": "level:0#0", "target": "D", "count": 2} in [e["data"] for e in detail["edges"]]
+    assert view.cluster_detail("missing") is None
+
+    # Ventana que cubre solo las columnas de los niveles 0 y 1, primera fila
+    elements, truncated = view.viewport(COLUMN_SPACING, 2 * COLUMN_SPACING, 0, ROW_SPACING / 2, 100)
+    assert {n["data"]["id"] for n in elements["nodes"]} == {"A", "D"}
+    assert [e["data"] for e in elements["edges"]] == [{"source": "A", "target": "D"}]
+    assert not truncated
+    # Ventanas fuera del dibujo o invertidas no devuelven nada
+    assert view.viewport(0, 2 * COLUMN_SPACING, -400, -200, 100) == ({"nodes": [], "edges": []}, False)
+    assert view.viewport(0, 2 * COLUMN_SPACING, ROW_SPACING, 0, 100)[0]["nodes"] == []
+    assert view.viewport(0, 2 * COLUMN_SPACING, -ROW_SPACING * 1.5, -ROW_SPACING / 2, 100)[0]["nodes"] == []
+
+    components = service.build_view(tasks, "component", max_cluster_size=100).overview()
+    assert sorted(n["data"]["size"] for n in components["nodes"]) == [1, 2, 4]
+
+    # Presupuesto de clústeres: niveles contiguos se unen hasta no superar max_clusters
+    from graph_view_service import GraphView, MAX_CLUSTERS
+    chain = [Task(f"C{i}", 1, dependencies=[f"C{i - 1}"] if i else []) for i in range(1000)]
+    budgeted = GraphView("chain", "level", chain, max_cluster_size=200)
+    assert len(budgeted.cluster_ids) <= MAX_CLUSTERS
+    assert sorted(node for members in budgeted.cluster_members for node in members) == list(range(1000))
+    assert budgeted.cluster_ids[0] == "level:0..level:4" and budgeted.cluster_labels[0] == "Nivel 0 – Nivel 4"
+    assert len(budgeted.cluster_detail("level:0..level:4")["nodes"]) == 5 + 1 # Sus tareas y el clúster vecino
+    small = GraphView("small", "level", tasks, max_cluster_size=1, max_clusters=3)
+    assert len(small.cluster_ids) <= 3 and sum(len(members) for members in small.cluster_members) == len(tasks)
+
+    # La imagen de la vista agregada dibuja clústeres, no tareas
+    from svg_renderer import overview_layout
+    layout = overview_layout(view)
+    assert len(layout["names"]) == 5 and len(layout["edges"]) == 2
+    assert layout["priorities"][view.cluster_index.get("level:0#0")] == "Crítica"
+
+    from fastapi.testclient import TestClient
+    from api import app
+    independent = [
+        {"id": i + 1, "name": f"T{i}", "duration": 1, "unit": "hours", "priority": "Media", "dependencies": []}
+        for i in range(400)
+    ]
+    response = TestClient(app).post("/generate-plan?view=level", json=independent)
+    assert response.status_code == 200
+    svg_ns = "{http://www.w3.org/2000/svg}"
+    root = ElementTree.fromstring(base64.b64decode(response.json()["image_base64"]))
+    assert len(root.findall(f"{svg_ns}g")) == len(response.json()["graph_data"]["nodes"]) == 2
+    assert TestClient(app).post("/generate-plan?view=level&max_cluster_size=0", json=independent).status_code == 400
+    view_id = response.json()["view_id"]
+    for max_nodes in (0, -3):
+        viewport = {"x_min": 0, "x_max": 1000, "y_min": 0, "y_max": 1000, "max_nodes": max_nodes}
+        assert TestClient(app).get(f"/graph-view/{view_id}/viewport", params=viewport).status_code == 422
+    print("GraphViewService Passed!")
+
+from import_service import import_csv, import_msproject, export_task_inputs
+
+def test_import_csv():
+    print("Testing import_csv...")
+    data = (
+        "id,name,duration,unit,priority,dependencies\n"
+        "1,Diseño,2,hours,Alta,\n"
+        "2,Código,90,minutes,Crítica,1;3\n"   # 3 aparece más adelante
+        "3,Revisión,1,hours,Media,1\n"
+        "4,\"Pruebas, integración\",1,hours,Baja,2;99\n"  # 99 no existe
+        "3,Duplicada,1,hours,Media,\n"
+    )
+    report = import_csv(io.BytesIO(data.encode("utf-8")))
+    project = report["project"]
+    assert project.task_count() == 4
+    assert report["duplicate_ids"] == ["3"]
+    assert report["missing_dependencies"] == ["99"]
+    analysis = project.analyze()
+    assert analysis["dependency_count"] == 4
+    assert analysis["cyclic_task_count"] == 0
+    assert analysis["level_count"] == 4
+    # Diseño(120) -> Revisión(60) -> Código(90) -> Pruebas(60)
+    assert analysis["longest_path_minutes"] == 330
+    tasks = list(export_task_inputs(project))
+    assert tasks[1]["dependencies"] == [1, 3] and tasks[3]["name"] == "Pruebas, integración"
+
+    # Duraciones negativas o no finitas se omiten como las demás filas inválidas
+    data = "id,name,duration\n1,A,2\n2,B,-1\n3,C,nan\n4,D,inf\n5,E,1e400\n6,F,x\n"
+    report = import_csv(io.BytesIO(data.encode("utf-8")))
+    assert report["project"].task_count() == 1 and report["skipped_rows"] == 5
+
+    # Un CSV mal formado es un error de la petición (400), no del servidor
+    from fastapi.testclient import TestClient
+    from api import app
+    broken = "id,name,duration\n1,\"" + "x" * (csv.field_size_limit() + 1) + "\",1\n"
+    try:
+        import_csv(io.BytesIO(broken.encode("utf-8")))
+        assert False, "Expected ValueError"
+    except ValueError as e:
+        assert "Invalid CSV at line" in str(e)
+    response = TestClient(app).post("/import/csv", files={"file": ("p.csv", broken.encode("utf-8"), "text/csv")})
+    assert response.status_code == 400
+    print("import_csv Passed!")
+
+def test_import_msproject():
+    print("Testing import_msproject...")
+    xml = """<?xml version="1.0"?>
+<Project xmlns="http://schemas.microsoft.com/project">
+  <Name>Demo</Name>
+  <Tasks>
+    <Task><UID>0</UID><Name>Demo</Name><OutlineLevel>0</OutlineLevel><Summary>1</Summary></Task>
+    <Task><UID>1</UID><Name>Fase 1</Name><OutlineLevel>1</OutlineLevel><Summary>1</Summary></Task>
+    <Task><UID>2</UID><Name>A</Name><OutlineLevel>2</OutlineLevel><Duration>PT8H0M0S</Duration><Priority>900</Priority></Task>
+    <Task><UID>3</UID><Name>B</Name><OutlineLevel>2</OutlineLevel><Duration>PT4H30M0S</Duration>
+      <PredecessorLink><PredecessorUID>2</PredecessorUID><Type>1</Type></PredecessorLink></Task>
+    <Task><UID>4</UID><Name>C</Name><OutlineLevel>1</OutlineLevel><Duration>PT1H0M0S</Duration>
+      <PredecessorLink><PredecessorUID>3</PredecessorUID></PredecessorLink></Task>
+  </Tasks>
+  <Resources><Resource><UID>1</UID><Name>R</Name></Resource></Resources>
+</Project>"""
+    report = import_msproject(io.BytesIO(xml.encode("utf-8")))
+    project = report["project"]
+    assert project.names == ["A", "B", "C"]
+    assert project.subprojects == ["Fase 1", "Fase 1", ""]
+    assert report["skipped_rows"] == 2
+    analysis = project.analyze()
+    assert analysis["longest_path_minutes"] == 8 * 60 + 270 + 60
+    assert analysis["critical_priority_count"] == 1
+
+    # Un OutlineLevel no numérico o negativo se omite como las demás filas inválidas
+    bad_levels = """<Project><Tasks>
+    <Task><UID>1</UID><Name>A</Name><OutlineLevel>uno</OutlineLevel></Task>
+    <Task><UID>2</UID><Name>B</Name><OutlineLevel>-2</OutlineLevel></Task>
+    <Task><UID>3</UID><Name>C</Name><OutlineLevel>1</OutlineLevel></Task>
+  </Tasks></Project>"""
+    report = import_msproject(io.BytesIO(bad_levels.encode("utf-8")))
+    assert report["project"].names == ["C"] and report["skipped_rows"] == 2
+    from fastapi.testclient import TestClient
+    from api import app
+    response = TestClient(app).post("/import/msproject", files={"file": ("p.xml", bad_levels.encode("utf-8"), "application/xml")})
+    assert response.status_code == 200 and response.json()["skipped_rows"] == 2
+    print("import_msproject Passed!")
+
+from load_test import percentile, load_mix, synthetic_tasks, compare_to_baseline, main as load_test_main
+
+def test_load_test_helpers():
+    print("Testing load_test helpers...")
+    assert percentile([], 0.5) == 0.0
+    assert percentile([4, 1, 3, 2], 0.5) == 2.5
+    assert percentile([1, 2, 3, 4, 5], 0.99) > 4.9
+
+    # Mezcla en formato requests.jsonl: body como objeto o como texto JSON
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False, encoding="utf-8") as handle:
+        handle.write(json.dumps({"request_id": "r1", "title": "plan", "body": [{"id": 1}]}) + "\n\n")
+        handle.write(json.dumps({"request_id": "r2", "title": "custom", "body": "[]", "path": "/generate-custom-plan", "weight": 3}) + "\n")
+    mix = load_mix(handle.name)
+    os.remove(handle.name)
+    assert [spec["path"] for spec in mix] == ["/generate-plan", "/generate-custom-plan"]
+    assert mix[1]["body"] == [] and mix[1]["weight"] == 3.0 and mix[0]["method"] == "POST"
+
+    tasks = synthetic_tasks(50)
+    assert all(dep < task["id"] for task in tasks for dep in task["dependencies"])
+
+    baseline = {"s@c1": {"throughput_rps": 100.0, "latency_p50_ms": 10.0, "latency_p95_ms": 20.0, "errors": 0}}
+    result = {"scenario": "s@c1", "errors": 0, "throughput_rps": 95.0, "latency_p50_ms": 10.5, "latency_p95_ms": 30.0,
+              "latency_p99_ms": 40.0, "loop_lag_p99_ms": 1.0, "peak_rss_mb": 80.0}
+    failures = compare_to_baseline([result], baseline, 0.2)
+    assert len(failures) == 1 and "latency_p95_ms" in failures[0]
+    assert compare_to_baseline([dict(result, scenario="otro")], baseline, 0.2) == []
+
+    # Escenario real contra uvicorn en un hilo del mismo proceso
+    with tempfile.TemporaryDirectory() as directory:
+        output = os.path.join(directory, "results.json")
+        assert load_test_main(["--synthetic", "20", "--concurrency", "2", "--requests", "6", "--json", output]) == 0
+        with open(output, encoding="utf-8") as handle:
+            [scenario] = json.load(handle)
+    assert scenario["scenario"] == "synthetic-20@c2" and scenario["requests"] == 6 and scenario["errors"] == 0
+    print("load_test helpers Passed!")
+
+from structures.persistent_map import PersistentHashMap
+from project_history import ProjectHistory
+
+def test_persistent_map():
+    print("Testing PersistentHashMap...")
+    empty = PersistentHashMap()
+    versions = [empty]
+    current = empty
+    for i in range(2000):
+        current = current.set(f"T{i}", i)
+        if i % 500 == 0:
+            versions.append(current)
+    assert current.size() == 2000 and empty.size() == 0
+    assert current.get("T1234") == 1234 and current.get("X") is None
+    assert versions[1].size() == 1 and not versions[1].contains("T1")
+    assert current.set("T5", 5) is current # Sin cambios: mismo mapa
+
+    edited = current.set("T5", -5).remove("T7").set("nueva", 1)
+    assert current.get("T5") == 5 and current.contains("T7") # La versión anterior no cambia
+    assert edited.get("T5") == -5 and not edited.contains("T7") and edited.size() == 2000
+    assert sorted(current.diff(edited)) == [("T5", 5, -5), ("T7", 7, None), ("nueva", None, 1)]
+    assert current.diff(current) == []
+
+    shrunk = current
+    for i in range(0, 2000, 2):
+        shrunk = shrunk.remove(f"T{i}")
+    assert shrunk.size() == 1000 and sorted(int(k[1:]) for k in shrunk.keys()) == list(range(1, 2000, 2))
+    assert len(current.diff(shrunk)) == 1000
+    print("PersistentHashMap Passed!")
+
+def test_project_history():
+    print("Testing ProjectHistory...")
+    history = ProjectHistory(ComponentService(parallel_threshold=10**9))
+    base = [
+        Task("A", 60), Task("B", 60, dependencies=["A"]), Task("C", 60, dependencies=["B"]),
+        Task("D", 30), Task("E", 30, dependencies=["D"]),
+    ]
+    v1 = history.commit_tasks(base, "base")
+    history.snapshot("aprobado")
+    first = history.analyze()
+    assert first["recomputed_components"] == 2 and first["reused_components"] == 0
+    assert first["analysis"]["critical_path"] == ["A", "B", "C"]
+
+    # Editar solo el flujo D -> E: el componente A -> B -> C se reutiliza
+    edited = [Task(t.name, t.duration, dependencies=list(t.dependencies)) for t in base]
+    edited[4] = Task("E", 300, dependencies=["D"])
+    edited.append(Task("F", 10, dependencies=["E", "C"]))
+    v2 = history.commit_tasks(edited)
+    diff = history.diff("aprobado", v2.version_id)
+    assert diff["added_tasks"] == ["F"] and diff["changed_tasks"] == ["E"] and diff["removed_tasks"] == []
+    assert sorted(diff["added_edges"]) == [("C", "F"), ("E", "F")]
+    # La versión anterior comparte los registros intactos
+    assert v1.tasks.get("A") is v2.tasks.get("A")
+
+    second = history.analyze()
+    assert second["recomputed_components"] == 1 # F une ambos flujos
+    assert second["analysis"]["critical_path"] == ["D", "E", "F"]
+
+    v3 = history.commit_tasks(edited[:4] + [Task("E", 300, dependencies=["D"])] + [Task("G", 5)])
+    third = history.analyze()
+    assert third["reused_components"] == 0 and third["recomputed_components"] == 3
+    fourth = history.commit_tasks(history.tasks() + [Task("H", 5, dependencies=["G"])])
+    assert history.analyze()["reused_components"] == 2 # Solo cambia el componente de G
+    assert [t.name for t in history.tasks()] == ["A", "B", "C", "D", "E", "G", "H"]
+
+    assert history.undo().version_id == v3.version_id
+    assert history.diff(v3.version_id, fourth.version_id)["added_edges"] == [("G", "H")]
+    assert history.checkout("aprobado").version_id == v1.version_id
+    assert [t.name for t in history.tasks()] == ["A", "B", "C", "D", "E"]
+    assert history.diff(v2.version_id, v3.version_id)["removed_tasks"] == ["F"]
+    print("ProjectHistory Passed!")
+
+from structures.compiled_project import CompiledProject
+from structures.binary_project import BinaryProject, write_binary_project
+
+def test_binary_project():
+    print("Testing BinaryProject...")
+    # A -> B -> D, A -> C -> D, más el ciclo X <-> Y que bloquea a Z
+    project = CompiledProject()
+    for external_id, name, minutes, priority, subproject in [
+        ("1", "A", 60, "Alta", "Fase 1"), ("2", "B", 120, "Crítica", "Fase 1"), ("3", "C", 30, "Media", ""),
+        ("4", "D", 15, "Media", "Fase 2"), ("5", "X", 10, "Baja", ""), ("6", "Y", 10, "Baja", ""), ("7", "Zeta ñ", 5, "Baja", ""),
+    ]:
+        project.add_task(external_id, name, minutes, priority, subproject)
+    for dependency, task in [(0, 1), (0, 2), (1, 3), (2, 3), (4, 5), (5, 4), (5, 6)]:
+        project.add_dependency(dependency, task)
+    project.finalize()
+
+    path = tempfile.mktemp(suffix=".tfpb")
+    write_binary_project(project, path)
+    try:
+        with BinaryProject(path) as binary:
+            assert binary.task_count() == 7 and binary.edge_count == 7
+            assert binary.name(6) == "Zeta ñ" and binary.external_id(1) == "2"
+            assert binary.subproject(0) == "Fase 1" and binary.subproject(3) == "Fase 2" and binary.subproject(2) == ""
+            assert list(binary.successors(0)) == [1, 2]
+            analysis = binary.analyze()
+            assert [int(task) for task in analysis["order"]] == [0, 1, 2, 3]
+            assert analysis["critical_path"] == ["A", "B", "D"]
+            assert analysis["longest_path_minutes"] == 195
+            assert analysis["cyclic_task_count"] == 3 and analysis["blocked_tasks"] == ["X", "Y", "Zeta ñ"]
+            assert analysis["level_count"] == 3 and analysis["critical_priority_count"] == 1
+            reference = project.analyze()
+            assert analysis["total_duration_minutes"] == reference["total_duration_minutes"]
+            assert analysis["cyclic_task_count"] == reference["cyclic_task_count"]
+    finally:
+        os.remove(path)
+
+    empty = CompiledProject()
+    empty.finalize()
+    path = tempfile.mktemp(suffix=".tfpb")
+    write_binary_project(empty, path)
+    try:
+        with BinaryProject(path) as binary:
+            assert binary.analyze()["critical_path"] == [] and binary.analyze()["level_count"] == 0
+    finally:
+        os.remove(path)
+
+    # Retención de los proyectos guardados con store=true: por número y por antigüedad
+    import api
+    from fastapi.testclient import TestClient
+    client = TestClient(api.app)
+    saved = (api.BINARY_PROJECT_DIR, api.MAX_BINARY_PROJECTS, api.BINARY_PROJECT_RETENTION_SECONDS)
+    with tempfile.TemporaryDirectory() as directory:
+        api.BINARY_PROJECT_DIR, api.MAX_BINARY_PROJECTS = directory, 2
+        try:
+            csv_file = ("p.csv", b"id,name,duration\n1,A,1\n", "text/csv")
+            ids = []
+            for position in range(3):
+                ids.append(client.post("/import/csv?store=true", files={"file": csv_file}).json()["project_file"])
+                moment = time.time() - 300 + position # Orden de antigüedad estable, cinco minutos atrás
+                os.utime(api.binary_project_path(ids[-1]), (moment, moment))
+            assert sorted(os.listdir(directory)) == sorted(f"{file_id}.tfpb" for file_id in ids[1:])
+            assert client.get(f"/binary-projects/{ids[0]}/analysis").status_code == 404
+            assert client.get(f"/binary-projects/{ids[2]}/analysis").status_code == 200
+
+            api.BINARY_PROJECT_RETENTION_SECONDS = 60
+            client.post("/import/csv?store=true", files={"file": csv_file})
+            assert len(os.listdir(directory)) == 1 # Los anteriores superan el minuto de retención
+        finally:
+            api.BINARY_PROJECT_DIR, api.MAX_BINARY_PROJECTS, api.BINARY_PROJECT_RETENTION_SECONDS = saved
+    print("BinaryProject Passed!")
+
+from job_service import JobService, JobQueueFull, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from structures.custom_graph import PROGRESS_INTERVAL
+
+def _wait_for_job(service, job_id):
+    for _ in range(500):
+        job = service.get(job_id)
+        if job is None or job.is_finished():
+            return job
+        time.sleep(0.01)
+    raise AssertionError("Job did not finish")
+
+def test_job_service():
+    print("Testing JobService...")
+    # Los recorridos informan su avance cada PROGRESS_INTERVAL nodos
+    graph = CustomGraph(capacity=PROGRESS_INTERVAL * 6)
+    for i in range(PROGRESS_INTERVAL * 3):
+        graph.add_node(f"T{i}", {"duration": 1})
+    reported = []
+    graph.condense(reported.append)
+    assert reported == [1 / 3, 2 / 3, 1.0]
+
+    service = JobService(max_workers=1, max_pending=2, max_finished=2)
+    try:
+        def work(context):
+            graph.condense(context.stage("order", 0.0, 0.5))
+            context.stage("finish", 0.5, 1.0)
+            return "ok"
+        job = _wait_for_job(service, service.submit("test", work).job_id)
+        assert job.status == JOB_DONE and job.result == "ok" and job.progress == 1.0 and job.stage == "finish"
+
+        failed = _wait_for_job(service, service.submit("test", lambda context: 1 / 0).job_id)
+        assert failed.status == JOB_FAILED and "division" in failed.error
+
+        # Cancelación: un trabajo en ejecución se detiene en su siguiente punto de control
+        started, release = threading.Event(), threading.Event()
+        def blocking(context):
+            report = context.stage("wait", 0.0, 1.0)
+            started.set()
+            release.wait(5)
+            report(0.5)
+            return "unreachable"
+        running = service.submit("test", blocking)
+        queued = service.submit("test", work) # Espera al único hilo del pool
+        try:
+            service.submit("test", work)
+            assert False, "Expected JobQueueFull"
+        except JobQueueFull:
+            pass
+        started.wait(5)
+        assert service.cancel(queued.job_id).status == JOB_CANCELLED # Aún en cola: inmediato
+        service.cancel(running.job_id)
+        release.set()
+        assert _wait_for_job(service, running.job_id).status == JOB_CANCELLED
+        assert running.result is None and running.progress == 0.0
+
+        # Retención acotada: solo se conservan los max_finished trabajos terminados más recientes
+        assert service.get(job.job_id) is None and service.get(failed.job_id) is None
+        assert service.get(queued.job_id) is not None
+    finally:
+        service.shutdown()
+    print("JobService Passed!")
+
+def test_plan_stream():
+    print("Testing plan stream...")
+    import api
+    from fastapi.testclient import TestClient
+    from fastapi import WebSocketDisconnect
+    from job_service import JobCancelled
+    tasks = [api.TaskInput(id=i + 1, name=f"T{i}", duration=1, unit="hours", priority="Media", dependencies=[i] if i else [])
+             for i in range(PROGRESS_INTERVAL * 2)]
+
+    # Las etapas largas consultan el punto de control y se detienen a mitad
+    def superseded(fraction):
+        raise JobCancelled()
+    stages = dict(api.plan_stream_stages(tasks, superseded))
+    stages["validation"]()
+    try:
+        stages["cycles"]()
+        assert False, "Expected JobCancelled"
+    except JobCancelled:
+        pass
+
+    client = TestClient(api.app)
+    body = {"request_id": 7, "tasks": [task.model_dump() for task in tasks[:3]]}
+    with client.websocket_connect("/ws/generate-plan") as websocket:
+        websocket.send_text("{no es json")
+        assert websocket.receive_json()["stage"] == "error" # La conexión sigue abierta
+        websocket.send_json(body)
+        stages_seen = []
+        while not stages_seen or stages_seen[-1] not in ("done", "error"):
+            stages_seen.append(websocket.receive_json()["stage"])
+        assert stages_seen[-1] == "done" and "image" in stages_seen
+
+    # Una petición nueva interrumpe la etapa larga en curso en su siguiente punto de control
+    original_layout = api.layered_layout
+    def blocking_layout(layout_tasks, progress=None):
+        if len(layout_tasks) != 3:
+            return original_layout(layout_tasks, progress)
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            progress(0.5) # Lanza JobCancelled en cuanto la ejecución queda reemplazada
+            time.sleep(0.01)
+        raise AssertionError("The layout stage was not superseded")
+    api.layered_layout = blocking_layout
+    try:
+        with client.websocket_connect("/ws/generate-plan") as websocket:
+            websocket.send_json(body)
+            while websocket.receive_json()["stage"] != "critical_path":
+                pass
+            newer = {"request_id": 8, "tasks": [task.model_dump() for task in tasks[:2]]}
+            websocket.send_json(newer)
+            assert websocket.receive_json() == {"request_id": 7, "stage": "superseded"}
+            frames = []
+            while not frames or frames[-1]["stage"] not in ("done", "error"):
+                frames.append(websocket.receive_json())
+            assert frames[-1]["stage"] == "done" and {frame["request_id"] for frame in frames} == {8}
+    finally:
+        api.layered_layout = original_layout
+
+    # Un fallo inesperado envía un error y cierra la conexión con 1011
+    original = api.run_plan_stream
+    async def broken(websocket, request, is_superseded):
+        raise RuntimeError("boom")
+    api.run_plan_stream = broken
+    try:
+        with client.websocket_connect("/ws/generate-plan") as websocket:
+            websocket.send_json(body)
+            assert websocket.receive_json() == {"request_id": 7, "stage": "error", "detail": "boom"}
+            try:
+                websocket.receive_json()
+                assert False, "Expected the connection to close"
+            except WebSocketDisconnect as e:
+                assert e.code == 1011
+    finally:
+        api.run_plan_stream = original
+    print("plan stream Passed!")
+
 if __name__ == "__main__":
     test_queue()
     test_hash_table()
     test_heap()
     test_service()
     test_custom_graph()
+    test_condensation()
+    test_longest_paths()
+    test_deep_cyclic_plan_api()
+    test_union_find()
+    test_component_service()
+    test_subproject_service()
+    test_subproject_service_matches_flat()
+    test_working_calendar()
+    test_schedule_service()
+    test_schedule_index()
+    test_svg_renderer()
+    test_crashing_service()
+    test_incremental_critical_path()
+    test_graph_view_service()
+    test_import_csv()
+    test_import_msproject()
+    test_load_test_helpers()
+    test_persistent_map()
+    test_project_history()
+    test_binary_project()
+    test_job_service()
+    test_plan_stream()
@@ -0,0 +1,22 @@
+from typing import Dict, Optional
+
+from structures.working_calendar import WorkingCalendar
+
+# Minutos por unidad; None indica "días", que dependen del calendario
+UNIT_FACTORS: Dict[str, Optional[float]] = {
+    "minutes": 1, "minutos": 1,
+    "hours": 60, "horas": 60,
+    "days": None, "días": None, "dias": None,
+}
+
+def convert_to_minutes(duration: float, unit: str, calendar: Optional[WorkingCalendar] = None) -> float:
+    """
+    Convierte la duración a minutos según la unidad especificada.
+    Con un calendario laboral, un día equivale a su jornada (p. ej. 480 minutos) y no a 1.440.
+    """
+    unit_lower = unit.lower()
+    if unit_lower not in UNIT_FACTORS:
+        raise ValueError(f"Unknown duration unit '{unit}'")
+    if UNIT_FACTORS[unit_lower] is None:
+        return duration * (calendar.minutes_per_day if calendar else 60 * 24)
+    return duration * UNIT_FACTORS[unit_lower]
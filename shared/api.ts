@@ -26,6 +26,7 @@ export interface GraphNode {
     label: string;
     priority: string;
   };
+  position?: { x: number; y: number };
 }
 
 export interface GraphEdge {
@@ -44,7 +45,47 @@ export interface ProjectData {
   duracion_total: number;
   tareas_criticas: number;
   ciclos_detectados?: string[][];
+  bloques_ciclicos?: string[][];
   orden_tareas?: string[];
-  image_base64: string;
+  ruta_critica?: string[];
+  image_base64: string; // SVG del grafo en Base64
   graph_data?: GraphData;
-}
\ No newline at end of file
+  view_id?: string;
+}
+/**
+* Mensajes del análisis progresivo por WebSocket (/ws/generate-plan)
+ */
+export type PlanStreamStage =
+  | "validation"
+  | "cycles"
+  | "order"
+  | "levels"
+  | "critical_path"
+  | "layout"
+  | "image"
+  | "done"
+  | "superseded"
+  | "error";
+
+export interface PlanStreamMessage {
+  request_id: string | number | null;
+  stage: PlanStreamStage;
+  data?: Record<string, unknown>;
+  detail?: string;
+  elapsed_ms?: number;
+}
+/**
+* Trabajos de análisis en segundo plano (/jobs/generate-plan, /jobs/{job_id}, /ws/jobs/{job_id})
+ */
+export type JobStatus = "queued" | "running" | "done" | "failed" | "cancelled";
+
+export interface JobData {
+  job_id: string;
+  kind: string;
+  status: JobStatus;
+  stage?: string | null;
+  progress: number; // Entre 0 y 1
+  error?: string | null;
+  created_at: string;
+  finished_at?: string | null;
+}